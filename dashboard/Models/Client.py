@@ -1,4 +1,5 @@
 import uuid
+import secrets
 from organizations.models import Organization
 from django.db import models
 from phonenumber_field.modelfields import PhoneNumberField
@@ -202,6 +203,100 @@ class Candidate(CreateUpdateDateTimeAndArchivedField):
     )
     is_engagement_pushed = models.BooleanField(default=False)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counter_state = instance.get_counter_state()
+        instance._loaded_designation_id = instance.__dict__.get("designation_id")
+        return instance
+
+    def get_counter_state(self):
+        """(organization_id, archived, status) as last persisted, None when any of them is deferred"""
+        state = tuple(
+            self.__dict__.get(field)
+            for field in ("organization_id", "archived", "status")
+        )
+        return None if None in state else state
+
+
+class CandidateStatusCounter(models.Model):
+    """Per organization candidate totals shown on the candidate listing, kept up to date by signals"""
+
+    STATUS_BUCKETS = {
+        "scheduled": ("SCH", "CSCH"),
+        "inprocess": ("NSCH",),
+        "recommended": ("REC", "HREC"),
+        "rejected": ("SNREC", "NREC"),
+    }
+
+    organization = models.OneToOneField(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="candidate_status_counter",
+    )
+    total_candidates = models.IntegerField(default=0)
+    scheduled = models.IntegerField(default=0)
+    inprocess = models.IntegerField(default=0)
+    recommended = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.organization} - {self.total_candidates}"
+
+    @classmethod
+    def aggregate(cls, candidate_qs):
+        return candidate_qs.aggregate(
+            total_candidates=models.Count("id"),
+            **{
+                bucket: models.Count("id", filter=models.Q(status__in=statuses))
+                for bucket, statuses in cls.STATUS_BUCKETS.items()
+            },
+        )
+
+    @classmethod
+    def rebuild(cls, organization_id):
+        counts = cls.aggregate(
+            Candidate.objects.filter(organization_id=organization_id)
+        )
+        counter, _ = cls.objects.update_or_create(
+            organization_id=organization_id, defaults=counts
+        )
+        return counter
+
+    @classmethod
+    def get_bucket(cls, status):
+        for bucket, statuses in cls.STATUS_BUCKETS.items():
+            if status in statuses:
+                return bucket
+        return None
+
+    @classmethod
+    def apply(cls, previous_state, current_state):
+        """Move a candidate from one counter state to another with relative updates"""
+        deltas = {}
+        for state, step in ((previous_state, -1), (current_state, 1)):
+            if state is None:
+                continue
+            organization_id, archived, status = state
+            if archived:
+                continue
+            organization_deltas = deltas.setdefault(organization_id, {})
+            for field in ("total_candidates", cls.get_bucket(status)):
+                if field:
+                    organization_deltas[field] = (
+                        organization_deltas.get(field, 0) + step
+                    )
+
+        for organization_id, changes in deltas.items():
+            changes = {field: delta for field, delta in changes.items() if delta}
+            if not changes:
+                continue
+            updated = cls.objects.filter(organization_id=organization_id).update(
+                **{field: models.F(field) + delta for field, delta in changes.items()}
+            )
+            if not updated:
+                cls.rebuild(organization_id)
+
 
 class Engagement(CreateUpdateDateTimeAndArchivedField):
     STATUS_CHOICE = (
@@ -314,3 +409,101 @@ class InterviewScheduleAttempt(CreateUpdateDateTimeAndArchivedField):
     candidate = models.ForeignKey(
         Candidate, on_delete=models.CASCADE, related_name="scheduling_attempts"
     )
+
+
+def generate_offer_token():
+    return secrets.token_urlsafe(16)
+
+
+class SchedulingOffer(CreateUpdateDateTimeAndArchivedField):
+    """One interviewer's invitation to take an interview of a scheduling attempt"""
+
+    STATUS_CHOICES = (
+        ("PED", "Pending"),
+        ("ACC", "Accepted"),
+        ("REJ", "Rejected"),
+        ("INV", "Invalidated"),
+    )
+
+    token = models.CharField(
+        max_length=32, unique=True, default=generate_offer_token, editable=False
+    )
+    scheduling_attempt = models.ForeignKey(
+        InterviewScheduleAttempt, on_delete=models.CASCADE, related_name="offers"
+    )
+    availability = models.ForeignKey(
+        "InterviewerAvailability",
+        on_delete=models.CASCADE,
+        related_name="scheduling_offers",
+    )
+    scheduled_time = models.DateTimeField()
+    booked_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="scheduling_offers"
+    )
+    expires_at = models.DateTimeField()
+    status = models.CharField(max_length=3, choices=STATUS_CHOICES, default="PED")
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["scheduling_attempt", "status"],
+                name="offer_attempt_status_idx",
+            ),
+        ]
+
+
+class CandidateImportJob(CreateUpdateDateTimeAndArchivedField):
+    STATUS_CHOICES = (
+        ("PED", "Pending"),
+        ("PRG", "In Progress"),
+        ("CMP", "Completed"),
+        ("FLD", "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="candidate_imports"
+    )
+    created_by = models.ForeignKey(
+        ClientUser, on_delete=models.CASCADE, related_name="candidate_imports"
+    )
+    file = models.FileField(upload_to="candidate_imports")
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default="PED")
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(
+        default=list, blank=True, help_text="[{'row': <int>, 'errors': {...}}]"
+    )
+    failure_reason = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.file.name} - {self.get_status_display()}"
+
+
+class ResumeParseJob(CreateUpdateDateTimeAndArchivedField):
+    STATUS_CHOICES = (
+        ("PED", "Pending"),
+        ("PRG", "In Progress"),
+        ("CMP", "Completed"),
+        ("FLD", "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="resume_parse_jobs"
+    )
+    files = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="storage paths of the uploaded resumes, removed once parsed",
+    )
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default="PED")
+    total_files = models.PositiveIntegerField(default=0)
+    processed_files = models.PositiveIntegerField(default=0)
+    results = models.JSONField(default=list, blank=True)
+    failure_reason = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.created_by.email} - {self.get_status_display()}"
@@ -0,0 +1,42 @@
+from django.db import models
+from organizations.models import Organization
+from .Client import Job
+
+
+class DashboardSnapshot(models.Model):
+    """Precomputed dashboard aggregates, refreshed in the background by dashboard.snapshots"""
+
+    SCOPE_CHOICES = (
+        ("CLIENT", "Client Dashboard"),
+        ("INTERNAL", "Internal Dashboard"),
+        ("ENGAGEMENT", "Internal Engagement"),
+        ("ANALYTICS", "Job Analytics"),
+    )
+
+    key = models.CharField(max_length=100, unique=True)
+    scope = models.CharField(max_length=15, choices=SCOPE_CHOICES)
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="dashboard_snapshots",
+        null=True,
+        blank=True,
+    )
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name="dashboard_snapshots",
+        null=True,
+        blank=True,
+    )
+    data = models.JSONField(default=dict, blank=True)
+    refreshed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.key} - {self.refreshed_at}"
+
+    @staticmethod
+    def make_key(scope, organization_id=None, job_id=None):
+        return ":".join(
+            str(part) for part in (scope, organization_id, job_id) if part is not None
+        )
@@ -192,6 +192,47 @@ class InternalInterviewer(CreateUpdateDateTimeAndArchivedField):
             self.user.profile.save()
         return super().save(*args, **kwargs)
 
+    def sync_skill_index(self):
+        skills = InterviewerSkill.normalize(self.skills)
+        self.indexed_skills.exclude(skill__in=skills).delete()
+        existing = set(self.indexed_skills.values_list("skill", flat=True))
+        InterviewerSkill.objects.bulk_create(
+            [
+                InterviewerSkill(interviewer=self, skill=skill)
+                for skill in skills
+                if skill not in existing
+            ]
+        )
+
+
+class InterviewerSkill(models.Model):
+    """Lowercase skill -> interviewer lookup table derived from InternalInterviewer.skills"""
+
+    interviewer = models.ForeignKey(
+        InternalInterviewer, on_delete=models.CASCADE, related_name="indexed_skills"
+    )
+    skill = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ("interviewer", "skill")
+        indexes = [
+            models.Index(fields=["skill", "interviewer"], name="interviewer_skill_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.skill} - {self.interviewer_id}"
+
+    @staticmethod
+    def normalize(skills):
+        normalized = []
+        for skill in skills or []:
+            if not isinstance(skill, str):
+                continue
+            skill = skill.strip().lower()[:100]
+            if skill and skill not in normalized:
+                normalized.append(skill)
+        return normalized
+
 
 class Agreement(CreateUpdateDateTimeAndArchivedField):
     objects = SoftDelete()
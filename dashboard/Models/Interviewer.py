@@ -35,10 +35,47 @@ class InterviewerAvailability(CreateUpdateDateTimeAndArchivedField):
     is_scheduled = models.BooleanField(default=False)
     google_calendar_id = models.CharField(max_length=255, blank=True)
     recurrence_rule = models.CharField(max_length=255, null=True, blank=True)
+    recurrence_parent = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="occurrences",
+        help_text="The slot holding the recurrence rule this slot was generated from.",
+    )
+    materialized_until = models.DateField(
+        null=True,
+        blank=True,
+        help_text="The occurrences of the recurrence rule exist up to this date.",
+    )
+    split_from = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="splits",
+        help_text="The slot this one was cut from when an interview was booked in it.",
+    )
+    offered_start_time = models.TimeField(
+        null=True,
+        blank=True,
+        help_text="The start time the interviewer offered, kept once booking narrows the slot.",
+    )
+    offered_end_time = models.TimeField(
+        null=True,
+        blank=True,
+        help_text="The end time the interviewer offered, kept once booking narrows the slot.",
+    )
 
     class Meta:
         ordering = ["date", "start_time", "end_time"]
         unique_together = ("interviewer", "date", "start_time", "end_time")
+        indexes = [
+            models.Index(
+                fields=["date", "booked_by", "start_time"],
+                name="availability_date_open_idx",
+            ),
+        ]
         verbose_name = "Interviewer Slot Booking"
         verbose_name_plural = "Interviewer Slot Bookings"
 
@@ -60,6 +97,14 @@ class InterviewerAvailability(CreateUpdateDateTimeAndArchivedField):
     def is_recurrence(self):
         return self.recurrence_rule is not None
 
+    def get_offered_window(self):
+        """The hours the interviewer offered, booking only narrows start/end"""
+        return (
+            self.offered_start_time or self.start_time,
+            self.offered_end_time or self.end_time,
+        )
+
+
 # currently model is in not used
 class InterviewerRequest(CreateUpdateDateTimeAndArchivedField):
     STATUS_CHOICES = (
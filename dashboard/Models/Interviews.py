@@ -26,9 +26,29 @@ class Interview(CreateUpdateDateTimeAndArchivedField):
         null=True,
         blank=True,
     )
-    no_of_time_processed = models.IntegerField(
+    RECORDING_STAGE_CHOICES = (
+        ("EVT", "Waiting for the recording"),
+        ("DWN", "Downloading"),
+        ("STR", "Storing"),
+        ("TRN", "Transcript ready"),
+        ("DONE", "Feedback generated"),
+        ("FLD", "Failed"),
+    )
+
+    recording_attempts = models.IntegerField(
         default=0,
-        help_text="Signifying the number of times that task is processed. if the task process more that 3 times then the interview doesn't happen.",
+        help_text="Number of times the recording pipeline claimed this interview, it is given up after RECORDING_MAX_ATTEMPTS.",
+    )
+    recording_stage = models.CharField(
+        max_length=4, choices=RECORDING_STAGE_CHOICES, default="EVT"
+    )
+    recording_lease_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="the worker holding the claim owns the interview until then",
+    )
+    recording_claim = models.UUIDField(
+        null=True, blank=True, help_text="token of the current claim"
     )
     status = models.CharField(
         max_length=15,
@@ -71,6 +91,19 @@ class Interview(CreateUpdateDateTimeAndArchivedField):
         max_length=255, null=True, blank=True
     )
     meeting_link = models.URLField(null=True, blank=True)
+    meeting_failed = models.BooleanField(
+        default=False,
+        help_text="The Meet could not be created after every retry, the interview has no link and its confirmation emails were not sent.",
+    )
+    feedback_claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="set when a task starts generating the AI feedback, stops two runs from processing the same interview",
+    )
+    feedback_attempts = models.IntegerField(
+        default=0,
+        help_text="Number of times feedback generation claimed this interview, it is given up after FEEDBACK_MAX_ATTEMPTS.",
+    )
 
     class Meta:
         unique_together = ("interviewer", "scheduled_time")
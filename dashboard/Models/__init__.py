@@ -6,11 +6,16 @@ from .Client import (
     EngagementTemplates,
     EngagementOperation,
     InterviewScheduleAttempt,
+    SchedulingOffer,
+    CandidateStatusCounter,
+    CandidateImportJob,
+    ResumeParseJob,
 )
 from .Internal import (
     ClientPointOfContact,
     InternalClient,
     InternalInterviewer,
+    InterviewerSkill,
     Agreement,
     HDIPUsers,
     DesignationDomain,
@@ -19,3 +24,4 @@ from .Internal import (
 from .Interviewer import InterviewerAvailability, InterviewerRequest
 from .Interviews import Interview, InterviewFeedback
 from .Finance import BillingRecord, BillingLog, BillPayments
+from .Dashboard import DashboardSnapshot
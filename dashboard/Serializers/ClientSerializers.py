@@ -13,6 +13,8 @@ from ..models import (
     ClientUser,
     Job,
     Candidate,
+    CandidateImportJob,
+    ResumeParseJob,
     InternalInterviewer,
     Engagement,
     EngagementOperation,
@@ -377,7 +379,10 @@ class JobSerializer(serializers.ModelSerializer):
         return data
 
     def get_active_candidates(self, obj):
-        return obj.candidate.count()
+        active_candidate_count = getattr(obj, "active_candidate_count", None)
+        if active_candidate_count is None:
+            return obj.candidate.count()
+        return active_candidate_count
 
     def create(self, validated_data):
         recruiter_ids = validated_data.pop("recruiter_ids")
@@ -533,6 +538,112 @@ class CandidateSerializer(serializers.ModelSerializer):
         return data
 
 
+class CandidateImportRowSerializer(serializers.ModelSerializer):
+    gender = serializers.ChoiceField(
+        choices=Candidate.GENDER_CHOICES,
+        error_messages={
+            "invalid_choice": f"This is an invalid choice. Valid choices are {', '.join([f'{key}({value})' for key, value in Candidate.GENDER_CHOICES])}"
+        },
+        required=False,
+    )
+    source = serializers.ChoiceField(
+        choices=Candidate.SOURCE_CHOICES,
+        error_messages={
+            "invalid_choice": f"This is an invalid choice. Valid choices are {', '.join([f'{key}({value})' for key, value in Candidate.SOURCE_CHOICES])}"
+        },
+    )
+    specialization = serializers.ChoiceField(
+        choices=Candidate.SPECIALIZATION_CHOICES,
+        error_messages={
+            "invalid_choice": f"This is an invalid choice. Valid choices are {', '.join([f'{key}({value})' for key, value in Candidate.SPECIALIZATION_CHOICES])}"
+        },
+    )
+    job_id = serializers.CharField(
+        help_text="Job id or the job reference (job_id) given by the client"
+    )
+
+    class Meta:
+        model = Candidate
+        fields = (
+            "name",
+            "year",
+            "month",
+            "phone",
+            "email",
+            "company",
+            "current_designation",
+            "source",
+            "specialization",
+            "gender",
+            "remark",
+            "job_id",
+        )
+        extra_kwargs = {
+            "name": {"required": True, "allow_blank": False},
+            "year": {"required": True},
+            "month": {"required": True},
+            "phone": {"required": True},
+            "email": {"required": True, "allow_blank": False},
+            "company": {"required": True, "allow_blank": False},
+            "current_designation": {"required": True, "allow_blank": False},
+        }
+
+    def validate(self, data):
+        jobs = self.context["jobs"]
+        job_reference = data.pop("job_id")
+        job = jobs.get(job_reference) or (
+            jobs.get(int(job_reference)) if job_reference.isdigit() else None
+        )
+        if not job:
+            raise serializers.ValidationError({"job_id": ["Invalid job_id"]})
+        if job.is_diversity_hiring and not data.get("gender"):
+            raise serializers.ValidationError(
+                {"gender": ["This is required field for diversity hiring."]}
+            )
+        data["designation"] = job
+        return data
+
+
+class CandidateImportJobSerializer(serializers.ModelSerializer):
+    created_at = serializers.DateTimeField(format="%d/%m/%Y %H:%M:%S", read_only=True)
+    updated_at = serializers.DateTimeField(format="%d/%m/%Y %H:%M:%S", read_only=True)
+
+    class Meta:
+        model = CandidateImportJob
+        fields = (
+            "id",
+            "status",
+            "total_rows",
+            "processed_rows",
+            "created_count",
+            "error_count",
+            "errors",
+            "failure_reason",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+
+class ResumeParseJobSerializer(serializers.ModelSerializer):
+    created_at = serializers.DateTimeField(format="%d/%m/%Y %H:%M:%S", read_only=True)
+    updated_at = serializers.DateTimeField(format="%d/%m/%Y %H:%M:%S", read_only=True)
+
+    class Meta:
+        model = ResumeParseJob
+        fields = (
+            "id",
+            "status",
+            "total_files",
+            "processed_files",
+            "results",
+            "failure_reason",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+
 class EngagementOperationDataSerializer(serializers.Serializer):
     template_id = serializers.IntegerField()
     date = serializers.DateTimeField(
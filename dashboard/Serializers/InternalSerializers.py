@@ -571,6 +571,7 @@ class InterviewerSerializer(serializers.ModelSerializer):
                 user=user, **validated_data
             )
             interviewer_obj.assigned_domains.add(*domain_ids)
+            interviewer_obj.sync_skill_index()
             verification_data = (
                 f"{user.id}:{int(datetime.datetime.now().timestamp() + 86400)}"
             )
@@ -626,6 +627,8 @@ class InterviewerSerializer(serializers.ModelSerializer):
 
             instance.assigned_domains.set(assigned_domain_ids)
             instance = super().update(instance, validated_data)
+            if "skills" in validated_data:
+                instance.sync_skill_index()
 
             if "email" in changes:
                 send_mail.delay(
@@ -16,6 +16,7 @@ from ..models import (
     InterviewerPricing,
     Agreement,
 )
+from ..slots import InterviewerDay, get_recurrence_rule, materialize_recurrence
 from hiringdogbackend.utils import validate_incoming_data, validate_attachment
 
 
@@ -146,13 +147,11 @@ class InterviewerAvailabilitySerializer(serializers.ModelSerializer):
         if errors:
             raise serializers.ValidationError({"errors": errors})
 
-        overlapping_slots = InterviewerAvailability.objects.filter(
-            interviewer=interviewer_user,
-            date=data.get("date"),
-            start_time__lt=data.get("end_time"),
-            end_time__gt=data.get("start_time"),
-        )
-        if overlapping_slots.exists():
+        if all(data.get(key) is not None for key in required_keys) and (
+            InterviewerDay.load(
+                interviewer_user, data["date"], with_interviews=False
+            ).overlapping(data["start_time"], data["end_time"], exclude=self.instance)
+        ):
             errors.setdefault("availability", []).append(
                 "Interviewer already available at this date and time."
             )
@@ -180,8 +179,14 @@ class InterviewerAvailabilitySerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        validated_data.pop("recurrence", None)
-        return super().create(validated_data)
+        recurrence = validated_data.pop("recurrence", None)
+        if recurrence:
+            validated_data["recurrence_rule"] = get_recurrence_rule(recurrence)
+        availability = super().create(validated_data)
+        if recurrence:
+            # the matcher only sees slots, so the occurrences are created too
+            materialize_recurrence(availability)
+        return availability
 
 
 class InterviewerRequestSerializer(serializers.Serializer):
@@ -2,6 +2,9 @@ from .ClientSerializers import (
     ClientUserSerializer,
     JobSerializer,
     CandidateSerializer,
+    CandidateImportRowSerializer,
+    CandidateImportJobSerializer,
+    ResumeParseJobSerializer,
     EngagementTemplateSerializer,
     EngagementSerializer,
     EngagementOperationSerializer,
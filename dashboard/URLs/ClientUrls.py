@@ -5,6 +5,7 @@ from ..views import (
     JobView,
     ResumeParserView,
     CandidateView,
+    CandidateImportView,
     PotentialInterviewerAvailabilityForCandidateView,
     EngagementTemplateView,
     EngagementView,
@@ -35,6 +36,14 @@ urlpatterns = [
     ),
     path("candidates/", CandidateView.as_view(), name="candidates"),
     path("candidate/<int:candidate_id>/", CandidateView.as_view(), name="candidate"),
+    path(
+        "candidate-import/", CandidateImportView.as_view(), name="candidate-import"
+    ),
+    path(
+        "candidate-import/<uuid:import_id>/",
+        CandidateImportView.as_view(),
+        name="candidate-import-details",
+    ),
     path("jobs/", JobView.as_view(), name="job-list"),
     path("job/<int:job_id>/", JobView.as_view(), name="job-details"),
     path(
@@ -43,6 +52,11 @@ urlpatterns = [
         name="interviewer-availablity",
     ),
     path("parse-resume/", ResumeParserView.as_view(), name="resume-parser"),
+    path(
+        "parse-resume/<uuid:parse_job_id>/",
+        ResumeParserView.as_view(),
+        name="resume-parser-job",
+    ),
     path(
         "engagement-templates/",
         EngagementTemplateView.as_view(),
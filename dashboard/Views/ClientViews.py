@@ -7,6 +7,7 @@ from celery import group
 from celery.result import AsyncResult
 from datetime import datetime, timedelta
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.files.storage import default_storage
 from django.utils import timezone
 from django.utils.encoding import force_str
 from django.utils.http import urlsafe_base64_decode
@@ -15,7 +16,6 @@ from django.db.models import Q, Count
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from organizations.models import Organization
@@ -25,6 +25,7 @@ from ..models import (
     Candidate,
     EngagementTemplates,
     InterviewerAvailability,
+    InterviewerSkill,
     Engagement,
     EngagementOperation,
     Interview,
@@ -32,6 +33,9 @@ from ..models import (
     BillingLog,
     BillPayments,
     DesignationDomain,
+    CandidateStatusCounter,
+    CandidateImportJob,
+    ResumeParseJob,
 )
 from ..serializer import (
     ClientUserSerializer,
@@ -46,10 +50,19 @@ from ..serializer import (
     AnalyticsQuerySerializer,
     FeedbackPDFVideoSerializer,
     FinanceSerializerForInterviewer,
+    CandidateImportJobSerializer,
+    ResumeParseJobSerializer,
 )
 from ..permissions import CanDeleteUpdateUser, UserRoleDeleteUpdateClientData
+from ..scoring import rank_available_slots
+from ..snapshots import (
+    get_client_dashboard_data,
+    get_snapshot,
+    refresh_client_snapshot,
+    refresh_job_analytics_snapshot,
+)
 from externals.parser.resumeparser2 import process_resumes
-from externals.analytics import get_candidate_analytics
+from externals.analytics import get_candidate_analytics_for_range
 from externals.payment.cashfree import create_payment_link, is_valid_signature
 from core.permissions import (
     IsClientAdmin,
@@ -63,12 +76,13 @@ from core.permissions import (
     IsInterviewer,
 )
 from core.models import Role, User
-from hiringdogbackend.utils import validate_attachment
-from ..tasks import send_schedule_engagement_email
+from hiringdogbackend.utils import validate_attachment, get_boolean
+from hiringdogbackend.pagination import OptionalKeysetPagination
+from ..tasks import send_schedule_engagement_email, import_candidates, parse_resumes
 
 
 @extend_schema(tags=["Client"])
-class ClientUserView(APIView, LimitOffsetPagination):
+class ClientUserView(APIView, OptionalKeysetPagination):
     serializer_class = ClientUserSerializer
     permission_classes = [IsAuthenticated, HasRole, CanDeleteUpdateUser]
     roles_mapping = {
@@ -254,7 +268,7 @@ class ClientInvitationActivateView(APIView):
 
 
 @extend_schema(tags=["Client"])
-class JobView(APIView, LimitOffsetPagination):
+class JobView(APIView, OptionalKeysetPagination):
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated, HasRole, UserRoleDeleteUpdateClientData]
     roles_mapping = {
@@ -363,7 +377,8 @@ class JobView(APIView, LimitOffsetPagination):
                 hiring_manager__organization=org_id
                 or request.user.clientuser.organization,
             )
-            .prefetch_related("clients", "candidate")
+            .select_related("hiring_manager")
+            .prefetch_related("clients")
             .order_by("-id")
         )
 
@@ -408,6 +423,13 @@ class JobView(APIView, LimitOffsetPagination):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+        # count the active candidates in the same query instead of once per job
+        jobs = jobs.annotate(
+            active_candidate_count=Count(
+                "candidate", filter=Q(candidate__archived=False), distinct=True
+            )
+        )
+
         if job_id:
             job = jobs.filter(pk=job_id).first()
             if not job:
@@ -531,12 +553,46 @@ class JobView(APIView, LimitOffsetPagination):
 
 
 @extend_schema(tags=["Client"])
-class ResumeParserView(APIView):
+class ResumeParserView(APIView, OptionalKeysetPagination):
+    keyset_ordering = ("-created_at", "-id")
     permission_classes = [
         IsAuthenticated,
         IsClientAdmin | IsClientUser | IsClientOwner | IsAgency | IsSuperAdmin,
     ]
 
+    def get(self, request, **kwargs):
+        parse_job_id = kwargs.get("parse_job_id")
+        parse_jobs = ResumeParseJob.objects.filter(created_by=request.user).order_by(
+            "-created_at"
+        )
+
+        if not parse_job_id:
+            paginated_parse_jobs = self.paginate_queryset(parse_jobs, request)
+            serializer = ResumeParseJobSerializer(paginated_parse_jobs, many=True)
+            paginated_response = self.get_paginated_response(serializer.data)
+            return Response(
+                {
+                    "status": "success",
+                    "message": "Resume parse jobs retrieved successfully.",
+                    **paginated_response.data,
+                }
+            )
+
+        parse_job = parse_jobs.filter(pk=parse_job_id).first()
+        if not parse_job:
+            return Response(
+                {"status": "failed", "message": "Resume parse job not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        serializer = ResumeParseJobSerializer(parse_job)
+        return Response(
+            {
+                "status": "success",
+                "message": "Resume parse job retrieved successfully.",
+                "data": serializer.data,
+            }
+        )
+
     def post(self, request):
         resume_files = request.FILES.getlist("resume")
 
@@ -575,6 +631,35 @@ class ResumeParserView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if get_boolean(request.query_params, "async"):
+            # the files are parsed by a celery task, poll the job for the results
+            parse_job_id = uuid.uuid4()
+            files = [
+                {
+                    "name": f.name,
+                    "path": default_storage.save(
+                        f"resume_parse/{parse_job_id}/{f.name}", f
+                    ),
+                }
+                for f in resume_files
+            ]
+            parse_job = ResumeParseJob.objects.create(
+                id=parse_job_id,
+                created_by=request.user,
+                files=files,
+                total_files=len(files),
+            )
+            transaction.on_commit(lambda: parse_resumes.delay(str(parse_job.id)))
+            serializer = ResumeParseJobSerializer(parse_job)
+            return Response(
+                {
+                    "status": "success",
+                    "message": "Resumes queued for parsing.",
+                    "data": serializer.data,
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+
         temp_dir = tempfile.mkdtemp()
         temp_paths = []
 
@@ -606,7 +691,93 @@ class ResumeParserView(APIView):
 
 
 @extend_schema(tags=["Client"])
-class CandidateView(APIView, LimitOffsetPagination):
+class CandidateImportView(APIView, OptionalKeysetPagination):
+    serializer_class = CandidateImportJobSerializer
+    keyset_ordering = ("-created_at", "-id")
+    permission_classes = [
+        IsAuthenticated,
+        IsClientAdmin | IsClientUser | IsClientOwner | IsAgency,
+    ]
+
+    def get(self, request, **kwargs):
+        import_id = kwargs.get("import_id")
+        import_jobs = CandidateImportJob.objects.filter(
+            organization=request.user.clientuser.organization
+        ).order_by("-created_at")
+
+        if not import_id:
+            paginated_import_jobs = self.paginate_queryset(import_jobs, request)
+            serializer = self.serializer_class(paginated_import_jobs, many=True)
+            paginated_response = self.get_paginated_response(serializer.data)
+            return Response(
+                {
+                    "status": "success",
+                    "message": "Imports retrieved successfully.",
+                    **paginated_response.data,
+                }
+            )
+
+        import_job = import_jobs.filter(pk=import_id).first()
+        if not import_job:
+            return Response(
+                {"status": "failed", "message": "Import not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        serializer = self.serializer_class(import_job)
+        return Response(
+            {
+                "status": "success",
+                "message": "Import retrieved successfully.",
+                "data": serializer.data,
+            }
+        )
+
+    def post(self, request):
+        file = request.FILES.get("file")
+        if not file:
+            return Response(
+                {
+                    "status": "failed",
+                    "message": "Invalid request.",
+                    "errors": {
+                        "file": [
+                            "This field is required. A CSV or XLSX file is supported."
+                        ]
+                    },
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        err = validate_attachment("file", file, ["csv", "xlsx"], 20)
+        if err:
+            return Response(
+                {"status": "failed", "message": "Invalid file.", "errors": err},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        client_user = request.user.clientuser
+        with transaction.atomic():
+            import_job = CandidateImportJob.objects.create(
+                organization=client_user.organization,
+                created_by=client_user,
+                file=file,
+            )
+            transaction.on_commit(lambda: import_candidates.delay(str(import_job.id)))
+
+        import_job.refresh_from_db()
+        serializer = self.serializer_class(import_job)
+        return Response(
+            {
+                "status": "success",
+                "message": "Import started. Poll the import for its progress.",
+                "data": serializer.data,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+@extend_schema(tags=["Client"])
+class CandidateView(APIView, OptionalKeysetPagination):
     serializer_class = CandidateSerializer
     permission_classes = [
         IsAuthenticated,
@@ -669,17 +840,13 @@ class CandidateView(APIView, LimitOffsetPagination):
             .order_by("-id")
         )
 
-        if (
+        assigned_jobs_only = (
             request.user.role in [Role.CLIENT_USER, Role.AGENCY]
             and request.user.clientuser.accessibility == "AGJ"
-        ):
+        )
+        if assigned_jobs_only:
             candidates = candidates.filter(designation__clients=request.user.clientuser)
-
-        total_candidates = candidates.count()
-        scheduled = candidates.filter(status__in=["SCH", "CSCH"]).count()
-        inprocess = candidates.filter(status="NSCH").count()
-        recommended = candidates.filter(Q(status="REC") | Q(status="HREC")).count()
-        rejected = candidates.filter(Q(status="SNREC") | Q(status="NREC")).count()
+        accessible_candidates = candidates
 
         if domain_designation_id and domain_designation:
             designation_name = domain_designation.name
@@ -722,17 +889,33 @@ class CandidateView(APIView, LimitOffsetPagination):
                 status=status.HTTP_200_OK,
             )
 
+        candidate_counts = None
+        if not assigned_jobs_only:
+            candidate_counts = (
+                CandidateStatusCounter.objects.filter(
+                    organization=request.user.clientuser.organization
+                )
+                .values(
+                    "total_candidates",
+                    "scheduled",
+                    "inprocess",
+                    "recommended",
+                    "rejected",
+                )
+                .first()
+            )
+        if candidate_counts is None:
+            candidate_counts = CandidateStatusCounter.aggregate(
+                accessible_candidates.order_by()
+            )
+
         paginated_candidates = self.paginate_queryset(candidates, request)
         serializer = self.serializer_class(paginated_candidates, many=True)
         paginated_response = self.get_paginated_response(serializer.data)
         response_data = {
             "status": "success",
             "message": "Candidates retrieved successfully.",
-            "total_candidates": total_candidates,
-            "scheduled": scheduled,
-            "inprocess": inprocess,
-            "recommended": recommended,
-            "rejected": rejected,
+            **candidate_counts,
             **paginated_response.data,
         }
         return Response(response_data, status=status.HTTP_200_OK)
@@ -935,6 +1118,19 @@ class PotentialInterviewerAvailabilityForCandidateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        try:
+            top = int(request.query_params.get("top", 10))
+            if not 0 < top <= 100:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {
+                    "status": "failed",
+                    "message": "Invalid top value. It should be an integer between 1 and 100",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         if specialization not in dict(Candidate.SPECIALIZATION_CHOICES).keys():
             return Response(
                 {
@@ -962,7 +1158,7 @@ class PotentialInterviewerAvailabilityForCandidateView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        skills = job.mandatory_skills or []
+        skills = InterviewerSkill.normalize(job.mandatory_skills)
         if not skills:
             return Response(
                 {
@@ -972,10 +1168,6 @@ class PotentialInterviewerAvailabilityForCandidateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        query = Q()
-        for skill in skills:
-            query |= Q(interviewer__skills__icontains=f'"{skill}"')
-
         client_level = request.user.clientuser.organization.internal_client.client_level
         interviewer_level = (
             list(range(client_level - 1, client_level + 1))
@@ -992,6 +1184,9 @@ class PotentialInterviewerAvailabilityForCandidateView(APIView):
             interviewer__total_experience_years__gte=experience + 2,
             interviewer__interviewer_level__in=interviewer_level,
             booked_by__isnull=True,
+            interviewer__in=InterviewerSkill.objects.filter(skill__in=skills).values(
+                "interviewer_id"
+            ),
         )
 
         if time:
@@ -999,12 +1194,24 @@ class PotentialInterviewerAvailabilityForCandidateView(APIView):
                 start_time__lte=formatted__start_time, end_time__gte=end_time
             )
 
-        interviewer_availability = (
-            interviewer_availability.filter(query)
-            .exclude(interviewer__current_company__iexact=company)
-            .values("id", "date", "start_time", "end_time")
+        interviewer_availability = interviewer_availability.exclude(
+            interviewer__current_company__iexact=company
         )
 
+        if get_boolean(request.query_params, "rank"):
+            interviewer_availability = rank_available_slots(
+                interviewer_availability,
+                skills,
+                candidate_experience=experience,
+                client_level=client_level,
+                date=formatted_date,
+                top_n=top,
+            )
+        else:
+            interviewer_availability = interviewer_availability.values(
+                "id", "date", "start_time", "end_time"
+            )
+
         if not interviewer_availability:
             return Response(
                 {"status": "failed", "message": "No available slots on that date."},
@@ -1022,7 +1229,7 @@ class PotentialInterviewerAvailabilityForCandidateView(APIView):
 
 
 @extend_schema(tags=["Client"])
-class EngagementTemplateView(APIView, LimitOffsetPagination):
+class EngagementTemplateView(APIView, OptionalKeysetPagination):
     permission_classes = [IsAuthenticated, IsClientOwner | IsClientAdmin | IsClientUser]
     serializer_class = EngagementTemplateSerializer
 
@@ -1116,7 +1323,7 @@ class EngagementTemplateView(APIView, LimitOffsetPagination):
 
 
 @extend_schema(tags=["Client"])
-class EngagementView(APIView, LimitOffsetPagination):
+class EngagementView(APIView, OptionalKeysetPagination):
     serializer_class = EngagementSerializer
     permission_classes = [IsAuthenticated, HasRole]
     roles_mapping = {
@@ -1320,7 +1527,7 @@ class EngagementView(APIView, LimitOffsetPagination):
 
 
 @extend_schema(tags=["Client"])
-class EngagementOperationView(APIView, LimitOffsetPagination):
+class EngagementOperationView(APIView, OptionalKeysetPagination):
     serializer_class = EngagementOperationSerializer
     permission_classes = [IsAuthenticated, IsClientAdmin | IsClientOwner | IsClientUser]
 
@@ -1781,62 +1988,39 @@ class ClientDashboardView(APIView):
     def get(self, request):
         organization = request.user.clientuser.organization
 
-        all_jobs = Job.objects.filter(hiring_manager__organization=organization)
-        candidates = Candidate.objects.filter(organization=organization)
         if (
             request.user.role in [Role.CLIENT_USER, Role.AGENCY]
             and request.user.clientuser.accessibility == "AGJ"
         ):
-            all_jobs = all_jobs.filter(clients=request.user.clientuser)
-            candidates = candidates.filter(designation__clients=request.user.clientuser)
-
-        # Job role aggregates
-        job_role_aggregates = all_jobs.values("name").annotate(
-            count=Count(
-                "id",
-                filter=Q(reason_for_archived__isnull=True) | Q(reason_for_archived=""),
+            all_jobs = Job.objects.filter(
+                hiring_manager__organization=organization,
+                clients=request.user.clientuser,
+            )
+            candidates = Candidate.objects.filter(
+                organization=organization,
+                designation__clients=request.user.clientuser,
+            )
+            data = get_client_dashboard_data(all_jobs, candidates)
+            refreshed_at = timezone.now()
+        else:
+            data, refreshed_at = get_snapshot(
+                "CLIENT",
+                lambda: refresh_client_snapshot(organization.id),
+                organization_id=organization.id,
             )
-        )
-
-        # Candidate progress aggregates
-        candidates = candidates.aggregate(
-            total_interviews=Count(
-                "id", filter=Q(status__in=["COMPLETED", "HREC", "REC", "NREC", "SNREC"])
-            ),
-            pending_schedule=Count("id", filter=Q(status="NSCH")),
-            selects=Count("id", filter=Q(final_selection_status="SLD")),
-            joined=Count("id", filter=Q(engagements__status="JND")),
-        )
-
-        # Job aggregation
-        job_aggregates = all_jobs.aggregate(
-            total_jobs=Count("id", distinct=True),
-            total_candidates=Count("candidate"),
-            selects=Count(
-                "candidate", filter=Q(candidate__final_selection_status="SLD")
-            ),
-            rejects=Count(
-                "candidate", filter=Q(candidate__final_selection_status="RJD")
-            ),
-        )
-
-        data = {
-            "job_role_aggregates": list(job_role_aggregates),
-            "candidates": candidates,
-            "job_aggregates": job_aggregates,
-        }
 
         return Response(
             {
                 "status": "success",
                 "message": "Dashboard data fetched successfully.",
                 "data": data,
+                "refreshed_at": refreshed_at,
             },
             status=status.HTTP_200_OK,
         )
 
 
-class FinanceView(APIView, LimitOffsetPagination):
+class FinanceView(APIView, OptionalKeysetPagination):
     serializer_class = FinanceSerializer
     permission_classes = [
         IsAuthenticated,
@@ -1937,9 +2121,7 @@ class FinanceView(APIView, LimitOffsetPagination):
             ).first()
         else:
             if organization_id:
-                billing_log = billing_log.filter(
-                    candidate__organization_id=organization_id
-                )
+                billing_log = billing_log.filter(client_id=organization_id)
             else:
                 billing_log = billing_log.filter(interviewer_id=interviewer_id)
 
@@ -2039,21 +2221,22 @@ class CandidateAnalysisView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # making the candidate queryset
-        candidate = Candidate.objects.filter(
-            organization=organization,
-            designation__id=job_id,
-            created_at__range=(from_date, to_date),
+        daily_analytics, refreshed_at = get_snapshot(
+            "ANALYTICS",
+            lambda: refresh_job_analytics_snapshot(organization.id, job_id),
+            organization_id=organization.id,
+            job_id=job_id,
+        )
+        analytics_data = get_candidate_analytics_for_range(
+            daily_analytics, from_date.date(), to_date.date()
         )
-
-        # Filters provided — return analytics
-        analytics_data = get_candidate_analytics(candidate)
 
         return Response(
             {
                 "status": "success",
                 "message": "Analytics data retrieved successfully.",
                 "data": analytics_data,
+                "refreshed_at": refreshed_at,
             },
             status=status.HTTP_200_OK,
         )
@@ -7,12 +7,16 @@ from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from core.permissions import IsSuperAdmin, IsModerator, IsAdmin
+from hiringdogbackend.pagination import OptionalKeysetPagination
+from ..snapshots import (
+    get_engagement_snapshots,
+    get_snapshot,
+    refresh_internal_snapshot,
+)
 from ..models import (
     InternalClient,
     InternalInterviewer,
     Agreement,
-    Job,
-    Candidate,
     ClientUser,
     HDIPUsers,
     DesignationDomain,
@@ -52,7 +56,7 @@ class InternalClientDomainView(APIView, LimitOffsetPagination):
         )
 
 
-class InternalEngagementView(APIView, LimitOffsetPagination):
+class InternalEngagementView(APIView, OptionalKeysetPagination):
     permission_classes = [IsAuthenticated, IsModerator | IsSuperAdmin | IsAdmin]
 
     def get(self, request):
@@ -60,7 +64,7 @@ class InternalEngagementView(APIView, LimitOffsetPagination):
         status_ = request.query_params.get("status")
         search_term = request.query_params.get("q")
 
-        qs = Organization.objects.prefetch_related("candidate").order_by("-id")
+        qs = Organization.objects.order_by("-id")
 
         if domains:
             qs = qs.filter(internal_client__domain__in=domains.split(","))
@@ -74,52 +78,30 @@ class InternalEngagementView(APIView, LimitOffsetPagination):
         if search_term:
             qs = qs.filter(name__icontains=search_term.lower())
 
-        # Annotate each organization with candidate engagement details
-        qs = qs.annotate(
-            active_candidates=Count(
-                "candidate",
-                filter=Q(candidate__final_selection_status="SLD"),
-                distinct=True,
-            ),  # Count of candidates per organization
-            scheduled=Count(
-                "candidate",
-                filter=Q(candidate__engagements__isnull=False)
-                & Q(candidate__final_selection_status="SLD"),
-                distinct=True,
-            ),
-            pending_scheduled=Count(
-                "candidate",
-                filter=Q(candidate__engagements__isnull=True)
-                & Q(candidate__final_selection_status="SLD"),
-                distinct=True,
-            ),
+        # Paginate the organizations, the engagement counts come from the snapshots
+        paginated_qs = self.paginate_queryset(qs.values("id", "name"), request)
+        engagement_counts, refreshed_at = get_engagement_snapshots(
+            [organization["id"] for organization in paginated_qs]
         )
-
-        # Select the fields to return
-        qs_values = qs.values(
-            "id",
-            "name",
-            "active_candidates",
-            "scheduled",
-            "pending_scheduled",
-            # Add other fields as needed
+        paginated_response = self.get_paginated_response(
+            [
+                {**organization, **engagement_counts.get(organization["id"], {})}
+                for organization in paginated_qs
+            ]
         )
 
-        # Paginate the queryset
-        paginated_qs = self.paginate_queryset(qs_values, request)
-        paginated_response = self.get_paginated_response(paginated_qs)
-
         return Response(
             {
                 "status": "success",
                 "message": "Successfully retrieved engagements",
                 **paginated_response.data,
+                "refreshed_at": refreshed_at,
             }
         )
 
 
 @extend_schema(tags=["Internal"])
-class InternalClientView(APIView, LimitOffsetPagination):
+class InternalClientView(APIView, OptionalKeysetPagination):
     serializer_class = InternalClientSerializer
     permission_classes = [IsAuthenticated, IsSuperAdmin | IsModerator | IsAdmin]
 
@@ -291,7 +273,7 @@ class InternalClientDetailsView(APIView):
 
 
 @extend_schema(tags=["Internal"])
-class InterviewerView(APIView, LimitOffsetPagination):
+class InterviewerView(APIView, OptionalKeysetPagination):
     serializer_class = InterviewerSerializer
     permission_classes = [IsAuthenticated, IsModerator | IsSuperAdmin | IsAdmin]
 
@@ -533,7 +515,7 @@ class DomainDesignationView(APIView, LimitOffsetPagination):
 
 
 @extend_schema(tags=["Internal"])
-class OrganizationAgreementView(APIView, LimitOffsetPagination):
+class OrganizationAgreementView(APIView, OptionalKeysetPagination):
     serializer_class = OrganizationAgreementSerializer
     permission_classes = [IsAuthenticated, IsSuperAdmin | IsModerator | IsAdmin]
 
@@ -626,9 +608,9 @@ class OrganizationAgreementDetailView(APIView):
     serializer_class = OrganizationAgreementSerializer
     permission_classes = [IsAuthenticated, IsSuperAdmin | IsModerator | IsAdmin]
 
-    def get(self, request, pk):
+    def get(self, request, organization_id):
         try:
-            agreement = Organization.objects.get(pk=pk)
+            agreement = Organization.objects.get(pk=organization_id)
         except Organization.DoesNotExist:
             return Response(
                 {"errors": "Agreement not found"}, status=status.HTTP_404_NOT_FOUND
@@ -705,7 +687,7 @@ class OrganizationAgreementDetailView(APIView):
         )
 
 
-class OrganizationView(APIView, LimitOffsetPagination):
+class OrganizationView(APIView, OptionalKeysetPagination):
     serializer_class = OrganizationSerializer
     permission_classes = [IsAuthenticated, IsModerator | IsSuperAdmin | IsAdmin]
 
@@ -734,54 +716,16 @@ class InternalDashboardView(APIView):
     permission_classes = (IsAuthenticated, IsModerator | IsSuperAdmin | IsAdmin)
 
     def get(self, request):
-
-        interviewers_stats = InternalInterviewer.objects.aggregate(
-            total=Count("id"),
-            pending_acceptance=Count(
-                "interview_requests", filter=Q(interview_requests__status="pending")
-            ),
-            interview_declined=Count(
-                "interview_requests", filter=Q(interview_requests__status="rejected")
-            ),
-        )
-
-        candidates_stats = Candidate.objects.aggregate(
-            recommended=Count("id", filter=Q(status="recommended")),
-            rejected=Count("id", filter=Q(final_selection_status="rejected")),
-            strong_candidates=Count("id", filter=Q(status="Highly Recommended")),
-            scheduled=Count("id", filter=Q(status="scheduled")),
-        )
-
-        clients_stats = ClientUser.objects.aggregate(
-            active_clients=Count("id", filter=Q(status="Active")),
-            passive_clients=Count("id", filter=Q(status="Inactive")),
-            pending_onboarding=Count("id", filter=Q(status="pending")),
-            client_users=Count("id"),
-        )
-
-        general_stats = InternalInterviewer.objects.aggregate(
-            total_interviewers=Count("id"),
-            new_interviewers=Count("id", filter=Q(created_at__gte="2025-03-01")),
+        response_data, refreshed_at = get_snapshot(
+            "INTERNAL", refresh_internal_snapshot
         )
 
-        active_jobs = Job.objects.filter(reason_for_archived=False).count()
-        total_candidates = Candidate.objects.count()
-
-        response_data = {
-            "interviewers": {**interviewers_stats, **candidates_stats},
-            "clients": clients_stats,
-            "details": {
-                **general_stats,
-                "active_jobs": active_jobs,
-                "total_candidates": total_candidates,
-            },
-        }
-
         return Response(
             {
                 "status": "success",
                 "message": "Internal data retrieved successfully.",
                 "data": response_data,
+                "refreshed_at": refreshed_at,
             },
             status=status.HTTP_200_OK,
         )
@@ -888,7 +832,7 @@ class InternalClientUserView(APIView, LimitOffsetPagination):
         )
 
 
-class HDIPUsersViews(APIView, LimitOffsetPagination):
+class HDIPUsersViews(APIView, OptionalKeysetPagination):
     serializer_class = HDIPUsersSerializer
     permission_classes = [IsAuthenticated, IsSuperAdmin | IsModerator | IsAdmin]
 
@@ -1,12 +1,9 @@
 import datetime
+import logging
 from django.db import transaction
-from django.db.models import Q
 from django.db.utils import IntegrityError
 from django.conf import settings
 from django.utils import timezone
-from django.utils.encoding import force_bytes, force_str
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.core.exceptions import ObjectDoesNotExist
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.response import Response
@@ -25,8 +22,16 @@ from ..models import (
     Interview,
     InterviewFeedback,
     InterviewScheduleAttempt,
+    SchedulingOffer,
+    InternalInterviewer,
 )
-from ..tasks import send_email_to_multiple_recipients, download_feedback_pdf, send_mail
+from ..tasks import (
+    send_email_to_multiple_recipients,
+    download_feedback_pdf,
+    send_mail,
+    create_interview_meeting,
+)
+from ..slots import InterviewerDay
 from core.permissions import (
     IsInterviewer,
     IsClientAdmin,
@@ -37,8 +42,8 @@ from core.permissions import (
 )
 from core.models import OAuthToken, Role
 from externals.google.google_calendar import GoogleCalendar
-from externals.google.google_meet import create_meet_and_calendar_invite
 from hiringdogbackend.utils import get_boolean
+from hiringdogbackend.pagination import OptionalKeysetPagination
 
 
 CONTACT_EMAIL = settings.EMAIL_HOST_USER if settings.DEBUG else settings.CONTACT_EMAIL
@@ -46,6 +51,8 @@ INTERVIEW_EMAIL = (
     settings.EMAIL_HOST_USER if settings.DEBUG else settings.INTERVIEW_EMAIL
 )
 
+logger = logging.getLogger(__name__)
+
 
 @extend_schema(tags=["Interviewer"])
 class InterviewerAvailabilityView(APIView, LimitOffsetPagination):
@@ -181,7 +188,6 @@ class InterviewerReqeustView(APIView):
                 data=request.data, context={"request": request}
             )
             if serializer.is_valid():
-                candidate_id = serializer.validated_data["candidate_id"]
                 interviewer_ids = serializer.validated_data["interviewer_ids"]
                 candidate = serializer.validated_data.pop("candidate_obj")
                 contexts = []
@@ -202,10 +208,14 @@ class InterviewerReqeustView(APIView):
                     interview_obj.status = "RESCH"
                     scheduled_time = interview_obj.scheduled_time
                     interviewer = interview_obj.interviewer
-                    if hasattr(interview_obj, "availability"):
-                        interview_obj.availability.booked_by = None
-                        interview_obj.availability.is_scheduled = False
-                        interview_obj.availability.save()
+                    if interview_obj.availability:
+                        availability = interview_obj.availability
+                        InterviewerDay.load(
+                            availability.interviewer_id,
+                            availability.date,
+                            lock=True,
+                            with_interviews=False,
+                        ).release(availability)
                     interview_obj.save()
                     candidate.save()
 
@@ -236,18 +246,33 @@ class InterviewerReqeustView(APIView):
                         .strftime("%I:%M %p"),
                     )
 
-                for interviewer_obj in InterviewerAvailability.objects.filter(
-                    pk__in=interviewer_ids, booked_by__isnull=True
-                ).select_related("interviewer"):
-                    schedule_datetime = datetime.datetime.combine(
+                # offers of earlier attempts for this candidate can no longer be taken
+                SchedulingOffer.objects.filter(
+                    scheduling_attempt__candidate=candidate, status="PED"
+                ).update(status="INV")
+
+                schedule_time = timezone.make_aware(
+                    datetime.datetime.combine(
                         serializer.validated_data.get("date"),
                         serializer.validated_data.get("time"),
                     )
-                    data = f"interviewer_avialability_id:{interviewer_obj.id};candidate_id:{candidate_id};schedule_time:{schedule_datetime};booked_by:{request.user.id};expired_time:{datetime.datetime.now()+datetime.timedelta(hours=1)};scheduling_id:{scheduling_attempt.id}"
-                    accept_data = data + ";action:accept"
-                    reject_data = data + ";action:reject"
-                    accept_uid = urlsafe_base64_encode(force_bytes(accept_data))
-                    reject_uid = urlsafe_base64_encode(force_bytes(reject_data))
+                )
+                offers = SchedulingOffer.objects.bulk_create(
+                    [
+                        SchedulingOffer(
+                            scheduling_attempt=scheduling_attempt,
+                            availability=interviewer_obj,
+                            scheduled_time=schedule_time,
+                            booked_by=request.user,
+                            expires_at=timezone.now() + datetime.timedelta(hours=1),
+                        )
+                        for interviewer_obj in InterviewerAvailability.objects.filter(
+                            pk__in=interviewer_ids, booked_by__isnull=True
+                        ).select_related("interviewer")
+                    ]
+                )
+                for offer in offers:
+                    interviewer_obj = offer.availability
                     context = {
                         "name": interviewer_obj.interviewer.name,
                         "email": interviewer_obj.interviewer.email,
@@ -255,8 +280,8 @@ class InterviewerReqeustView(APIView):
                         "interview_time": serializer.validated_data["time"],
                         "position": candidate.designation.get_name_display(),
                         "site_domain": settings.SITE_DOMAIN,
-                        "accept_link": "/confirmation/{}/".format(accept_uid),
-                        "reject_link": "/confirmation/{}/".format(reject_uid),
+                        "accept_link": "/confirmation/{}.accept/".format(offer.token),
+                        "reject_link": "/confirmation/{}.reject/".format(offer.token),
                         "from_email": INTERVIEW_EMAIL,
                     }
                     contexts.append(context)
@@ -292,312 +317,215 @@ class InterviewerReqeustView(APIView):
 class InterviewerRequestResponseView(APIView):
     serializer_class = None
 
+    def get_invalid_offer_message(self, token):
+        offer = SchedulingOffer.objects.filter(token=token).first()
+        if not offer:
+            return "Invalid Request ID format."
+        if offer.status == "INV":
+            return "This interview schedule has expired or was cancelled."
+        if offer.status != "PED":
+            return "This request has already been answered."
+        return "Request expired"
+
+    def failed(self, message):
+        return Response(
+            {"status": "failed", "message": message},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
     def post(self, request, request_id):
         try:
-            with transaction.atomic():
-                try:
-                    decode_data = force_str(urlsafe_base64_decode(request_id))
-                    data_parts = decode_data.split(";")
-                    if len(data_parts) != 7:
-                        raise ValueError("Invalid data format")
-
-                    (
-                        interviewer_availability_id,
-                        candidate_id,
-                        schedule_time,
-                        booked_by,
-                        expired_time,
-                        scheduling_id,
-                        action,
-                    ) = [item.split(":", 1)[1] for item in data_parts]
-                except Exception:
-                    return Response(
-                        {"status": "failed", "message": "Invalid Request ID format."},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                expired_time = datetime.datetime.strptime(
-                    expired_time, "%Y-%m-%d %H:%M:%S.%f"
+            token, _, action = request_id.rpartition(".")
+            if action not in ["accept", "reject"]:
+                return self.failed("Invalid Request ID format.")
+
+            offer = (
+                SchedulingOffer.objects.select_related(
+                    "availability",
+                    "availability__interviewer",
+                    "scheduling_attempt__candidate",
                 )
-                if datetime.datetime.now() > expired_time:
-                    return Response(
-                        {"status": "failed", "message": "Request expired"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
+                .filter(token=token, status="PED", expires_at__gt=timezone.now())
+                .first()
+            )
+            if not offer:
+                return self.failed(self.get_invalid_offer_message(token))
 
-                interviewer_availability = (
-                    InterviewerAvailability.objects.select_for_update()
-                    .filter(pk=interviewer_availability_id)
-                    .first()
-                )
-                candidate = (
-                    Candidate.objects.select_for_update()
-                    .filter(pk=candidate_id)
-                    .first()
+            interviewer_availability = offer.availability
+            candidate = offer.scheduling_attempt.candidate
+            schedule_time = timezone.localtime(offer.scheduled_time)
+            booked_by = offer.booked_by_id
+
+            if action == "reject":
+                if not SchedulingOffer.objects.filter(pk=offer.pk, status="PED").update(
+                    status="REJ"
+                ):
+                    return self.failed(self.get_invalid_offer_message(token))
+                return Response(
+                    {"status": "success", "message": "Interview Rejected"},
+                    status=status.HTTP_200_OK,
                 )
 
-                if candidate.status == "SCH":
-                    try:
-                        scheduling_attempts = candidate.scheduling_attempts.latest(
-                            "created_at"
-                        )
-                    except ObjectDoesNotExist:
-                        scheduling_attempts = None
-                    if scheduling_attempts and scheduling_id != str(
-                        scheduling_attempts.id
-                    ):
-                        return Response(
-                            {
-                                "status": "failed",
-                                "message": "This interview schedule has expired or was cancelled.",
-                            },
-                            status=status.HTTP_400_BAD_REQUEST,
-                        )
+            if candidate.status == "CSCH":
+                return self.failed(
+                    "The candidate is currently occupied and has already been assigned to an interviewer."
+                )
 
-                if not interviewer_availability or not candidate:
-                    return Response(
-                        {
-                            "status": "failed",
-                            "message": "Invalid Interviewer or Candidate.",
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
+            if candidate.status not in ["SCH", "NSCH"]:
+                return self.failed("Invalid request")
 
-                if candidate.status == "CSCH":
-                    return Response(
-                        {
-                            "status": "failed",
-                            "message": "The candidate is currently occupied and has already been assigned to an interviewer.",
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
+            # The offer, the candidate and the slot are claimed with conditional
+            # UPDATEs, the first request to change a row wins and the others
+            # match nothing and roll back. Concurrent accepts for one candidate
+            # only wait for the winner's short transaction.
+            with transaction.atomic():
+                if not SchedulingOffer.objects.filter(pk=offer.pk, status="PED").update(
+                    status="ACC"
+                ):
+                    message = self.get_invalid_offer_message(token)
+                    transaction.set_rollback(True)
+                    return self.failed(message)
 
-                if candidate.status not in ["SCH", "NSCH"]:
-                    return Response(
-                        {"status": "failed", "message": "Invalid request"},
-                        status=status.HTTP_400_BAD_REQUEST,
+                if not Candidate.objects.filter(
+                    pk=candidate.pk, status__in=["SCH", "NSCH"]
+                ).update(status="CSCH"):
+                    transaction.set_rollback(True)
+                    return self.failed(
+                        "The candidate is currently occupied and has already been assigned to an interviewer."
                     )
 
-                schedule_time = datetime.datetime.strptime(
-                    schedule_time, "%Y-%m-%d %H:%M:%S"
-                )
-                schedule_time = timezone.make_aware(schedule_time)
-
-                # To handle multiple interview requests from different clients to the same interviewer scenario
-                schedule_time_after_one_hour = schedule_time + datetime.timedelta(
-                    hours=1
+                if not InterviewerAvailability.objects.filter(
+                    pk=interviewer_availability.pk, booked_by__isnull=True
+                ).update(booked_by_id=booked_by, is_scheduled=True):
+                    transaction.set_rollback(True)
+                    return self.failed("This slot has already been booked.")
+
+                # Two accepts for the same interviewer on different slots claim
+                # different rows, so the gap between their interviews is checked
+                # with the interviewer row locked. No constraint can replace the
+                # lock: interviews start at any minute and MySQL has no exclusion
+                # constraint over time ranges. Locking the interviews found does
+                # not stop another accept from inserting one next to them, since
+                # MySQL runs Django's transactions in READ COMMITTED, which takes
+                # no gap locks. Only accepts for the same interviewer wait for
+                # each other, and only during these few writes: the Meet and the
+                # emails run after the commit. The day's slots are locked as well
+                # because book() splits them.
+                interviewer = InternalInterviewer.objects.select_for_update().get(
+                    pk=interviewer_availability.interviewer_id
                 )
-                schedule_time_before_one_hour = schedule_time - datetime.timedelta(
-                    hours=1
+                interviewer_day = InterviewerDay.load(
+                    interviewer, interviewer_availability.date, lock=True
                 )
-                if (
-                    Interview.objects.select_for_update()
-                    .filter(
-                        interviewer=interviewer_availability.interviewer,
-                        status="CSCH",
-                    )
-                    .filter(
-                        Q(scheduled_time=schedule_time)
-                        | Q(
-                            scheduled_time__gte=schedule_time_before_one_hour,
-                            scheduled_time__lt=schedule_time,
-                        )
-                        | Q(
-                            scheduled_time__lte=schedule_time_after_one_hour,
-                            scheduled_time__gt=schedule_time,
-                        )
-                    )
-                    .exists()
-                ):
-                    return Response(
-                        {
-                            "status": "failed",
-                            "message": "There must be a 1-hour gap between two consecutive scheduled interviews.",
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
+                if not interviewer_day.has_gap(schedule_time):
+                    transaction.set_rollback(True)
+                    return self.failed(
+                        "There must be a 1-hour gap between two consecutive scheduled interviews."
                     )
 
-                if action == "accept":
-                    try:
-                        interview_obj = (
-                            Interview.objects.select_for_update()
-                            .filter(candidate=candidate)
-                            .order_by("-id")
-                            .first()
-                        )
-
+                try:
+                    # the unique (interviewer, scheduled_time) settles two
+                    # bookings of the same interviewer at the same time
+                    with transaction.atomic():
                         interview = Interview.objects.create(
                             candidate=candidate,
                             interviewer=interviewer_availability.interviewer,
                             status="CSCH",
                             scheduled_time=schedule_time,
                             total_score=100,
-                            previous_interview=interview_obj,
-                            availability=interviewer_availability,
-                        )
-                    except IntegrityError as e:
-                        print(str(e))
-                        return Response(
-                            {
-                                "status": "failed",
-                                "message": "Interviewer already has a scheduled interview at this time.",
-                            },
-                            status=status.HTTP_400_BAD_REQUEST,
-                        )
-                    interviewer_availability.booked_by_id = booked_by
-                    interviewer_availability.is_scheduled = True
-
-                    original_start_time = interviewer_availability.start_time
-                    original_end_time = interviewer_availability.end_time
-
-                    # updating with the booked time
-                    interviewer_availability.start_time = schedule_time.time()
-                    interviewer_availability.end_time = (
-                        schedule_time + datetime.timedelta(hours=1)
-                    ).time()
-                    interviewer_availability.save()
-
-                    # creating new available instance for if interviewer is futher available with 1hour before and after time gap
-                    original_availability_date = interviewer_availability.date
-                    new_slots = []
-                    before_slot_end = (
-                        schedule_time - datetime.timedelta(hours=1)
-                    ).time()
-                    before_slot_start = original_start_time
-                    before_slot_end_dt = datetime.datetime.combine(
-                        original_availability_date, before_slot_end
-                    )
-                    before_slot_start_dt = datetime.datetime.combine(
-                        original_availability_date, before_slot_start
-                    )
-                    if (
-                        before_slot_end_dt - before_slot_start_dt
-                    ) >= datetime.timedelta(hours=1):
-                        new_slots.append(
-                            InterviewerAvailability(
-                                interviewer=interviewer_availability.interviewer,
-                                date=interviewer_availability.date,
-                                start_time=before_slot_start,
-                                end_time=before_slot_end,
-                                google_calendar_id=interviewer_availability.google_calendar_id,
+                            previous_interview=Interview.objects.filter(
+                                candidate=candidate
                             )
+                            .order_by("-id")
+                            .first(),
+                            availability=interviewer_availability,
                         )
-                    after_slot_start = (
-                        schedule_time + datetime.timedelta(hours=2)
-                    ).time()
-                    after_slot_end = original_end_time
-
-                    after_slot_start_dt = datetime.datetime.combine(
-                        original_availability_date, after_slot_start
+                except IntegrityError:
+                    logger.exception(
+                        "Offer %s clashed with a booking at the same time", offer.pk
                     )
-                    after_slot_end_dt = datetime.datetime.combine(
-                        original_availability_date, after_slot_end
+                    transaction.set_rollback(True)
+                    return self.failed(
+                        "Interviewer already has a scheduled interview at this time."
                     )
-                    if (after_slot_end_dt - after_slot_start_dt) >= datetime.timedelta(
-                        hours=1
-                    ):
-                        new_slots.append(
-                            InterviewerAvailability(
-                                interviewer=interviewer_availability.interviewer,
-                                date=interviewer_availability.date,
-                                start_time=after_slot_start,
-                                end_time=after_slot_end,
-                                google_calendar_id=interviewer_availability.google_calendar_id,
-                            )
-                        )
 
-                    InterviewerAvailability.objects.bulk_create(new_slots)
+                # narrows the slot to the interview and offers the rest of it
+                interviewer_day.book(interviewer_availability, schedule_time, booked_by)
 
-                    # sending the confirmation notification
-                    interview_date = schedule_time.date().strftime("%d/%m/%Y")
-                    interview_time = schedule_time.time().strftime("%H:%M:%S")
+                # the other interviewers' offers for this attempt are withdrawn
+                SchedulingOffer.objects.filter(
+                    scheduling_attempt_id=offer.scheduling_attempt_id, status="PED"
+                ).update(status="INV")
 
-                    meeting_link, event_id = create_meet_and_calendar_invite(
-                        interviewer_availability.interviewer.email,
-                        candidate.email,
-                        schedule_time,
-                        schedule_time + datetime.timedelta(hours=1),
-                        candidate_name=candidate.name,
-                        designation_name=candidate.designation.get_name_display(),
-                    )
-
-                    interview.scheduled_service_account_event_id = event_id
-                    interview.meeting_link = meeting_link
-                    interview.save()
-
-                    internal_user = candidate.organization.internal_client.assigned_to
+                # sending the confirmation notification
+                interview_date = schedule_time.date().strftime("%d/%m/%Y")
+                interview_time = schedule_time.time().strftime("%H:%M:%S")
 
-                    contexts = [
-                        {
-                            "name": candidate.name,
-                            "position": candidate.designation.get_name_display(),
-                            "company_name": candidate.organization.name,
-                            "interview_date": interview_date,
-                            "interview_time": interview_time,
-                            "interviewer": interviewer_availability.interviewer.name,
-                            "email": candidate.email,
-                            "template": "interview_confirmation_candidate_notification.html",
-                            "recruiter_email": candidate.added_by.user.email,
-                            "subject": f"Interview Scheduled - {candidate.designation.get_name_display()}",
-                            "meeting_link": meeting_link,
-                            "from_email": INTERVIEW_EMAIL,
-                        },
-                        {
-                            "name": interviewer_availability.interviewer.name,
-                            "position": candidate.designation.get_name_display(),
-                            "interview_date": interview_date,
-                            "interview_time": interview_time,
-                            "candidate": candidate.name,
-                            "email": interviewer_availability.interviewer.email,
-                            "template": "interview_confirmation_interviewer_notification.html",
-                            "subject": f"Interview Assigned - {candidate.name}",
-                            "meeting_link": meeting_link,
-                            "from_email": INTERVIEW_EMAIL,
-                        },
-                        {
-                            "name": candidate.organization.name,
-                            "position": candidate.designation.get_name_display(),
-                            "interview_date": interview_date,
-                            "interview_time": interview_time,
-                            "candidate": candidate.name,
-                            "email": getattr(
-                                getattr(candidate.added_by, "user", None),
-                                "email",
-                                candidate.designation.hiring_manager.user.email,
-                            ),
-                            "template": "interview_confirmation_client_notification.html",
-                            "subject": f"Interview Scheduled - {candidate.name}",
-                            "meeting_link": meeting_link,
-                            "from_email": INTERVIEW_EMAIL,
-                        },
-                        {
-                            "organization_name": candidate.organization.name,
-                            "internal_user_name": internal_user.name,
-                            "position": candidate.designation.get_name_display(),
-                            "interview_date": interview_date,
-                            "interview_time": interview_time,
-                            "candidate_name": candidate.name,
-                            "email": internal_user.user.email,
-                            "template": "internal_interview_scheduling_confirmation.html",
-                            "subject": f"Interview Scheduled - {candidate.name}",
-                            "meeting_link": meeting_link,
-                            "from_email": INTERVIEW_EMAIL,
-                        },
-                    ]
+                internal_user = candidate.organization.internal_client.assigned_to
 
-                    send_email_to_multiple_recipients.delay(
-                        contexts,
-                        "",
-                        "",
-                    )
+                contexts = [
+                    {
+                        "name": candidate.name,
+                        "position": candidate.designation.get_name_display(),
+                        "company_name": candidate.organization.name,
+                        "interview_date": interview_date,
+                        "interview_time": interview_time,
+                        "interviewer": interviewer_availability.interviewer.name,
+                        "email": candidate.email,
+                        "template": "interview_confirmation_candidate_notification.html",
+                        "recruiter_email": candidate.added_by.user.email,
+                        "subject": f"Interview Scheduled - {candidate.designation.get_name_display()}",
+                        "from_email": INTERVIEW_EMAIL,
+                    },
+                    {
+                        "name": interviewer_availability.interviewer.name,
+                        "position": candidate.designation.get_name_display(),
+                        "interview_date": interview_date,
+                        "interview_time": interview_time,
+                        "candidate": candidate.name,
+                        "email": interviewer_availability.interviewer.email,
+                        "template": "interview_confirmation_interviewer_notification.html",
+                        "subject": f"Interview Assigned - {candidate.name}",
+                        "from_email": INTERVIEW_EMAIL,
+                    },
+                    {
+                        "name": candidate.organization.name,
+                        "position": candidate.designation.get_name_display(),
+                        "interview_date": interview_date,
+                        "interview_time": interview_time,
+                        "candidate": candidate.name,
+                        "email": getattr(
+                            getattr(candidate.added_by, "user", None),
+                            "email",
+                            candidate.designation.hiring_manager.user.email,
+                        ),
+                        "template": "interview_confirmation_client_notification.html",
+                        "subject": f"Interview Scheduled - {candidate.name}",
+                        "from_email": INTERVIEW_EMAIL,
+                    },
+                    {
+                        "organization_name": candidate.organization.name,
+                        "internal_user_name": internal_user.name,
+                        "position": candidate.designation.get_name_display(),
+                        "interview_date": interview_date,
+                        "interview_time": interview_time,
+                        "candidate_name": candidate.name,
+                        "email": internal_user.user.email,
+                        "template": "internal_interview_scheduling_confirmation.html",
+                        "subject": f"Interview Scheduled - {candidate.name}",
+                        "from_email": INTERVIEW_EMAIL,
+                    },
+                ]
 
-                    return Response(
-                        {"status": "success", "message": "Interview Confirmed"},
-                        status=status.HTTP_200_OK,
-                    )
+                # the Meet is created after the booking commits, no lock is
+                # held during the Google Calendar call. The task sends the
+                # confirmations once the meeting link is known
+                transaction.on_commit(
+                    lambda: create_interview_meeting.delay(interview.id, contexts)
+                )
 
                 return Response(
-                    {"status": "success", "message": "Interview Rejected"},
+                    {"status": "success", "message": "Interview Confirmed"},
                     status=status.HTTP_200_OK,
                 )
         except Exception as e:
@@ -607,7 +535,7 @@ class InterviewerRequestResponseView(APIView):
             )
 
 
-class InterviewerAcceptedInterviewsView(APIView, LimitOffsetPagination):
+class InterviewerAcceptedInterviewsView(APIView, OptionalKeysetPagination):
     serializer_class = InterviewerDashboardSerializer
     permission_classes = (IsAuthenticated, IsInterviewer)
 
@@ -630,7 +558,7 @@ class InterviewerAcceptedInterviewsView(APIView, LimitOffsetPagination):
         )
 
 
-class InterviewerPendingFeedbackView(APIView, LimitOffsetPagination):
+class InterviewerPendingFeedbackView(APIView, OptionalKeysetPagination):
     serializer_class = InterviewerDashboardSerializer
     permission_classes = (IsAuthenticated, IsInterviewer)
 
@@ -653,7 +581,7 @@ class InterviewerPendingFeedbackView(APIView, LimitOffsetPagination):
         )
 
 
-class InterviewerInterviewHistoryView(APIView, LimitOffsetPagination):
+class InterviewerInterviewHistoryView(APIView, OptionalKeysetPagination):
     serializer_class = InterviewerDashboardSerializer
     permission_classes = (IsAuthenticated, IsInterviewer)
 
@@ -4,6 +4,7 @@ from .ClientViews import (
     JobView,
     ResumeParserView,
     CandidateView,
+    CandidateImportView,
     PotentialInterviewerAvailabilityForCandidateView,
     EngagementTemplateView,
     EngagementView,
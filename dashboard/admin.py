@@ -32,8 +32,10 @@ class InterviewAdmin(admin.ModelAdmin):
         "created_at",
         "scheduled_time",
         "status",
+        "meeting_failed",
     )
     list_filter = (
+        "meeting_failed",
         "interviewer__name",
         "candidate__organization__internal_client__name",
     )
@@ -0,0 +1,148 @@
+import codecs
+import csv
+from django.conf import settings
+from django.db import transaction
+from openpyxl import load_workbook
+from .models import Candidate, CandidateStatusCounter, Job
+from .serializer import CandidateImportRowSerializer
+from .snapshots import schedule_snapshot_refresh
+
+IMPORT_BATCH_SIZE = getattr(settings, "CANDIDATE_IMPORT_BATCH_SIZE", 500)
+# rows beyond this many errors are still counted but not reported one by one
+MAX_REPORTED_ERRORS = getattr(settings, "CANDIDATE_IMPORT_MAX_REPORTED_ERRORS", 1000)
+
+
+def normalize_header(value):
+    return str(value or "").strip().lower().replace(" ", "_")
+
+
+def normalize_value(value):
+    if isinstance(value, float) and value.is_integer():
+        # spreadsheets hand back numbers such as phone and year as floats
+        value = int(value)
+    value = str(value).strip() if value is not None else ""
+    return value or None
+
+
+def read_rows(file):
+    """
+    Yield (row_number, row) for each non empty data row of a CSV or XLSX file.
+    The file is read as a stream, row numbers match the ones shown by a
+    spreadsheet (the header is row 1).
+    """
+    if file.name.lower().endswith(".xlsx"):
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [normalize_header(value) for value in next(rows, ())]
+            for row_number, values in enumerate(rows, start=2):
+                if any(value not in (None, "") for value in values):
+                    yield row_number, dict(zip(header, values))
+        finally:
+            workbook.close()
+    else:
+        reader = csv.reader(codecs.iterdecode(file, "utf-8-sig"))
+        header = [normalize_header(value) for value in next(reader, [])]
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield reader.line_num, dict(zip(header, values))
+
+
+def get_job_map(organization_id):
+    """Jobs of the organization keyed by primary key and by the client's job reference"""
+    jobs = Job.objects.filter(hiring_manager__organization_id=organization_id).only(
+        "id", "job_id", "is_diversity_hiring"
+    )
+    job_map = {}
+    for job in jobs:
+        if job.job_id:
+            job_map[job.job_id] = job
+        job_map[job.id] = job
+    return job_map
+
+
+def import_batch(import_job, batch, job_map):
+    candidates, errors = [], []
+    for row_number, row in batch:
+        data = {
+            key: value
+            for key, value in (
+                (key, normalize_value(value)) for key, value in row.items()
+            )
+            if key and value is not None
+        }
+        serializer = CandidateImportRowSerializer(data=data, context={"jobs": job_map})
+        if serializer.is_valid():
+            candidates.append(
+                Candidate(
+                    **serializer.validated_data,
+                    organization_id=import_job.organization_id,
+                    added_by_id=import_job.created_by_id,
+                )
+            )
+        else:
+            errors.append(
+                {
+                    "row": row_number,
+                    "errors": {
+                        field: [str(message) for message in messages]
+                        for field, messages in serializer.errors.items()
+                    },
+                }
+            )
+
+    with transaction.atomic():
+        Candidate.objects.bulk_create(candidates, batch_size=IMPORT_BATCH_SIZE)
+        import_job.processed_rows += len(batch)
+        import_job.created_count += len(candidates)
+        import_job.error_count += len(errors)
+        import_job.errors.extend(
+            errors[: max(MAX_REPORTED_ERRORS - len(import_job.errors), 0)]
+        )
+        import_job.save(
+            update_fields=[
+                "processed_rows",
+                "created_count",
+                "error_count",
+                "errors",
+                "updated_at",
+            ]
+        )
+    return {candidate.designation_id for candidate in candidates}
+
+
+def run_candidate_import(import_job):
+    import_job.status = "PRG"
+    import_job.save(update_fields=["status", "updated_at"])
+
+    job_map = get_job_map(import_job.organization_id)
+    touched_jobs = set()
+    try:
+        with import_job.file.open("rb") as file:
+            batch = []
+            for row in read_rows(file):
+                batch.append(row)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    touched_jobs |= import_batch(import_job, batch, job_map)
+                    batch = []
+            if batch:
+                touched_jobs |= import_batch(import_job, batch, job_map)
+    except Exception as e:
+        import_job.status = "FLD"
+        import_job.failure_reason = str(e)
+    else:
+        import_job.status = "CMP"
+    finally:
+        # bulk_create skips the signals keeping these up to date
+        if import_job.created_count:
+            CandidateStatusCounter.rebuild(import_job.organization_id)
+            schedule_snapshot_refresh(
+                [import_job.organization_id],
+                [(import_job.organization_id, job_id) for job_id in touched_jobs],
+            )
+
+    import_job.total_rows = import_job.processed_rows
+    import_job.save(
+        update_fields=["status", "failure_reason", "total_rows", "updated_at"]
+    )
+    return import_job
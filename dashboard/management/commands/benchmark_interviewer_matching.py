@@ -0,0 +1,193 @@
+import datetime
+import random
+import statistics
+import time
+from typing import Any
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from core.models import User, Role
+from dashboard.models import (
+    DesignationDomain,
+    InternalInterviewer,
+    InterviewerAvailability,
+    InterviewerSkill,
+)
+
+SKILL_POOL = [
+    "python", "java", "go", "rust", "c++", "c#", "javascript", "typescript",
+    "react", "angular", "vue", "node.js", "django", "flask", "spring",
+    "kubernetes", "docker", "aws", "gcp", "azure", "terraform", "sql",
+    "postgresql", "mysql", "mongodb", "redis", "kafka", "spark", "airflow",
+    "pytorch", "tensorflow", "selenium", "swift", "kotlin", "flutter",
+]  # fmt: skip
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark slot matching with the JSON skills scan against the "
+        "interviewer skill index. Synthetic data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interviewers", type=int, default=10000)
+        parser.add_argument("--availability", type=int, default=100000)
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args: Any, **options: Any):
+        random.seed(options["seed"])
+        try:
+            with transaction.atomic():
+                domain, start_date = self.seed(options)
+                results = self.run(domain, start_date, options)
+                raise Rollback
+        except Rollback:
+            pass
+
+        for name, timings in results.items():
+            self.stdout.write(
+                f"{name:<8} rows={timings['rows']:<6} "
+                f"p50={timings['p50']:.2f}ms p95={timings['p95']:.2f}ms "
+                f"max={timings['max']:.2f}ms"
+            )
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, data rolled back."))
+
+    def seed(self, options):
+        total_interviewers = options["interviewers"]
+        domain, _ = DesignationDomain.objects.get_or_create(name="SDE_II")
+        strengths = [key for key, _ in InternalInterviewer.STRENGTH_CHOICES]
+
+        offset = User.objects.count()
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f"bench-interviewer-{offset + i}@example.com",
+                    phone=f"+91{7000000000 + offset + i}",
+                    role=Role.INTERVIEWER,
+                )
+                for i in range(total_interviewers)
+            ],
+            batch_size=1000,
+        )
+        interviewers = InternalInterviewer.objects.bulk_create(
+            [
+                InternalInterviewer(
+                    user=user,
+                    name=f"Interviewer {i}",
+                    email=user.email,
+                    phone_number=user.phone,
+                    current_company=f"Company {i % 50}",
+                    total_experience_years=random.randint(2, 20),
+                    interview_experience_years=1,
+                    strength=random.choice(strengths),
+                    interviewer_level=random.randint(1, 3),
+                    skills=random.sample(SKILL_POOL, random.randint(2, 8)),
+                )
+                for i, user in enumerate(users)
+            ],
+            batch_size=1000,
+        )
+        through = InternalInterviewer.assigned_domains.through
+        through.objects.bulk_create(
+            [
+                through(internalinterviewer_id=interviewer.id, designationdomain=domain)
+                for interviewer in interviewers
+            ],
+            batch_size=1000,
+        )
+        InterviewerSkill.objects.bulk_create(
+            [
+                InterviewerSkill(interviewer=interviewer, skill=skill)
+                for interviewer in interviewers
+                for skill in InterviewerSkill.normalize(interviewer.skills)
+            ],
+            batch_size=1000,
+        )
+
+        start_date = datetime.date.today() + datetime.timedelta(days=1)
+        slots = set()
+        while len(slots) < options["availability"]:
+            interviewer = random.choice(interviewers)
+            hour = random.randint(8, 20)
+            slots.add(
+                (
+                    interviewer.id,
+                    start_date
+                    + datetime.timedelta(days=random.randrange(options["days"])),
+                    hour,
+                )
+            )
+        InterviewerAvailability.objects.bulk_create(
+            [
+                InterviewerAvailability(
+                    interviewer_id=interviewer_id,
+                    date=date,
+                    start_time=datetime.time(hour),
+                    end_time=datetime.time(hour + 2),
+                )
+                for interviewer_id, date, hour in slots
+            ],
+            batch_size=1000,
+        )
+        if connection.vendor in ("postgresql", "sqlite"):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        return domain, start_date
+
+    def run(self, domain, start_date, options):
+        strengths = [key for key, _ in InternalInterviewer.STRENGTH_CHOICES]
+        searches = [
+            (
+                start_date + datetime.timedelta(days=random.randrange(options["days"])),
+                random.sample(SKILL_POOL, random.randint(1, 4)),
+                random.choice(strengths),
+                random.randint(0, 8),
+            )
+            for _ in range(options["repeat"])
+        ]
+
+        def base_queryset(date, strength, experience):
+            return InterviewerAvailability.objects.filter(
+                date=date,
+                interviewer__assigned_domains__name=domain.name,
+                interviewer__strength=strength,
+                interviewer__total_experience_years__gte=experience + 2,
+                interviewer__interviewer_level__in=[1, 2],
+                booked_by__isnull=True,
+            )
+
+        def json_scan(date, skills, strength, experience):
+            query = Q()
+            for skill in skills:
+                query |= Q(interviewer__skills__icontains=f'"{skill}"')
+            return base_queryset(date, strength, experience).filter(query)
+
+        def indexed(date, skills, strength, experience):
+            return base_queryset(date, strength, experience).filter(
+                interviewer__in=InterviewerSkill.objects.filter(
+                    skill__in=InterviewerSkill.normalize(skills)
+                ).values("interviewer_id")
+            )
+
+        results = {}
+        for name, build in (("json", json_scan), ("indexed", indexed)):
+            timings, rows = [], 0
+            for search in searches:
+                queryset = build(*search).values("id", "date", "start_time", "end_time")
+                started = time.perf_counter()
+                rows += len(list(queryset))
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[name] = {
+                "rows": rows,
+                "p50": statistics.median(timings),
+                "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+                "max": timings[-1],
+            }
+        return results
@@ -0,0 +1,411 @@
+import datetime
+import random
+import uuid
+from decimal import Decimal
+from typing import Any
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from organizations.models import Organization
+from core.models import User, UserProfile, Role
+from dashboard.models import (
+    BillingLog,
+    Candidate,
+    CandidateStatusCounter,
+    ClientUser,
+    DesignationDomain,
+    Engagement,
+    EngagementOperation,
+    EngagementTemplates,
+    HDIPUsers,
+    InternalClient,
+    InternalInterviewer,
+    Interview,
+    InterviewerAvailability,
+    InterviewerSkill,
+    InterviewFeedback,
+    Job,
+)
+from dashboard.snapshots import rebuild_snapshots
+from .benchmark_interviewer_matching import SKILL_POOL
+
+JOB_NAMES = ["SDE_I", "SDE_II", "SDE_III", "EM", "TL", "DE", "SDET"]
+COMPANIES = [f"Company {i}" for i in range(40)]
+OUTCOMES = ["HREC", "REC", "REC", "NREC", "SNREC", "NJ"]
+REJECTS = ["R1R", "R2R", "HMR", "OFD"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic organizations with jobs, candidates, interviewers, "
+        "availability, interviews, feedback, billing logs and engagements. "
+        "Rows are inserted with bulk_create, counters and dashboard snapshots "
+        "are rebuilt at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organizations", type=int, default=5)
+        parser.add_argument("--recruiters", type=int, default=5, help="per org")
+        parser.add_argument("--jobs", type=int, default=10, help="per organization")
+        parser.add_argument(
+            "--candidates", type=int, default=1000, help="per organization"
+        )
+        parser.add_argument("--interviewers", type=int, default=200)
+        parser.add_argument(
+            "--slots", type=int, default=20, help="open slots per interviewer"
+        )
+        parser.add_argument(
+            "--interview-ratio",
+            type=float,
+            default=0.6,
+            help="share of candidates with an interview",
+        )
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args: Any, **options: Any):
+        random.seed(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.tag = uuid.uuid4().hex[:8]
+        self.phone_offset = (
+            User.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        )
+        self.now = timezone.now()
+        # interviewers are shared by all organizations, so are their times
+        self.taken = set()
+
+        with transaction.atomic():
+            domains = [
+                DesignationDomain.objects.get_or_create(name=name)[0]
+                for name in JOB_NAMES
+            ]
+            moderator = HDIPUsers.objects.create(
+                user=self.create_users(Role.MODERATOR, 1)[0], name="Synthetic Mod"
+            )
+            interviewers = self.create_interviewers(domains, options)
+            organization_ids = []
+            for _ in range(options["organizations"]):
+                organization = self.create_organization(
+                    moderator, interviewers, options
+                )
+                organization_ids.append(organization.id)
+
+            for organization_id in organization_ids:
+                CandidateStatusCounter.rebuild(organization_id)
+            rebuild_snapshots()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {options['organizations']} organizations and "
+                f"{options['interviewers']} interviewers (tag {self.tag})."
+            )
+        )
+
+    def bulk_create(self, model, objects):
+        """bulk_create returning rows with primary keys on every backend"""
+        last_pk = model._base_manager.order_by("-pk").values_list("pk", flat=True)
+        last_pk = last_pk.first() or 0
+        created = model._base_manager.bulk_create(objects, batch_size=self.batch_size)
+        if created and created[0].pk is None:
+            # MySQL does not return the ids of bulk inserted rows
+            created = list(model._base_manager.filter(pk__gt=last_pk).order_by("pk"))
+        return created
+
+    def create_users(self, role, count):
+        users = []
+        for _ in range(count):
+            self.phone_offset += 1
+            users.append(
+                User(
+                    email=f"synthetic-{self.tag}-{self.phone_offset}@example.com",
+                    phone=f"+91{6000000000 + self.phone_offset}",
+                    role=role,
+                    email_verified=True,
+                    phone_verified=True,
+                )
+            )
+        users = self.bulk_create(User, users)
+        # bulk_create skips the signal creating the profile
+        self.bulk_create(UserProfile, [UserProfile(user=user) for user in users])
+        return users
+
+    def create_interviewers(self, domains, options):
+        strengths = [key for key, _ in InternalInterviewer.STRENGTH_CHOICES]
+        users = self.create_users(Role.INTERVIEWER, options["interviewers"])
+        interviewers = self.bulk_create(
+            InternalInterviewer,
+            [
+                InternalInterviewer(
+                    user=user,
+                    name=f"Interviewer {user.pk}",
+                    email=user.email,
+                    phone_number=user.phone,
+                    current_company=random.choice(COMPANIES),
+                    total_experience_years=random.randint(3, 20),
+                    interview_experience_years=random.randint(1, 5),
+                    strength=random.choice(strengths),
+                    interviewer_level=random.randint(1, 3),
+                    skills=random.sample(SKILL_POOL, random.randint(2, 8)),
+                )
+                for user in users
+            ],
+        )
+
+        through = InternalInterviewer.assigned_domains.through
+        self.bulk_create(
+            through,
+            [
+                through(internalinterviewer_id=interviewer.pk, designationdomain=domain)
+                for interviewer in interviewers
+                for domain in random.sample(domains, random.randint(1, 3))
+            ],
+        )
+        self.bulk_create(
+            InterviewerSkill,
+            [
+                InterviewerSkill(interviewer=interviewer, skill=skill)
+                for interviewer in interviewers
+                for skill in InterviewerSkill.normalize(interviewer.skills)
+            ],
+        )
+
+        start_date = datetime.date.today() + datetime.timedelta(days=1)
+        slots = {
+            (
+                interviewer.pk,
+                start_date + datetime.timedelta(days=random.randrange(options["days"])),
+                random.randint(8, 20),
+            )
+            for interviewer in interviewers
+            for _ in range(options["slots"])
+        }
+        self.bulk_create(
+            InterviewerAvailability,
+            [
+                InterviewerAvailability(
+                    interviewer_id=interviewer_id,
+                    date=date,
+                    start_time=datetime.time(hour),
+                    end_time=datetime.time(hour + 1),
+                )
+                for interviewer_id, date, hour in slots
+            ],
+        )
+        return interviewers
+
+    def create_organization(self, moderator, interviewers, options):
+        name = f"Synthetic {self.tag} {Organization.objects.count() + 1}"
+        organization = Organization.objects.create(
+            name=name, slug=name.lower().replace(" ", "-")
+        )
+        InternalClient.objects.create(
+            organization=organization,
+            name=name,
+            domain="Technology",
+            client_level=random.randint(0, 3),
+            assigned_to=moderator,
+        )
+
+        owner_user, *recruiter_users = self.create_users(
+            Role.CLIENT_OWNER, 1
+        ) + self.create_users(Role.CLIENT_USER, options["recruiters"])
+        client_users = self.bulk_create(
+            ClientUser,
+            [
+                ClientUser(
+                    organization=organization,
+                    user=user,
+                    name=f"Client User {user.pk}",
+                    status="ACT",
+                    invited_by=owner_user if user != owner_user else None,
+                )
+                for user in [owner_user, *recruiter_users]
+            ],
+        )
+
+        jobs = self.bulk_create(
+            Job,
+            [
+                Job(
+                    name=random.choice(JOB_NAMES),
+                    job_id=f"{self.tag}-{i}",
+                    hiring_manager=random.choice(client_users),
+                    total_positions=random.randint(1, 10),
+                    mandatory_skills=random.sample(SKILL_POOL, 3),
+                    specialization="backend",
+                    reason_for_archived="PF" if random.random() < 0.1 else None,
+                )
+                for i in range(options["jobs"])
+            ],
+        )
+        through = Job.clients.through
+        self.bulk_create(
+            through,
+            [
+                through(job_id=job.pk, clientuser_id=client_user.pk)
+                for job in jobs
+                for client_user in random.sample(
+                    client_users, min(len(client_users), 3)
+                )
+            ],
+        )
+
+        specializations = [key for key, _ in Candidate.SPECIALIZATION_CHOICES]
+        candidates = self.bulk_create(
+            Candidate,
+            [
+                Candidate(
+                    organization=organization,
+                    designation=random.choice(jobs),
+                    name=f"Candidate {i}",
+                    year=random.randint(0, 15),
+                    month=random.randint(0, 11),
+                    email=f"candidate-{self.tag}-{organization.pk}-{i}@example.com",
+                    phone=f"+91{9000000000 + i}",
+                    company=random.choice(COMPANIES),
+                    specialization=random.choice(specializations),
+                    source=random.choice(["INT", "AGN"]),
+                    gender=random.choice(["M", "F"]),
+                    status="NSCH",
+                    added_by=random.choice(client_users),
+                )
+                for i in range(options["candidates"])
+            ],
+        )
+
+        # spread the creation dates so date filtered views have history to scan
+        for candidate in candidates:
+            candidate.created_at = self.now - datetime.timedelta(
+                days=random.randint(0, 90), minutes=random.randint(0, 1440)
+            )
+        Candidate.objects.bulk_update(
+            candidates, ["created_at"], batch_size=self.batch_size
+        )
+
+        interviewed = random.sample(
+            candidates, int(len(candidates) * options["interview_ratio"])
+        )
+        interviews = []
+        for candidate in interviewed:
+            interviewer = random.choice(interviewers)
+            days = random.randint(-60, 14)
+            scheduled_time = (self.now + datetime.timedelta(days=days)).replace(
+                hour=random.randint(8, 20), minute=0, second=0, microsecond=0
+            )
+            if (interviewer.pk, scheduled_time) in self.taken:
+                continue
+            self.taken.add((interviewer.pk, scheduled_time))
+            status = random.choice(OUTCOMES) if days < 0 else "CSCH"
+            score = random.randint(30, 95) if status not in ["CSCH", "NJ"] else 0
+            candidate.status, candidate.score, candidate.total_score = (
+                status,
+                score,
+                100 if score else 0,
+            )
+            if status in ["HREC", "REC"]:
+                candidate.final_selection_status = random.choice(["SLD", "HD", None])
+            elif status in ["NREC", "SNREC"]:
+                candidate.final_selection_status = random.choice(REJECTS)
+            interviews.append(
+                Interview(
+                    candidate=candidate,
+                    interviewer=interviewer,
+                    status=status,
+                    score=score,
+                    total_score=candidate.total_score,
+                    scheduled_time=scheduled_time,
+                    meeting_link="https://meet.google.com/aaa-bbbb-ccc",
+                )
+            )
+        interviews = self.bulk_create(Interview, interviews)
+        Candidate.objects.bulk_update(
+            interviewed,
+            ["status", "score", "total_score", "final_selection_status"],
+            batch_size=self.batch_size,
+        )
+
+        evaluated = [
+            interview
+            for interview in interviews
+            if interview.status in ["HREC", "REC", "NREC", "SNREC"]
+        ]
+        self.bulk_create(
+            InterviewFeedback,
+            [
+                InterviewFeedback(
+                    interview=interview,
+                    skill_based_performance={
+                        skill: {"score": random.randint(30, 95)}
+                        for skill in random.sample(SKILL_POOL, 3)
+                    },
+                    skill_evaluation={"communication": "good"},
+                    strength="Problem solving",
+                    improvement_points="System design",
+                    overall_remark=interview.status,
+                    overall_score=interview.score,
+                    is_submitted=True,
+                )
+                for interview in evaluated
+            ],
+        )
+        self.bulk_create(
+            BillingLog,
+            [
+                BillingLog(
+                    interview=interview,
+                    client=organization,
+                    interviewer_id=interview.interviewer_id,
+                    amount_for_client=Decimal("1500.00"),
+                    amount_for_interviewer=Decimal("1000.00"),
+                    reason="feedback_submitted",
+                    billing_month=interview.scheduled_time.date().replace(day=1),
+                )
+                for interview in evaluated
+            ],
+        )
+
+        templates = self.bulk_create(
+            EngagementTemplates,
+            [
+                EngagementTemplates(
+                    organization=organization,
+                    template_name=f"Week {week}",
+                    template_html_content="<p>Checking in</p>",
+                    subject=f"Week {week} check in",
+                )
+                for week in range(1, 5)
+            ],
+        )
+        selected = [
+            candidate
+            for candidate in interviewed
+            if candidate.final_selection_status == "SLD"
+        ]
+        engagements = self.bulk_create(
+            Engagement,
+            [
+                Engagement(
+                    candidate=candidate,
+                    organization=organization,
+                    gtp_name="Owner",
+                    gtp_email=owner_user.email,
+                    status=random.choice(["YTJ", "DBT", "JND", "DCL", "OHD"]),
+                )
+                for candidate in selected
+            ],
+        )
+        self.bulk_create(
+            EngagementOperation,
+            [
+                EngagementOperation(
+                    engagement=engagement,
+                    template=template,
+                    week=week,
+                    date=self.now + datetime.timedelta(weeks=week),
+                )
+                for engagement in engagements
+                for week, template in enumerate(templates, start=1)
+            ],
+        )
+        return organization
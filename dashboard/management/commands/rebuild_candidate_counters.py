@@ -0,0 +1,32 @@
+from typing import Any
+from django.core.management import BaseCommand
+from django.db import transaction
+from organizations.models import Organization
+from dashboard.models import CandidateStatusCounter
+
+
+class Command(BaseCommand):
+    help = "Recount the per organization candidate status counters from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            type=int,
+            action="append",
+            dest="organization_ids",
+            help="Only rebuild the given organization id, can be repeated.",
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        organization_ids = options["organization_ids"] or list(
+            Organization.objects.values_list("id", flat=True)
+        )
+        for organization_id in organization_ids:
+            with transaction.atomic():
+                CandidateStatusCounter.rebuild(organization_id)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Candidate counters rebuilt for {len(organization_ids)} organizations."
+            )
+        )
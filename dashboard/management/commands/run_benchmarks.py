@@ -0,0 +1,313 @@
+import json
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from typing import Any
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+from organizations.models import Organization
+from rest_framework.test import APIClient
+from core.models import User, Role
+from dashboard.models import (
+    Candidate,
+    ClientUser,
+    InternalInterviewer,
+    InterviewerAvailability,
+    InterviewerSkill,
+    Job,
+)
+
+# name, user, path, query params. Paths and params are formatted with the
+# context built from the data in the database.
+BENCHMARKS = [
+    ("client-candidates", "client", "/api/client/candidates/", {}),
+    (
+        "client-candidates-cursor",
+        "client",
+        "/api/client/candidates/",
+        {"pagination": "cursor"},
+    ),
+    ("client-candidates-job", "client", "/api/client/candidates/", {"job_id": "{job}"}),
+    ("client-jobs", "client", "/api/client/jobs/", {}),
+    ("client-dashboard", "client", "/api/client/dashboard/", {}),
+    (
+        "client-candidate-analysis",
+        "client",
+        "/api/client/candidate-analysis/{job}/",
+        {"from_date": "{month_start}", "to_date": "{today}"},
+    ),
+    (
+        "client-interviewer-availability",
+        "client",
+        "/api/client/interviewer-availability/",
+        {
+            "date": "{match_date}",
+            "designation_id": "{match_job}",
+            "experience_year": "{match_experience}",
+            "specialization": "{match_specialization}",
+            "company": "{match_company}",
+        },
+    ),
+    ("client-engagements", "client", "/api/client/engagements/", {}),
+    ("client-finance", "client", "/api/client/finance/", {}),
+    ("internal-dashboard", "internal", "/api/internal/dashboard/", {}),
+    ("internal-engagements", "internal", "/api/internal/engagements/", {}),
+    ("internal-clients", "internal", "/api/internal/internal-client/", {}),
+    ("internal-interviewers", "internal", "/api/internal/interviewers/", {}),
+    (
+        "interviewer-accepted-interviews",
+        "interviewer",
+        "/api/interviewer/accepted-interviews/",
+        {},
+    ),
+    (
+        "interviewer-history",
+        "interviewer",
+        "/api/interviewer/interview-history/",
+        {},
+    ),
+    (
+        "interviewer-pending-feedback",
+        "interviewer",
+        "/api/interviewer/pending-feedback/",
+        {},
+    ),
+]
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the main endpoints through the Django test client against the "
+        "data in the database (see generate_synthetic_data) and report p50/p95/p99 "
+        "latency and queries per request as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--only", action="append", default=[], help="benchmark name, repeatable"
+        )
+        parser.add_argument("--output", help="write the results to this JSON file")
+        parser.add_argument(
+            "--compare", help="JSON file of an earlier run to compare against"
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        baseline = None
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text())["results"]
+
+        setup_test_environment()
+        try:
+            users, context = self.get_context()
+            results = {}
+            for name, user, path, params in BENCHMARKS:
+                if options["only"] and name not in options["only"]:
+                    continue
+                results[name] = self.run(
+                    users[user],
+                    path.format(**context),
+                    {key: value.format(**context) for key, value in params.items()},
+                    options,
+                )
+        finally:
+            teardown_test_environment()
+
+        report = {
+            "commit": self.get_commit(),
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "repeat": options["repeat"],
+            "results": results,
+        }
+
+        for name, result in results.items():
+            line = (
+                f"{name:<34} status={result['status']} "
+                f"p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms "
+                f"p99={result['p99_ms']:.1f}ms queries={result['queries']}"
+            )
+            if baseline and name in baseline:
+                line += (
+                    f"  (p95 {result['p95_ms'] - baseline[name]['p95_ms']:+.1f}ms, "
+                    f"queries {result['queries'] - baseline[name]['queries']:+d})"
+                )
+            self.stdout.write(line)
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+            self.stdout.write(
+                self.style.SUCCESS(f"Results written to {options['output']}")
+            )
+
+    def get_context(self):
+        organization = (
+            Organization.objects.annotate(candidates=Count("candidate"))
+            .filter(candidates__gt=0)
+            .order_by("-candidates")
+            .first()
+        )
+        owner = (
+            ClientUser.objects.filter(
+                organization=organization, user__role=Role.CLIENT_OWNER
+            )
+            .select_related("user")
+            .first()
+        )
+        staff = (
+            User.objects.filter(role__in=[Role.SUPER_ADMIN, Role.ADMIN, Role.MODERATOR])
+            .order_by("role")
+            .first()
+        )
+        interviewer = (
+            InternalInterviewer.objects.annotate(total=Count("interviews"))
+            .order_by("-total")
+            .select_related("user")
+            .first()
+        )
+        if not (owner and staff and interviewer):
+            raise CommandError(
+                "Need an organization with candidates and a client owner, a staff "
+                "user and an interviewer. Run generate_synthetic_data first."
+            )
+
+        job = (
+            Job.objects.filter(hiring_manager__organization=organization)
+            .annotate(candidates=Count("candidate"))
+            .order_by("-candidates")
+            .first()
+        )
+        today = timezone.localdate()
+        match_job, candidate, slot = self.get_matching_slot(organization, today)
+        context = {
+            "organization": organization.id,
+            "job": job.id if job else 0,
+            "match_job": match_job.id,
+            "match_date": slot.date.strftime("%d/%m/%Y"),
+            "match_experience": candidate.year,
+            "match_specialization": candidate.specialization,
+            "match_company": candidate.company,
+            "month_start": today.replace(day=1).strftime("%d/%m/%Y"),
+            "today": today.strftime("%d/%m/%Y"),
+        }
+        users = {
+            "client": owner.user,
+            "internal": staff,
+            "interviewer": interviewer.user,
+        }
+        return users, context
+
+    def get_matching_slot(self, organization, today):
+        """
+        A job and candidate of the organization with an open slot the
+        interviewer availability view offers them, so the benchmark times the
+        slot matcher instead of a "no available slots" answer
+        """
+        client_level = organization.internal_client.client_level
+        interviewer_level = (
+            list(range(client_level - 1, client_level + 1))
+            if client_level in [2, 3]
+            else [client_level]
+        )
+        jobs = Job.objects.filter(hiring_manager__organization=organization)
+        for job in jobs.order_by("id"):
+            skills = InterviewerSkill.normalize(job.mandatory_skills)
+            candidates = list(
+                Candidate.objects.filter(designation=job)
+                .exclude(specialization="")
+                .exclude(company="")
+                .order_by("year", "id")
+            )
+            slots = (
+                InterviewerAvailability.objects.filter(
+                    date__gt=today,
+                    booked_by__isnull=True,
+                    interviewer__assigned_domains__name=job.name,
+                    interviewer__interviewer_level__in=interviewer_level,
+                    interviewer__in=InterviewerSkill.objects.filter(
+                        skill__in=skills
+                    ).values("interviewer_id"),
+                )
+                .select_related("interviewer")
+                .order_by("date", "start_time")
+            )
+            for slot in slots:
+                interviewer = slot.interviewer
+                for candidate in candidates:
+                    if (
+                        candidate.specialization == interviewer.strength
+                        and candidate.year + 2 <= interviewer.total_experience_years
+                        and candidate.company.lower()
+                        != (interviewer.current_company or "").lower()
+                    ):
+                        return job, candidate, slot
+        raise CommandError(
+            "No open slot matches a job and candidate of the organization. Run "
+            "generate_synthetic_data with more interviewers or slots."
+        )
+
+    def run(self, user, path, params, options):
+        client = APIClient(raise_request_exception=False)
+        client.force_authenticate(user)
+        for _ in range(options["warmup"]):
+            self.check_response(client.get(path, params), path)
+
+        timings, query_counts, sql_timings = [], [], []
+        for _ in range(options["repeat"]):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(path, params)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.check_response(response, path)
+            query_counts.append(len(queries))
+            sql_timings.append(
+                sum(float(query["time"]) for query in queries.captured_queries) * 1000
+            )
+
+        return {
+            "path": path,
+            "params": params,
+            "status": response.status_code,
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "p99_ms": round(percentile(timings, 99), 2),
+            "mean_ms": round(statistics.fmean(timings), 2),
+            "queries": max(query_counts),
+            "sql_p50_ms": round(statistics.median(sql_timings), 2),
+        }
+
+    def check_response(self, response, path):
+        """Only successful answers are timed"""
+        if not 200 <= response.status_code < 300:
+            raise CommandError(
+                f"{path} answered {response.status_code}: {response.content[:200]!r}"
+            )
+
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,262 @@
+import datetime
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any
+from unittest import mock
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Count
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from organizations.models import Organization
+from rest_framework.test import APIClient
+from core.models import User, Role
+from dashboard.models import (
+    Candidate,
+    CandidateStatusCounter,
+    ClientUser,
+    DesignationDomain,
+    HDIPUsers,
+    InternalClient,
+    InternalInterviewer,
+    Interview,
+    InterviewerAvailability,
+    InterviewScheduleAttempt,
+    Job,
+    SchedulingOffer,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Accept scheduling offers from many threads at once and check that every "
+        "candidate and every slot is booked at most once. The data is created for "
+        "the run and deleted afterwards. It needs MySQL, SQLite serializes writers "
+        "so the requests never race."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--candidates", type=int, default=5)
+        parser.add_argument("--interviewers", type=int, default=10)
+        parser.add_argument("--threads", type=int, default=50)
+        parser.add_argument("--rounds", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args: Any, **options: Any):
+        if connection.vendor == "sqlite":
+            raise CommandError(
+                "SQLite allows one writer at a time, run the stress test against MySQL."
+            )
+        if options["threads"] < 2:
+            raise CommandError("--threads must be at least 2.")
+        random.seed(options["seed"])
+        self.tag = uuid.uuid4().hex[:8]
+
+        setup_test_environment()
+        try:
+            for round_number in range(1, options["rounds"] + 1):
+                fixture = self.seed(options)
+                try:
+                    responses = self.run(fixture, options)
+                    errors = self.verify(fixture, responses)
+                finally:
+                    self.cleanup(fixture)
+
+                timings = [timing for _, _, timing in responses]
+                outcomes = Counter(message for _, message, _ in responses)
+                self.stdout.write(
+                    f"round {round_number}: {len(responses)} requests "
+                    f"p50={statistics.median(timings):.1f}ms max={max(timings):.1f}ms"
+                )
+                for message, count in outcomes.most_common():
+                    self.stdout.write(f"  {count:>4}  {message}")
+                if errors:
+                    raise CommandError("\n".join(errors))
+        finally:
+            teardown_test_environment()
+
+        self.stdout.write(self.style.SUCCESS("No double booking found."))
+
+    def create_user(self, role):
+        self.user_count += 1
+        return User.objects.create_user(
+            f"stress-{self.tag}-{self.user_count}@example.com",
+            f"+91{5000000000 + uuid.uuid4().int % 10**9}",
+            uuid.uuid4().hex,
+            role=role,
+        )
+
+    def seed(self, options):
+        self.user_count = 0
+        name = f"Stress {self.tag} {uuid.uuid4().hex[:4]}"
+        organization = Organization.objects.create(
+            name=name, slug=name.lower().replace(" ", "-")
+        )
+        moderator = HDIPUsers.objects.create(
+            user=self.create_user(Role.MODERATOR), name="Stress Mod"
+        )
+        InternalClient.objects.create(
+            organization=organization, name=name, client_level=1, assigned_to=moderator
+        )
+        client_user = ClientUser.objects.create(
+            organization=organization,
+            user=self.create_user(Role.CLIENT_ADMIN),
+            name="Stress Admin",
+            status="ACT",
+        )
+        DesignationDomain.objects.get_or_create(name="SDE_II")
+        job = Job.objects.create(
+            name="SDE_II",
+            hiring_manager=client_user,
+            mandatory_skills=["python"],
+            total_positions=1,
+        )
+
+        date = timezone.localdate() + datetime.timedelta(days=2)
+        scheduled_time = timezone.make_aware(
+            datetime.datetime.combine(date, datetime.time(11))
+        )
+        slots = []
+        for i in range(options["interviewers"]):
+            user = self.create_user(Role.INTERVIEWER)
+            interviewer = InternalInterviewer.objects.create(
+                user=user,
+                name=f"Stress Interviewer {i}",
+                email=user.email,
+                phone_number=user.phone,
+                total_experience_years=5,
+                interview_experience_years=2,
+                strength="backend",
+                interviewer_level=1,
+                skills=["python"],
+            )
+            slots.append(
+                InterviewerAvailability.objects.create(
+                    interviewer=interviewer,
+                    date=date,
+                    start_time=datetime.time(9),
+                    end_time=datetime.time(17),
+                )
+            )
+
+        # every candidate is offered every slot at the same time
+        offers = []
+        for i in range(options["candidates"]):
+            candidate = Candidate.objects.create(
+                organization=organization,
+                designation=job,
+                name=f"Stress Candidate {i}",
+                year=3,
+                email=f"stress-{self.tag}-{i}@example.com",
+                phone="+919999999999",
+                specialization="backend",
+                status="SCH",
+                added_by=client_user,
+            )
+            attempt = InterviewScheduleAttempt.objects.create(candidate=candidate)
+            offers += SchedulingOffer.objects.bulk_create(
+                [
+                    SchedulingOffer(
+                        scheduling_attempt=attempt,
+                        availability=slot,
+                        scheduled_time=scheduled_time,
+                        booked_by=client_user.user,
+                        expires_at=timezone.now() + datetime.timedelta(hours=1),
+                    )
+                    for slot in slots
+                ]
+            )
+        return {"organization": organization, "offers": offers}
+
+    def run(self, fixture, options):
+        offers = fixture["offers"]
+        # the same offer is clicked by several threads as well
+        picked = [random.choice(offers) for _ in range(options["threads"])]
+        barrier = threading.Barrier(len(picked))
+        responses = []
+        lock = threading.Lock()
+
+        def accept(offer):
+            client = APIClient(raise_request_exception=False)
+            url = reverse(
+                "interviewer-request-confirmation", args=[f"{offer.token}.accept"]
+            )
+            try:
+                barrier.wait()
+                started = time.perf_counter()
+                response = client.post(url)
+                timing = (time.perf_counter() - started) * 1000
+                message = (
+                    response.json().get("message", "")
+                    if response.status_code < 500
+                    else f"HTTP {response.status_code}"
+                )
+                with lock:
+                    responses.append((response.status_code, message, timing))
+            finally:
+                connections.close_all()
+
+        # the Meet is created by a Celery task once the booking commits
+        with mock.patch("dashboard.Views.InterviewerViews.create_interview_meeting"):
+            threads = [
+                threading.Thread(target=accept, args=(offer,)) for offer in picked
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return responses
+
+    def verify(self, fixture, responses):
+        organization = fixture["organization"]
+        errors = []
+        interviews = Interview._base_manager.filter(
+            candidate__organization=organization
+        )
+        confirmed = sum(
+            1 for _, message, _ in responses if message == "Interview Confirmed"
+        )
+        if any(status_code >= 500 for status_code, _, _ in responses):
+            errors.append("Some requests failed with a server error.")
+        if confirmed != interviews.count():
+            errors.append(
+                f"{confirmed} bookings confirmed but {interviews.count()} interviews created."
+            )
+
+        for field, label in (
+            ("candidate", "candidate"),
+            ("availability", "slot"),
+            ("interviewer", "interviewer"),
+        ):
+            duplicates = (
+                interviews.values(field).annotate(total=Count("id")).filter(total__gt=1)
+            )
+            if duplicates:
+                errors.append(f"A {label} was booked more than once.")
+
+        accepted = SchedulingOffer.objects.filter(
+            scheduling_attempt__candidate__organization=organization, status="ACC"
+        )
+        if accepted.count() != interviews.count():
+            errors.append("Accepted offers do not match the interviews.")
+        if (
+            Candidate._base_manager.filter(organization=organization, status="CSCH")
+            .exclude(pk__in=interviews.values("candidate"))
+            .exists()
+        ):
+            errors.append("A candidate is marked scheduled without an interview.")
+        return errors
+
+    def cleanup(self, fixture):
+        organization = fixture["organization"]
+        Interview._base_manager.filter(candidate__organization=organization).delete()
+        # the candidate delete signal recreates the status counter, drop it after
+        Candidate._base_manager.filter(organization=organization).delete()
+        CandidateStatusCounter.objects.filter(organization=organization).delete()
+        Organization.objects.filter(pk=organization.pk).delete()
+        User.objects.filter(email__startswith=f"stress-{self.tag}-").delete()
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.2 on 2026-10-16 23:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_interviewer_skills(apps, schema_editor):
+    InternalInterviewer = apps.get_model("dashboard", "InternalInterviewer")
+    InterviewerSkill = apps.get_model("dashboard", "InterviewerSkill")
+    rows = []
+    for interviewer_id, skills in InternalInterviewer.objects.values_list(
+        "id", "skills"
+    ):
+        seen = set()
+        for skill in skills or []:
+            if not isinstance(skill, str):
+                continue
+            skill = skill.strip().lower()[:100]
+            if skill and skill not in seen:
+                seen.add(skill)
+                rows.append(
+                    InterviewerSkill(interviewer_id=interviewer_id, skill=skill)
+                )
+    InterviewerSkill.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0090_candidate_is_engagement_pushed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InterviewerSkill",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("skill", models.CharField(max_length=100)),
+                (
+                    "interviewer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="indexed_skills",
+                        to="dashboard.internalinterviewer",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["skill", "interviewer"], name="interviewer_skill_idx"
+                    )
+                ],
+                "unique_together": {("interviewer", "skill")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="intervieweravailability",
+            index=models.Index(
+                fields=["date", "booked_by", "start_time"],
+                name="availability_date_open_idx",
+            ),
+        ),
+        migrations.RunPython(
+            populate_interviewer_skills, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.2 on 2026-10-16 23:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_candidate_status_counters(apps, schema_editor):
+    Candidate = apps.get_model("dashboard", "Candidate")
+    CandidateStatusCounter = apps.get_model("dashboard", "CandidateStatusCounter")
+    rows = (
+        Candidate.objects.filter(archived=False)
+        .values("organization_id")
+        .annotate(
+            total_candidates=Count("id"),
+            scheduled=Count("id", filter=Q(status__in=["SCH", "CSCH"])),
+            inprocess=Count("id", filter=Q(status="NSCH")),
+            recommended=Count("id", filter=Q(status__in=["REC", "HREC"])),
+            rejected=Count("id", filter=Q(status__in=["SNREC", "NREC"])),
+        )
+        .order_by()
+    )
+    CandidateStatusCounter.objects.bulk_create(
+        [CandidateStatusCounter(**row) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0091_interviewerskill"),
+        ("organizations", "0006_alter_organization_slug"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CandidateStatusCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total_candidates", models.IntegerField(default=0)),
+                ("scheduled", models.IntegerField(default=0)),
+                ("inprocess", models.IntegerField(default=0)),
+                ("recommended", models.IntegerField(default=0)),
+                ("rejected", models.IntegerField(default=0)),
+                (
+                    "organization",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="candidate_status_counter",
+                        to="organizations.organization",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(
+            populate_candidate_status_counters, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.2 on 2026-10-16 23:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0092_candidatestatuscounter"),
+        ("organizations", "0006_alter_organization_slug"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DashboardSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=100, unique=True)),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("CLIENT", "Client Dashboard"),
+                            ("INTERNAL", "Internal Dashboard"),
+                            ("ENGAGEMENT", "Internal Engagement"),
+                            ("ANALYTICS", "Job Analytics"),
+                        ],
+                        max_length=15,
+                    ),
+                ),
+                ("data", models.JSONField(blank=True, default=dict)),
+                ("refreshed_at", models.DateTimeField()),
+                (
+                    "job",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dashboard_snapshots",
+                        to="dashboard.job",
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dashboard_snapshots",
+                        to="organizations.organization",
+                    ),
+                ),
+            ],
+        ),
+    ]
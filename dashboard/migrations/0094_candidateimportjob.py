@@ -0,0 +1,79 @@
+# Generated by Django 5.1.2 on 2026-10-16 23:48
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0093_dashboardsnapshot"),
+        ("organizations", "0006_alter_organization_slug"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CandidateImportJob",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("archived", models.BooleanField(default=False)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("file", models.FileField(upload_to="candidate_imports")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PED", "Pending"),
+                            ("PRG", "In Progress"),
+                            ("CMP", "Completed"),
+                            ("FLD", "Failed"),
+                        ],
+                        default="PED",
+                        max_length=15,
+                    ),
+                ),
+                ("total_rows", models.PositiveIntegerField(default=0)),
+                ("processed_rows", models.PositiveIntegerField(default=0)),
+                ("created_count", models.PositiveIntegerField(default=0)),
+                ("error_count", models.PositiveIntegerField(default=0)),
+                (
+                    "errors",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="[{'row': <int>, 'errors': {...}}]",
+                    ),
+                ),
+                ("failure_reason", models.TextField(blank=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="candidate_imports",
+                        to="dashboard.clientuser",
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="candidate_imports",
+                        to="organizations.organization",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.2 on 2026-10-16 23:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0095_resumeparsejob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="interview",
+            name="feedback_claimed_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="set when a task starts generating the AI feedback, stops two runs from processing the same interview",
+                null=True,
+            ),
+        ),
+    ]
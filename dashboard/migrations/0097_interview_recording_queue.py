@@ -0,0 +1,68 @@
+# Generated by Django 5.1.2 on 2026-10-17 00:02
+
+from django.db import migrations, models
+
+
+def populate_recording_stage(apps, schema_editor):
+    Interview = apps.get_model("dashboard", "Interview")
+    Interview.objects.filter(downloaded=True).update(recording_stage="TRN")
+    Interview.objects.filter(downloaded=True, interview_feedback__isnull=False).update(
+        recording_stage="DONE"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0096_interview_feedback_claimed_at"),
+    ]
+
+    operations = [
+        # the counter keeps its values, it now counts claims of the queue
+        migrations.RenameField(
+            model_name="interview",
+            old_name="no_of_time_processed",
+            new_name="recording_attempts",
+        ),
+        migrations.AlterField(
+            model_name="interview",
+            name="recording_attempts",
+            field=models.IntegerField(
+                default=0,
+                help_text="Number of times the recording pipeline claimed this interview, it is given up after RECORDING_MAX_ATTEMPTS.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="interview",
+            name="recording_claim",
+            field=models.UUIDField(
+                blank=True, help_text="token of the current claim", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="interview",
+            name="recording_lease_until",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="the worker holding the claim owns the interview until then",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="interview",
+            name="recording_stage",
+            field=models.CharField(
+                choices=[
+                    ("EVT", "Waiting for the recording"),
+                    ("DWN", "Downloading"),
+                    ("STR", "Storing"),
+                    ("TRN", "Transcript ready"),
+                    ("DONE", "Feedback generated"),
+                    ("FLD", "Failed"),
+                ],
+                default="EVT",
+                max_length=4,
+            ),
+        ),
+        migrations.RunPython(populate_recording_stage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-17 00:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0097_interview_recording_queue"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="intervieweravailability",
+            name="materialized_until",
+            field=models.DateField(
+                blank=True,
+                help_text="The occurrences of the recurrence rule exist up to this date.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="intervieweravailability",
+            name="recurrence_parent",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The slot holding the recurrence rule this slot was generated from.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="occurrences",
+                to="dashboard.intervieweravailability",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.2 on 2026-10-17 00:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0099_scheduling_offer"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="interview",
+            name="feedback_attempts",
+            field=models.IntegerField(
+                default=0,
+                help_text="Number of times feedback generation claimed this interview, it is given up after FEEDBACK_MAX_ATTEMPTS.",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.2 on 2026-10-17 00:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0100_interview_feedback_attempts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="intervieweravailability",
+            name="offered_end_time",
+            field=models.TimeField(
+                blank=True,
+                help_text="The end time the interviewer offered, kept once booking narrows the slot.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="intervieweravailability",
+            name="offered_start_time",
+            field=models.TimeField(
+                blank=True,
+                help_text="The start time the interviewer offered, kept once booking narrows the slot.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="intervieweravailability",
+            name="split_from",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The slot this one was cut from when an interview was booked in it.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="splits",
+                to="dashboard.intervieweravailability",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.2 on 2026-10-17 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0101_availability_split_from"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="interview",
+            name="meeting_failed",
+            field=models.BooleanField(
+                default=False,
+                help_text="The Meet could not be created after every retry, the interview has no link and its confirmation emails were not sent.",
+            ),
+        ),
+    ]
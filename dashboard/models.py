@@ -3,6 +3,7 @@ from .Models import (
     InternalClient,
     ClientPointOfContact,
     InternalInterviewer,
+    InterviewerSkill,
     Agreement,
     HDIPUsers,
     Job,
@@ -18,6 +19,11 @@ from .Models import (
     InterviewerPricing,
     BillingRecord,
     InterviewScheduleAttempt,
+    SchedulingOffer,
+    CandidateStatusCounter,
+    CandidateImportJob,
+    ResumeParseJob,
     BillingLog,
     BillPayments,
+    DashboardSnapshot,
 )
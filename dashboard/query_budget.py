@@ -0,0 +1,549 @@
+"""
+Fixtures and requests of the query budget test, see QueryBudgetTest in
+dashboard/tests.py. Every GET route of core.urls and dashboard.urls and the
+write routes listed in WRITE_CASES are requested against the seeded data and
+their query count and SQL time are compared with query_budget.json.
+"""
+
+import datetime
+import re
+import time
+from decimal import Decimal
+from pathlib import Path
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from organizations.models import Organization
+from core.models import User, Role
+from .models import (
+    Agreement,
+    BillingLog,
+    BillingRecord,
+    BillPayments,
+    Candidate,
+    CandidateImportJob,
+    ClientPointOfContact,
+    ClientUser,
+    DesignationDomain,
+    Engagement,
+    EngagementOperation,
+    EngagementTemplates,
+    HDIPUsers,
+    InternalClient,
+    InternalInterviewer,
+    Interview,
+    InterviewerAvailability,
+    InterviewerPricing,
+    InterviewerRequest,
+    InterviewFeedback,
+    InterviewScheduleAttempt,
+    Job,
+    ResumeParseJob,
+    SchedulingOffer,
+)
+from .snapshots import rebuild_snapshots
+
+BUDGET_FILE = Path(settings.BASE_DIR) / "dashboard" / "query_budget.json"
+
+URL_MODULES = ("core.urls", "dashboard.urls")
+
+# routes that call third party services on GET, they are not measured
+SKIPPED_ROUTES = {
+    "api/google-auth/init/": "builds the Google OAuth flow",
+    "api/events/": "reads the Google Calendar API",
+}
+
+# user making the request, picked by the longest matching route prefix
+DEFAULT_USERS = {
+    "api/": "client_owner",
+    "api/internal/": "super_admin",
+    "api/interviewer/": "interviewer",
+}
+
+# per route overrides: user, path kwargs (fixture names) and query params.
+# A route listed with several cases gets a budget entry per case.
+ROUTE_CASES = {
+    "api/client/candidates/": [
+        {},
+        {"params": {"pagination": "cursor"}},
+        {"params": {"job_id": "job"}},
+    ],
+    "api/client/jobs/": [{}, {"params": {"status": "archive"}}],
+    "api/client/interviewer-availability/": [
+        {
+            "params": {
+                "date": "availability_date",
+                "time": "10:00",
+                "designation_id": "job",
+                "experience_year": 2,
+                "specialization": "backend",
+                "company": "Acme",
+            }
+        },
+        {
+            "params": {
+                "date": "availability_date",
+                "time": "10:00",
+                "designation_id": "job",
+                "experience_year": 2,
+                "specialization": "backend",
+                "company": "Acme",
+                "rank": "true",
+            }
+        },
+    ],
+    "api/client/engagement-template/<int:pk>/": [
+        {"kwargs": {"pk": "engagement_template"}}
+    ],
+    "api/client/candidate-analysis/<int:job_id>/": [
+        {"params": {"from_date": "month_start", "to_date": "today"}}
+    ],
+    "api/client/feedback-pdf-video/<str:interview_uid>/": [{"user": "client_admin"}],
+    "api/internal/internal-client/<int:pk>/": [{"kwargs": {"pk": "internal_client"}}],
+    "api/internal/interviewer/<int:pk>/": [{"kwargs": {"pk": "interviewer"}}],
+    "api/internal/hdip-user/<int:pk>/": [{"kwargs": {"pk": "hdip_user"}}],
+    "api/internal/internal-client-user/<int:pk>/": [
+        {"kwargs": {"pk": "internal_client"}}
+    ],
+    "api/internal/finance/": [
+        {"params": {"organization_id": "organization"}},
+        {"params": {"interviewer_id": "interviewer"}},
+    ],
+    "api/internal/internal-client-user/": [
+        {"params": {"organization_id": "organization"}}
+    ],
+    "api/interviewer/interview-feedback/<int:interview_id>/": [
+        {"kwargs": {"interview_id": "completed_interview"}}
+    ],
+    "api/interviewer/finance/": [{"params": {"finance_month": "last_month"}}],
+}
+
+# write routes, measured with the method and the body built from the fixtures.
+# Each case runs on its own copy of the seeded data.
+WRITE_CASES = {
+    "api/client/candidates/": [
+        {
+            "method": "post",
+            "data": lambda fixtures: {
+                "name": "New Candidate",
+                "year": 4,
+                "month": 6,
+                "phone": "+919811100001",
+                "email": "new.candidate@example.com",
+                "company": "Initech",
+                "current_designation": "Developer",
+                "job_id": fixtures["job"],
+                "source": "INT",
+                "specialization": "backend",
+                "cv": SimpleUploadedFile(
+                    "cv.pdf", b"%PDF-1.4 resume", content_type="application/pdf"
+                ),
+            },
+            "format": "multipart",
+        }
+    ],
+    "api/interviewer/interviewer-requst-confirmation/<str:request_id>/": [
+        {"method": "post", "kwargs": {"request_id": "accept_offer"}}
+    ],
+    "api/interviewer/interview-feedback/<int:interview_id>/": [
+        {
+            "method": "patch",
+            "kwargs": {"interview_id": "pending_feedback_interview"},
+            "data": lambda fixtures: {
+                "interview_id": fixtures["pending_feedback_interview"],
+                "skill_based_performance": {
+                    "python": {
+                        "summary": "Knows the standard library",
+                        "score": 80,
+                        "questions": [{"que": "Generators?", "ans": "Lazy"}],
+                    }
+                },
+                "skill_evaluation": {"Communication": "good", "Attitude": "good"},
+                "strength": "Fundamentals",
+                "improvement_points": "System design",
+                "overall_remark": "REC",
+                "overall_score": 80,
+            },
+            "format": "json",
+        }
+    ],
+}
+
+
+def get_routes():
+    def walk(patterns, prefix, included):
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if isinstance(pattern, URLResolver):
+                module = getattr(pattern.urlconf_name, "__name__", pattern.urlconf_name)
+                yield from walk(
+                    pattern.url_patterns, route, included or module in URL_MODULES
+                )
+            elif isinstance(pattern, URLPattern) and included:
+                yield route, pattern.callback
+
+    yield from walk(get_resolver().url_patterns, "", False)
+
+
+def get_cases():
+    """(budget key, method, route, case) of every measured request"""
+    cases = []
+    for route, callback in get_routes():
+        view_class = getattr(callback, "view_class", None)
+        if view_class is None or not hasattr(view_class, "get"):
+            continue
+        if route in SKIPPED_ROUTES:
+            continue
+        for case in ROUTE_CASES.get(route, [{}]):
+            key = f"GET /{route}" + (
+                f"?{urlencode(case['params'])}" if case.get("params") else ""
+            )
+            cases.append((key, "get", route, case))
+    for route, write_cases in WRITE_CASES.items():
+        for case in write_cases:
+            cases.append(
+                (f"{case['method'].upper()} /{route}", case["method"], route, case)
+            )
+    return cases
+
+
+def get_request(route, case, fixtures):
+    """The user, path and data of a case"""
+    user = fixtures["users"][
+        case.get("user")
+        or DEFAULT_USERS[
+            max((p for p in DEFAULT_USERS if route.startswith(p)), key=len)
+        ]
+    ]
+    kwargs = case.get("kwargs", {})
+    path = "/" + re.sub(
+        r"<(?:\w+:)?(\w+)>",
+        lambda match: str(fixtures[kwargs.get(match[1], match[1])]),
+        route,
+    )
+    if "data" in case:
+        data = case["data"](fixtures)
+    else:
+        data = {
+            key: fixtures.get(value, value) if isinstance(value, str) else value
+            for key, value in case.get("params", {}).items()
+        }
+    return user, path, data
+
+
+def timed(durations):
+    """
+    connection.queries keeps the time rounded to milliseconds, which sums
+    to zero for small queries. Time each query with perf_counter instead.
+    """
+
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            durations.append(time.perf_counter() - started)
+
+    return wrapper
+
+
+def seed():
+    """Small but complete data set, a few rows per table so N+1s show up"""
+    today = datetime.date.today()
+    counter = iter(range(1, 10_000))
+
+    def user(role):
+        number = next(counter)
+        return User.objects.create_user(
+            f"budget-{role}-{number}@example.com",
+            f"+91{9000000000 + number}",
+            "password",
+            role=role,
+            email_verified=True,
+            phone_verified=True,
+        )
+
+    domain, _ = DesignationDomain.objects.get_or_create(name="SDE_II")
+    super_admin = user(Role.SUPER_ADMIN)
+    hdip_user = HDIPUsers.objects.create(user=super_admin, name="Super Admin")
+    moderator = HDIPUsers.objects.create(user=user(Role.MODERATOR), name="Mod")
+
+    organization = Organization.objects.create(name="Acme", slug="acme")
+    internal_client = InternalClient.objects.create(
+        organization=organization,
+        name="Acme",
+        domain="Tech",
+        client_level=1,
+        assigned_to=moderator,
+    )
+    ClientPointOfContact.objects.create(
+        client=internal_client,
+        name="Acme POC",
+        email="poc@acme.example.com",
+        phone="+919888800001",
+    )
+    for experience in ("0-4", "4-6", "6-8"):
+        Agreement.objects.create(
+            organization=organization,
+            years_of_experience=experience,
+            rate=Decimal("1500.00"),
+        )
+
+    owner = ClientUser.objects.create(
+        organization=organization,
+        user=user(Role.CLIENT_OWNER),
+        name="Owner",
+        status="ACT",
+    )
+    admin = ClientUser.objects.create(
+        organization=organization,
+        user=user(Role.CLIENT_ADMIN),
+        name="Admin",
+        status="ACT",
+        invited_by=owner.user,
+    )
+    recruiters = [
+        ClientUser.objects.create(
+            organization=organization,
+            user=user(Role.CLIENT_USER),
+            name=f"Recruiter {i}",
+            status="ACT",
+            invited_by=owner.user,
+        )
+        for i in range(3)
+    ]
+
+    jobs = []
+    for i in range(4):
+        job = Job.objects.create(
+            name="SDE_II",
+            job_id=f"JOB-{i}",
+            hiring_manager=admin,
+            total_positions=2,
+            mandatory_skills=["python", "django"],
+            reason_for_archived="PF" if i == 3 else None,
+        )
+        job.clients.add(*recruiters)
+        jobs.append(job)
+
+    interviewers = []
+    for i in range(5):
+        interviewer_user = user(Role.INTERVIEWER)
+        interviewer = InternalInterviewer.objects.create(
+            user=interviewer_user,
+            name=f"Interviewer {i}",
+            email=interviewer_user.email,
+            phone_number=interviewer_user.phone,
+            current_company="Globex",
+            total_experience_years=6 + i,
+            interview_experience_years=2,
+            strength="backend",
+            interviewer_level=1 + i % 2,
+            skills=["python", "django"],
+        )
+        interviewer.assigned_domains.add(domain)
+        interviewer.organization.add(organization)
+        interviewer.sync_skill_index()
+        interviewers.append(interviewer)
+
+    availability_date = today + datetime.timedelta(days=2)
+    for interviewer in interviewers:
+        for hour in (10, 14):
+            InterviewerAvailability.objects.create(
+                interviewer=interviewer,
+                date=availability_date,
+                start_time=datetime.time(hour),
+                end_time=datetime.time(hour + 2),
+            )
+
+    candidates = [
+        Candidate.objects.create(
+            organization=organization,
+            designation=jobs[i % 3],
+            name=f"Candidate {i}",
+            year=3 + i % 4,
+            email=f"candidate{i}@example.com",
+            phone=f"+91980000{i:04d}",
+            company="Initech",
+            specialization="backend",
+            added_by=recruiters[i % 3],
+            gender="M" if i % 2 else "F",
+        )
+        for i in range(12)
+    ]
+
+    interviews = []
+    for i, candidate in enumerate(candidates[:6]):
+        scheduled_time = timezone.now() + datetime.timedelta(days=-3 + i, hours=i)
+        interview = Interview.objects.create(
+            candidate=candidate,
+            interviewer=interviewers[i % len(interviewers)],
+            status="SCH" if i >= 3 else "REC",
+            scheduled_time=scheduled_time,
+            meeting_link="https://meet.google.com/abc-defg-hij",
+            recording="interview_recordings/budget.mp4" if i == 0 else None,
+        )
+        InterviewerRequest.objects.create(
+            interviewer=interviewers[(i + 1) % len(interviewers)],
+            interview=interview,
+            status="pending" if i % 2 else "rejected",
+        )
+        interviews.append(interview)
+
+    completed_interview = interviews[0]
+    for interview in interviews[:3]:
+        InterviewFeedback.objects.create(
+            interview=interview,
+            skill_based_performance={"python": {"score": 80}},
+            skill_evaluation={"communication": "good"},
+            strength="Strong fundamentals",
+            improvement_points="System design",
+            overall_remark="REC",
+            overall_score=78,
+            is_submitted=True,
+        )
+        BillingLog.objects.create(
+            interview=interview,
+            client=organization,
+            interviewer=interview.interviewer,
+            amount_for_client=Decimal("1500.00"),
+            amount_for_interviewer=Decimal("1000.00"),
+            reason="feedback_submitted",
+            billing_month=today.replace(day=1),
+        )
+    # feedback the interviewer has not submitted yet, submitted by the PATCH case
+    pending_feedback_interview = interviews[3]
+    InterviewFeedback.objects.create(interview=pending_feedback_interview)
+    for level, _ in InterviewerPricing.EXPERIENCE_LEVEL_CHOICES:
+        InterviewerPricing.objects.create(experience_level=level, price=Decimal("1000"))
+
+    # a pending offer for a candidate without an interview, accepted by the
+    # POST case of the confirmation route
+    offered_slot = InterviewerAvailability.objects.get(
+        interviewer=interviewers[1],
+        date=availability_date,
+        start_time=datetime.time(14),
+    )
+    offer = SchedulingOffer.objects.create(
+        scheduling_attempt=InterviewScheduleAttempt.objects.create(
+            candidate=candidates[6]
+        ),
+        availability=offered_slot,
+        scheduled_time=timezone.make_aware(
+            datetime.datetime.combine(availability_date, datetime.time(14))
+        ),
+        booked_by=owner.user,
+        expires_at=timezone.now() + datetime.timedelta(days=1),
+    )
+
+    client_bill = BillingRecord.objects.create(
+        record_type="CLB",
+        client=internal_client,
+        amount_due=Decimal("4500.00"),
+        due_date=today + datetime.timedelta(days=10),
+        invoice_number="INV-0001",
+    )
+    BillingRecord.objects.create(
+        record_type="INP",
+        interviewer=interviewers[0],
+        amount_due=Decimal("1000.00"),
+        due_date=today + datetime.timedelta(days=10),
+    )
+    payment = BillPayments.objects.create(
+        billing_record=client_bill,
+        amount=client_bill.amount_due,
+        payment_link_id="budget-link-1",
+        link_expired_time=timezone.now() + datetime.timedelta(days=1),
+        cf_link_id="cf-budget-link-1",
+    )
+
+    templates = [
+        EngagementTemplates.objects.create(
+            organization=organization,
+            template_name=f"Week {week}",
+            template_html_content="<p>Hello</p>",
+            subject=f"Week {week} check in",
+        )
+        for week in (1, 2)
+    ]
+    engagements = []
+    for candidate in candidates[:3]:
+        engagement = Engagement.objects.create(
+            candidate=candidate,
+            organization=organization,
+            gtp_name="Owner",
+            gtp_email="owner@acme.example.com",
+        )
+        for week, template in enumerate(templates, start=1):
+            EngagementOperation.objects.create(
+                engagement=engagement,
+                template=template,
+                week=week,
+                date=timezone.now() + datetime.timedelta(weeks=week),
+            )
+        engagements.append(engagement)
+
+    candidate_import = CandidateImportJob.objects.create(
+        organization=organization,
+        created_by=owner,
+        file="candidate_imports/budget.csv",
+        status="CMP",
+        total_rows=2,
+        processed_rows=2,
+        created_count=1,
+        error_count=1,
+        errors=[{"row": 3, "errors": {"email": ["Enter a valid email address."]}}],
+    )
+    resume_parse_job = ResumeParseJob.objects.create(
+        created_by=owner.user,
+        status="CMP",
+        total_files=1,
+        processed_files=1,
+        results=[{"file_name": "resume.pdf", "name": "Candidate"}],
+    )
+
+    # snapshot refreshes are queued on commit, which a test never reaches
+    rebuild_snapshots()
+
+    return {
+        "users": {
+            "super_admin": super_admin,
+            "client_owner": owner.user,
+            "client_admin": admin.user,
+            "interviewer": interviewers[0].user,
+        },
+        "organization": organization.id,
+        "organization_id": organization.id,
+        "internal_client": internal_client.id,
+        "hdip_user": hdip_user.id,
+        "client_user_id": recruiters[0].id,
+        "job": jobs[0].id,
+        "job_id": jobs[0].id,
+        "candidate_id": candidates[0].id,
+        "interviewer": interviewers[0].id,
+        "completed_interview": completed_interview.id,
+        "pending_feedback_interview": pending_feedback_interview.id,
+        "accept_offer": f"{offer.token}.accept",
+        "engagement_template": templates[0].id,
+        "engagement_id": engagements[0].id,
+        "engagement_operation_id": engagements[0]
+        .engagementoperations.values_list("id", flat=True)
+        .first(),
+        "interview_uid": urlsafe_base64_encode(
+            force_bytes(f"{completed_interview.candidate_id}:{completed_interview.id}")
+        ),
+        "uid": urlsafe_base64_encode(
+            force_bytes(f"inviter:{owner.user.email};invitee:{admin.user.email}")
+        ),
+        "payment_link_id": payment.payment_link_id,
+        "billing_record_uid": client_bill.public_id,
+        "availability_date": availability_date.strftime("%d/%m/%Y"),
+        "import_id": candidate_import.id,
+        "parse_job_id": resume_parse_job.id,
+        "month_start": today.replace(day=1).strftime("%d/%m/%Y"),
+        "today": today.strftime("%d/%m/%Y"),
+    }
@@ -0,0 +1,173 @@
+import datetime
+import numpy as np
+from django.db.models import Count, Q
+from django.utils import timezone
+from .models import Interview, InterviewerSkill, InterviewerAvailability
+
+SCORE_WEIGHTS = {
+    "skills": 0.35,
+    "experience": 0.2,
+    "level": 0.15,
+    "acceptance": 0.15,
+    "load": 0.15,
+}
+# experience gap (in years) over the required minimum after which the
+# interviewer starts losing points for being overqualified for the round
+EXPERIENCE_GAP_TOLERANCE = 2
+EXPERIENCE_GAP_SCALE = 5.0
+MAX_LEVEL_DISTANCE = 3.0
+NOT_CONDUCTED_STATUSES = ("RESCH", "NJ")
+
+
+def score_interviewers(
+    skill_overlap,
+    required_skill_count,
+    experience_years,
+    candidate_experience,
+    interviewer_levels,
+    client_level,
+    conducted,
+    assigned,
+    weekly_load,
+    weights=SCORE_WEIGHTS,
+):
+    """Vectorized score in [0, 1] for every row of the given equally sized arrays."""
+    skill_overlap = np.asarray(skill_overlap, dtype=np.float64)
+    experience_years = np.asarray(experience_years, dtype=np.float64)
+    interviewer_levels = np.asarray(interviewer_levels, dtype=np.float64)
+    conducted = np.asarray(conducted, dtype=np.float64)
+    assigned = np.asarray(assigned, dtype=np.float64)
+    weekly_load = np.asarray(weekly_load, dtype=np.float64)
+
+    skills = skill_overlap / max(required_skill_count, 1)
+    gap = experience_years - candidate_experience - EXPERIENCE_GAP_TOLERANCE
+    experience = 1.0 / (1.0 + np.clip(gap, 0, None) / EXPERIENCE_GAP_SCALE)
+    level = 1.0 - np.minimum(
+        np.abs(interviewer_levels - client_level) / MAX_LEVEL_DISTANCE, 1.0
+    )
+    # laplace smoothing keeps interviewers without history at 0.5
+    acceptance = np.clip((conducted + 1.0) / (assigned + 2.0), 0, 1)
+    load = 1.0 / (1.0 + weekly_load)
+
+    return (
+        weights["skills"] * np.clip(skills, 0, 1)
+        + weights["experience"] * experience
+        + weights["level"] * level
+        + weights["acceptance"] * acceptance
+        + weights["load"] * load
+    )
+
+
+def top_n_indices(scores, n):
+    """Indices of the n best scores, best first; ties keep their original order."""
+    scores = np.asarray(scores)
+    if n <= 0 or not scores.size:
+        return np.empty(0, dtype=np.intp)
+    if n < scores.size:
+        candidates = np.argpartition(-scores, n - 1)[:n]
+    else:
+        candidates = np.arange(scores.size)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
+
+
+def rank_available_slots(
+    availability_qs, skills, candidate_experience, client_level, date, top_n
+):
+    """
+    Score every slot of the already filtered availability queryset and return
+    the top_n slots (best first) as dicts carrying their score.
+    """
+    rows = np.array(
+        list(
+            availability_qs.values_list(
+                "id",
+                "interviewer_id",
+                "interviewer__total_experience_years",
+                "interviewer__interviewer_level",
+            )
+        ),
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    if not rows.size:
+        return []
+    # the domain join can repeat a slot, keep its first occurrence only
+    _, first_seen = np.unique(rows[:, 0], return_index=True)
+    rows = rows[np.sort(first_seen)]
+
+    slot_ids, slot_interviewers = rows[:, 0], rows[:, 1]
+    interviewer_ids, interviewer_index = np.unique(
+        slot_interviewers, return_inverse=True
+    )
+    interviewer_subquery = availability_qs.values("interviewer_id")
+
+    overlap = np.zeros(interviewer_ids.size)
+    stats = np.zeros((interviewer_ids.size, 3))
+
+    skill_rows = (
+        InterviewerSkill.objects.filter(
+            interviewer_id__in=interviewer_subquery, skill__in=skills
+        )
+        .values("interviewer_id")
+        .annotate(total=Count("id"))
+        .values_list("interviewer_id", "total")
+    )
+    skill_rows = np.array(list(skill_rows), dtype=np.int64).reshape(-1, 2)
+    if skill_rows.size:
+        overlap[np.searchsorted(interviewer_ids, skill_rows[:, 0])] = skill_rows[:, 1]
+
+    week_start = timezone.make_aware(
+        datetime.datetime.combine(
+            date - datetime.timedelta(days=date.weekday()), datetime.time.min
+        )
+    )
+    week_end = week_start + datetime.timedelta(days=7)
+    interview_rows = (
+        Interview.objects.filter(interviewer_id__in=interviewer_subquery)
+        .values("interviewer_id")
+        .annotate(
+            conducted=Count("id", filter=~Q(status__in=NOT_CONDUCTED_STATUSES)),
+            assigned=Count("id"),
+            weekly_load=Count(
+                "id",
+                filter=Q(
+                    status="CSCH",
+                    scheduled_time__gte=week_start,
+                    scheduled_time__lt=week_end,
+                ),
+            ),
+        )
+        .values_list("interviewer_id", "conducted", "assigned", "weekly_load")
+    )
+    interview_rows = np.array(list(interview_rows), dtype=np.int64).reshape(-1, 4)
+    if interview_rows.size:
+        stats[np.searchsorted(interviewer_ids, interview_rows[:, 0])] = interview_rows[
+            :, 1:
+        ]
+
+    scores = score_interviewers(
+        skill_overlap=overlap[interviewer_index],
+        required_skill_count=len(skills),
+        experience_years=rows[:, 2],
+        candidate_experience=candidate_experience,
+        interviewer_levels=rows[:, 3],
+        client_level=client_level,
+        conducted=stats[interviewer_index, 0],
+        assigned=stats[interviewer_index, 1],
+        weekly_load=stats[interviewer_index, 2],
+    )
+    best = top_n_indices(scores, top_n)
+    best_ids = slot_ids[best].tolist()
+    slots = InterviewerAvailability.objects.only(
+        "id", "date", "start_time", "end_time"
+    ).in_bulk(best_ids)
+    return [
+        {
+            "id": slot_id,
+            "date": slots[slot_id].date,
+            "start_time": slots[slot_id].start_time,
+            "end_time": slots[slot_id].end_time,
+            "score": round(float(score), 4),
+        }
+        for slot_id, score in zip(best_ids, scores[best])
+    ]
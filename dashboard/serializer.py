@@ -9,6 +9,9 @@ from .Serializers import (
     HDIPUsersSerializer,
     ClientUserSerializer,
     CandidateSerializer,
+    CandidateImportRowSerializer,
+    CandidateImportJobSerializer,
+    ResumeParseJobSerializer,
     JobSerializer,
     InterviewerAvailabilitySerializer,
     InterviewerRequestSerializer,
@@ -0,0 +1,69 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Candidate, CandidateStatusCounter, Engagement, Interview
+from .snapshots import schedule_snapshot_refresh
+
+
+@receiver(post_save, sender=Candidate)
+def candidate_status_counter_post_save_signal(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous_state = getattr(instance, "_counter_state", None)
+    current_state = instance.get_counter_state()
+
+    if created:
+        CandidateStatusCounter.apply(None, current_state)
+    elif previous_state is None or current_state is None:
+        # the instance was not loaded with the counted fields, recount its organization
+        CandidateStatusCounter.rebuild(instance.organization_id)
+    elif previous_state != current_state:
+        CandidateStatusCounter.apply(previous_state, current_state)
+
+    instance._counter_state = current_state
+
+
+@receiver(post_delete, sender=Candidate)
+def candidate_status_counter_post_delete_signal(sender, instance, **kwargs):
+    CandidateStatusCounter.apply(
+        getattr(instance, "_counter_state", None) or instance.get_counter_state(),
+        None,
+    )
+
+
+@receiver([post_save, post_delete], sender=Candidate)
+def candidate_dashboard_snapshot_signal(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    organization_id = instance.organization_id
+    job_ids = {
+        instance.__dict__.get("designation_id"),
+        getattr(instance, "_loaded_designation_id", None),
+    }
+    schedule_snapshot_refresh(
+        [organization_id], [(organization_id, job_id) for job_id in job_ids]
+    )
+    instance._loaded_designation_id = instance.__dict__.get("designation_id")
+
+
+@receiver(post_delete, sender=Interview)
+def interview_dashboard_snapshot_signal(sender, instance, **kwargs):
+    # Interview.save() saves its candidate, the candidate signal covers saves
+    if not instance.candidate_id:
+        return
+    candidate = (
+        Candidate.objects.filter(pk=instance.candidate_id)
+        .values("organization_id", "designation_id")
+        .first()
+    )
+    if candidate:
+        schedule_snapshot_refresh(
+            [candidate["organization_id"]],
+            [(candidate["organization_id"], candidate["designation_id"])],
+        )
+
+
+@receiver([post_save, post_delete], sender=Engagement)
+def engagement_dashboard_snapshot_signal(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_snapshot_refresh([instance.organization_id])
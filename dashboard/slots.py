@@ -0,0 +1,346 @@
+import bisect
+import datetime
+from dateutil.rrule import rrulestr
+from django.conf import settings
+from django.utils import timezone
+from .models import Interview, InterviewerAvailability, SchedulingOffer
+
+INTERVIEW_DURATION_MINUTES = 60
+# an interviewer's interviews start more than this apart, and booking keeps
+# this much free time on both sides of the interview
+INTERVIEW_GAP_MINUTES = getattr(settings, "INTERVIEW_GAP_MINUTES", 60)
+# what is left of a slot after a booking is offered only if it is this long
+MIN_SLOT_MINUTES = getattr(settings, "MIN_SLOT_MINUTES", 60)
+# recurring availability exists as slots up to this many days ahead
+RECURRENCE_HORIZON_DAYS = getattr(settings, "RECURRENCE_HORIZON_DAYS", 60)
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def to_time(minutes):
+    return datetime.time((minutes // 60) % 24, minutes % 60)
+
+
+class InterviewerDay:
+    """
+    The availability of one interviewer on one day, kept as intervals sorted
+    by start time. The slots of a day never overlap, so their ends are sorted
+    as well and overlap lookups are two binary searches. The interviewer's
+    scheduled interviews around the day are kept sorted for the gap rule.
+
+    load() reads the day once, every operation writes its changes in bulk.
+    """
+
+    def __init__(self, interviewer, date, slots, interview_times=()):
+        self.interviewer = interviewer
+        self.date = date
+        self.slots = sorted(slots, key=lambda slot: (slot.start_time, slot.end_time))
+        self.starts = [to_minutes(slot.start_time) for slot in self.slots]
+        self.ends = [to_minutes(slot.end_time) for slot in self.slots]
+        self.interview_times = sorted(interview_times)
+
+    @classmethod
+    def load(cls, interviewer, date, lock=False, with_interviews=True):
+        """
+        With `lock` the slots and interviews are read with select_for_update,
+        so call it inside a transaction.
+        """
+        slots = InterviewerAvailability.objects.filter(
+            interviewer=interviewer, date=date
+        )
+        if lock:
+            slots = slots.select_for_update()
+
+        interview_times = []
+        if with_interviews:
+            day_start = timezone.make_aware(
+                datetime.datetime.combine(date, datetime.time.min)
+            )
+            interviews = Interview.objects.filter(
+                interviewer=interviewer,
+                status="CSCH",
+                scheduled_time__gte=day_start
+                - datetime.timedelta(minutes=INTERVIEW_GAP_MINUTES),
+                scheduled_time__lte=day_start
+                + datetime.timedelta(days=1, minutes=INTERVIEW_GAP_MINUTES),
+            )
+            if lock:
+                interviews = interviews.select_for_update()
+            interview_times = interviews.values_list("scheduled_time", flat=True)
+        return cls(interviewer, date, list(slots), list(interview_times))
+
+    def get_index(self, slot):
+        index = bisect.bisect_left(self.starts, to_minutes(slot.start_time))
+        while index < len(self.slots) and self.slots[index].pk != slot.pk:
+            index += 1
+        if index == len(self.slots):
+            raise ValueError(f"Slot {slot.pk} is not part of {self.date}")
+        return index
+
+    def replace(self, start_index, end_index, slots):
+        """Put `slots` in place of self.slots[start_index:end_index]"""
+        slots = sorted(slots, key=lambda slot: (slot.start_time, slot.end_time))
+        self.slots[start_index:end_index] = slots
+        self.starts[start_index:end_index] = [
+            to_minutes(slot.start_time) for slot in slots
+        ]
+        self.ends[start_index:end_index] = [to_minutes(slot.end_time) for slot in slots]
+
+    def overlapping(self, start_time, end_time, exclude=None):
+        """Slots sharing any time with [start_time, end_time)"""
+        low = bisect.bisect_right(self.ends, to_minutes(start_time))
+        high = bisect.bisect_left(self.starts, to_minutes(end_time))
+        return [
+            slot
+            for slot in self.slots[low:high]
+            if exclude is None or slot.pk != exclude.pk
+        ]
+
+    def has_gap(self, scheduled_time):
+        """No other scheduled interview starts within INTERVIEW_GAP_MINUTES"""
+        gap = datetime.timedelta(minutes=INTERVIEW_GAP_MINUTES)
+        low = bisect.bisect_left(self.interview_times, scheduled_time - gap)
+        high = bisect.bisect_right(self.interview_times, scheduled_time + gap)
+        return low == high
+
+    def get_family(self, slot):
+        """The slot a booking cut `slot` from and every piece cut from it"""
+        root_id = slot.split_from_id or slot.pk
+        return [
+            other
+            for other in self.slots
+            if other.pk == root_id or other.split_from_id == root_id
+        ]
+
+    def get_free_intervals(self, root, family):
+        """
+        What is left of the hours offered by `root` once the booked slots of
+        the family and the gap around them are taken out, in minutes
+        """
+        offered_start, offered_end = root.get_offered_window()
+        intervals = [(to_minutes(offered_start), to_minutes(offered_end))]
+        for other in family:
+            if other.booked_by_id is None:
+                continue
+            cut_start = to_minutes(other.start_time) - INTERVIEW_GAP_MINUTES
+            cut_end = to_minutes(other.end_time) + INTERVIEW_GAP_MINUTES
+            intervals = [
+                piece
+                for start, end in intervals
+                for piece in ((start, min(end, cut_start)), (max(start, cut_end), end))
+                if piece[1] > piece[0]
+            ]
+        return intervals
+
+    def book(self, slot, scheduled_time, booked_by_id):
+        """
+        Narrow the slot to the interview and offer what is left before and
+        after it, minus the gap, as new slots. Returns the new slots.
+        """
+        index = self.get_index(slot)
+        slot_start, slot_end = self.starts[index], self.ends[index]
+        start = to_minutes(scheduled_time)
+        end = start + INTERVIEW_DURATION_MINUTES
+
+        new_slots = [
+            InterviewerAvailability(
+                interviewer_id=slot.interviewer_id,
+                date=slot.date,
+                start_time=to_time(piece_start),
+                end_time=to_time(piece_end),
+                google_calendar_id=slot.google_calendar_id,
+                split_from_id=slot.split_from_id or slot.pk,
+            )
+            for piece_start, piece_end in (
+                (slot_start, start - INTERVIEW_GAP_MINUTES),
+                (end + INTERVIEW_GAP_MINUTES, slot_end),
+            )
+            if piece_end - piece_start >= MIN_SLOT_MINUTES
+        ]
+
+        if slot.split_from_id is None and slot.offered_start_time is None:
+            slot.offered_start_time = slot.start_time
+            slot.offered_end_time = slot.end_time
+        slot.booked_by_id = booked_by_id
+        slot.is_scheduled = True
+        slot.start_time = to_time(start)
+        slot.end_time = to_time(end)
+        slot.save()
+        InterviewerAvailability.objects.bulk_create(new_slots)
+
+        self.replace(index, index + 1, [slot, *new_slots])
+        return new_slots
+
+    def release(self, slot):
+        """
+        Free a booked slot and give back the time booking took from the slots
+        cut from the same offered hours. Only that family is touched, its free
+        slots are rebuilt from the offered hours minus what is still booked.
+        A free slot whose time went to another one is deleted and its
+        interviews and offers move to the slot which took its time.
+        """
+        slot.booked_by = None
+        slot.booked_by_id = None
+        slot.is_scheduled = False
+        self.slots[self.get_index(slot)] = slot
+
+        root_id = slot.split_from_id or slot.pk
+        family = self.get_family(slot)
+        root = next(other for other in family if other.pk == root_id)
+        intervals = self.get_free_intervals(root, family)
+        released_at = to_minutes(slot.start_time)
+        intervals = [
+            (start, end)
+            for start, end in intervals
+            if end - start >= MIN_SLOT_MINUTES or start <= released_at < end
+        ]
+
+        # the root keeps the family together and the released slot is what the
+        # interview points at, they hold an interval before any other piece
+        free_slots = sorted(
+            (other for other in family if other.booked_by_id is None),
+            key=lambda other: (other.pk != root_id, other.pk != slot.pk),
+        )
+        holders, absorbed = {}, {}
+        for other in free_slots:
+            other_start = to_minutes(other.start_time)
+            interval = next(
+                (
+                    (start, end)
+                    for start, end in intervals
+                    if start <= other_start < end
+                ),
+                None,
+            )
+            if interval is None:
+                continue
+            if interval in holders:
+                absorbed.setdefault(holders[interval].pk, []).append(other.pk)
+            else:
+                holders[interval] = other
+
+        for holder_pk, absorbed_pks in absorbed.items():
+            Interview.objects.filter(availability_id__in=absorbed_pks).update(
+                availability_id=holder_pk
+            )
+            SchedulingOffer.objects.filter(availability_id__in=absorbed_pks).update(
+                availability_id=holder_pk
+            )
+        deleted = {pk for absorbed_pks in absorbed.values() for pk in absorbed_pks}
+        InterviewerAvailability.objects.filter(pk__in=deleted).delete()
+
+        for (start, end), holder in holders.items():
+            holder.start_time = to_time(start)
+            holder.end_time = to_time(end)
+            holder.save()
+        new_slots = InterviewerAvailability.objects.bulk_create(
+            [
+                InterviewerAvailability(
+                    interviewer_id=root.interviewer_id,
+                    date=root.date,
+                    start_time=to_time(start),
+                    end_time=to_time(end),
+                    google_calendar_id=root.google_calendar_id,
+                    split_from_id=root_id,
+                )
+                for start, end in intervals
+                if (start, end) not in holders
+            ]
+        )
+
+        changed = deleted | {holder.pk for holder in holders.values()}
+        self.replace(
+            0,
+            len(self.slots),
+            [other for other in self.slots if other.pk not in changed]
+            + list(holders.values())
+            + new_slots,
+        )
+        return slot
+
+
+def get_recurrence_rule(recurrence):
+    """RRULE (RFC 5545) of the data validated by RecurrenceSerializer"""
+    parts = [
+        f"FREQ={recurrence['frequency']}",
+        f"INTERVAL={recurrence.get('intervals') or 1}",
+    ]
+    if recurrence.get("until"):
+        until = recurrence["until"]
+        if timezone.is_aware(until):
+            until = timezone.make_naive(until)
+        parts.append(f"UNTIL={until.strftime('%Y%m%dT%H%M%S')}")
+    elif recurrence.get("count"):
+        parts.append(f"COUNT={recurrence['count']}")
+    if recurrence.get("days"):
+        parts.append(f"BYDAY={','.join(recurrence['days'])}")
+    if recurrence.get("month_day"):
+        parts.append(f"BYMONTHDAY={','.join(map(str, recurrence['month_day']))}")
+    if recurrence.get("year_day"):
+        parts.append(f"BYYEARDAY={','.join(map(str, recurrence['year_day']))}")
+    return ";".join(parts)
+
+
+def get_horizon_end():
+    return timezone.localdate() + datetime.timedelta(days=RECURRENCE_HORIZON_DAYS)
+
+
+def materialize_recurrence(series, horizon_end=None):
+    """
+    Create the slots of the series' recurrence rule from where the last run
+    stopped up to `horizon_end`. Days where the interviewer already has a slot
+    overlapping the series' hours are skipped, they are found with one query
+    and the new slots are written with one bulk_create.
+
+    The series row is a slot too and booking narrows it, the hours are read
+    from its offered window so bookings never leak into later occurrences.
+    """
+    horizon_end = horizon_end or get_horizon_end()
+    start_time, end_time = series.get_offered_window()
+    materialized_until = series.materialized_until or series.date
+    if materialized_until >= horizon_end:
+        return []
+
+    rule = rrulestr(
+        series.recurrence_rule,
+        dtstart=datetime.datetime.combine(series.date, start_time),
+    )
+    dates = {
+        occurrence.date()
+        for occurrence in rule.between(
+            datetime.datetime.combine(
+                materialized_until + datetime.timedelta(days=1), datetime.time.min
+            ),
+            datetime.datetime.combine(horizon_end, datetime.time.max),
+            inc=True,
+        )
+    }
+    if dates:
+        dates -= set(
+            InterviewerAvailability.objects.filter(
+                interviewer_id=series.interviewer_id,
+                date__in=dates,
+                start_time__lt=end_time,
+                end_time__gt=start_time,
+            ).values_list("date", flat=True)
+        )
+
+    occurrences = InterviewerAvailability.objects.bulk_create(
+        [
+            InterviewerAvailability(
+                interviewer_id=series.interviewer_id,
+                date=date,
+                start_time=start_time,
+                end_time=end_time,
+                notes=series.notes,
+                google_calendar_id=series.google_calendar_id,
+                recurrence_parent=series,
+            )
+            for date in sorted(dates)
+        ]
+    )
+    series.materialized_until = horizon_end
+    series.save(update_fields=["materialized_until", "updated_at"])
+    return occurrences
@@ -0,0 +1,279 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from organizations.models import Organization
+from externals.analytics import get_daily_candidate_analytics
+from .models import (
+    Candidate,
+    ClientUser,
+    DashboardSnapshot,
+    InternalInterviewer,
+    Job,
+)
+
+SNAPSHOT_REFRESH_DELAY = getattr(settings, "DASHBOARD_SNAPSHOT_REFRESH_DELAY", 30)
+
+
+def get_client_dashboard_data(all_jobs, candidates):
+    # Job role aggregates
+    job_role_aggregates = all_jobs.values("name").annotate(
+        count=Count(
+            "id",
+            filter=Q(reason_for_archived__isnull=True) | Q(reason_for_archived=""),
+        )
+    )
+
+    # Candidate progress aggregates
+    candidates = candidates.aggregate(
+        total_interviews=Count(
+            "id", filter=Q(status__in=["COMPLETED", "HREC", "REC", "NREC", "SNREC"])
+        ),
+        pending_schedule=Count("id", filter=Q(status="NSCH")),
+        selects=Count("id", filter=Q(final_selection_status="SLD")),
+        joined=Count("id", filter=Q(engagements__status="JND")),
+    )
+
+    # Job aggregation
+    job_aggregates = all_jobs.aggregate(
+        total_jobs=Count("id", distinct=True),
+        total_candidates=Count("candidate"),
+        selects=Count("candidate", filter=Q(candidate__final_selection_status="SLD")),
+        rejects=Count("candidate", filter=Q(candidate__final_selection_status="RJD")),
+    )
+
+    return {
+        "job_role_aggregates": list(job_role_aggregates),
+        "candidates": candidates,
+        "job_aggregates": job_aggregates,
+    }
+
+
+def get_internal_dashboard_data():
+    interviewers_stats = InternalInterviewer.objects.aggregate(
+        total=Count("id"),
+        pending_acceptance=Count(
+            "interview_requests", filter=Q(interview_requests__status="pending")
+        ),
+        interview_declined=Count(
+            "interview_requests", filter=Q(interview_requests__status="rejected")
+        ),
+    )
+
+    candidates_stats = Candidate.objects.aggregate(
+        recommended=Count("id", filter=Q(status="recommended")),
+        rejected=Count("id", filter=Q(final_selection_status="rejected")),
+        strong_candidates=Count("id", filter=Q(status="Highly Recommended")),
+        scheduled=Count("id", filter=Q(status="scheduled")),
+    )
+
+    clients_stats = ClientUser.objects.aggregate(
+        active_clients=Count("id", filter=Q(status="Active")),
+        passive_clients=Count("id", filter=Q(status="Inactive")),
+        pending_onboarding=Count("id", filter=Q(status="pending")),
+        client_users=Count("id"),
+    )
+
+    general_stats = InternalInterviewer.objects.aggregate(
+        total_interviewers=Count("id"),
+        new_interviewers=Count("id", filter=Q(created_at__gte="2025-03-01")),
+    )
+
+    active_jobs = Job.objects.filter(reason_for_archived=False).count()
+    total_candidates = Candidate.objects.count()
+
+    return {
+        "interviewers": {**interviewers_stats, **candidates_stats},
+        "clients": clients_stats,
+        "details": {
+            **general_stats,
+            "active_jobs": active_jobs,
+            "total_candidates": total_candidates,
+        },
+    }
+
+
+def get_engagement_counts(organization_qs):
+    return organization_qs.annotate(
+        active_candidates=Count(
+            "candidate",
+            filter=Q(candidate__final_selection_status="SLD"),
+            distinct=True,
+        ),  # Count of candidates per organization
+        scheduled=Count(
+            "candidate",
+            filter=Q(candidate__engagements__isnull=False)
+            & Q(candidate__final_selection_status="SLD"),
+            distinct=True,
+        ),
+        pending_scheduled=Count(
+            "candidate",
+            filter=Q(candidate__engagements__isnull=True)
+            & Q(candidate__final_selection_status="SLD"),
+            distinct=True,
+        ),
+    ).values("id", "active_candidates", "scheduled", "pending_scheduled")
+
+
+def store_snapshot(scope, data, organization_id=None, job_id=None):
+    snapshot, _ = DashboardSnapshot.objects.update_or_create(
+        key=DashboardSnapshot.make_key(scope, organization_id, job_id),
+        defaults={
+            "scope": scope,
+            "organization_id": organization_id,
+            "job_id": job_id,
+            "data": data,
+            "refreshed_at": timezone.now(),
+        },
+    )
+    return snapshot
+
+
+def refresh_client_snapshot(organization_id):
+    return store_snapshot(
+        "CLIENT",
+        get_client_dashboard_data(
+            Job.objects.filter(hiring_manager__organization_id=organization_id),
+            Candidate.objects.filter(organization_id=organization_id),
+        ),
+        organization_id=organization_id,
+    )
+
+
+def refresh_internal_snapshot():
+    return store_snapshot("INTERNAL", get_internal_dashboard_data())
+
+
+def refresh_engagement_snapshots(organization_ids=None):
+    organization_qs = Organization.objects.order_by()
+    if organization_ids is not None:
+        organization_qs = organization_qs.filter(pk__in=organization_ids)
+    return {
+        counts["id"]: store_snapshot(
+            "ENGAGEMENT",
+            {key: value for key, value in counts.items() if key != "id"},
+            organization_id=counts["id"],
+        )
+        for counts in get_engagement_counts(organization_qs)
+    }
+
+
+def refresh_job_analytics_snapshot(organization_id, job_id):
+    return store_snapshot(
+        "ANALYTICS",
+        get_daily_candidate_analytics(
+            Candidate.objects.filter(
+                organization_id=organization_id, designation_id=job_id
+            )
+        ),
+        organization_id=organization_id,
+        job_id=job_id,
+    )
+
+
+def get_snapshot(scope, refresh, organization_id=None, job_id=None):
+    """Return (data, refreshed_at) of the snapshot, computing it on first use"""
+    snapshot = (
+        DashboardSnapshot.objects.filter(
+            key=DashboardSnapshot.make_key(scope, organization_id, job_id)
+        )
+        .values_list("data", "refreshed_at")
+        .first()
+    )
+    if snapshot is None:
+        snapshot = refresh()
+        snapshot = (snapshot.data, snapshot.refreshed_at)
+    return snapshot
+
+
+def get_engagement_snapshots(organization_ids):
+    """Return ({organization_id: counts}, oldest refreshed_at) for the given organizations"""
+    snapshots = {
+        organization_id: (data, refreshed_at)
+        for organization_id, data, refreshed_at in DashboardSnapshot.objects.filter(
+            scope="ENGAGEMENT", organization_id__in=organization_ids
+        ).values_list("organization_id", "data", "refreshed_at")
+    }
+    missing = set(organization_ids) - set(snapshots)
+    if missing:
+        for organization_id, snapshot in refresh_engagement_snapshots(missing).items():
+            snapshots[organization_id] = (snapshot.data, snapshot.refreshed_at)
+
+    refreshed_at = min(
+        (refreshed_at for _, refreshed_at in snapshots.values()), default=None
+    )
+    return {key: data for key, (data, _) in snapshots.items()}, refreshed_at
+
+
+def refresh_snapshots(organization_ids=(), jobs=(), internal=False):
+    """jobs is a list of (organization_id, job_id) pairs"""
+    for organization_id in organization_ids:
+        refresh_client_snapshot(organization_id)
+    if organization_ids:
+        refresh_engagement_snapshots(organization_ids)
+    for organization_id, job_id in jobs:
+        refresh_job_analytics_snapshot(organization_id, job_id)
+    if internal:
+        refresh_internal_snapshot()
+
+
+def rebuild_snapshots():
+    for organization_id in Organization.objects.values_list("id", flat=True):
+        refresh_client_snapshot(organization_id)
+    refresh_engagement_snapshots()
+    for organization_id, job_id in (
+        Candidate.objects.filter(designation__isnull=False)
+        .values_list("organization_id", "designation_id")
+        .distinct()
+        .order_by()
+    ):
+        refresh_job_analytics_snapshot(organization_id, job_id)
+    refresh_internal_snapshot()
+
+
+def schedule_snapshot_refresh(organization_ids=(), jobs=()):
+    """
+    Queue a refresh of the snapshots touched by a write once the transaction
+    commits. Writes committing within SNAPSHOT_REFRESH_DELAY seconds of each
+    other are folded into the same refresh. The debounce keys are claimed on
+    commit, a rolled back write must not hold back the next refresh.
+    """
+    from .tasks import refresh_dashboard_snapshots
+
+    organization_ids = {
+        organization_id for organization_id in organization_ids if organization_id
+    }
+    jobs = {
+        (organization_id, job_id)
+        for organization_id, job_id in jobs
+        if organization_id and job_id
+    }
+
+    def claim(key):
+        return cache.add(f"dashboard-snapshot:{key}", True, SNAPSHOT_REFRESH_DELAY)
+
+    def enqueue():
+        claimed_organization_ids = [
+            organization_id
+            for organization_id in organization_ids
+            if claim(f"organization:{organization_id}")
+        ]
+        claimed_jobs = [
+            [organization_id, job_id]
+            for organization_id, job_id in jobs
+            if claim(f"job:{organization_id}:{job_id}")
+        ]
+        internal = claim("internal")
+        if not (claimed_organization_ids or claimed_jobs or internal):
+            return
+        refresh_dashboard_snapshots.apply_async(
+            kwargs={
+                "organization_ids": claimed_organization_ids,
+                "jobs": claimed_jobs,
+                "internal": internal,
+            },
+            countdown=SNAPSHOT_REFRESH_DELAY,
+        )
+
+    transaction.on_commit(enqueue)
@@ -1,10 +1,15 @@
 import os
+import uuid
+import logging
+import shutil
+import tempfile
 import requests
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives, get_connection
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db import transaction
-from django.db.models import F
+from django.db.models import F, Q
 from django.template.loader import render_to_string
 from django.utils import timezone
 from celery import shared_task, chain, group
@@ -13,17 +18,51 @@ from django.conf import settings
 from django.utils.safestring import mark_safe
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
-from .models import EngagementOperation, Interview, InterviewFeedback
-from externals.google.google_meet import download_from_google_drive
+from .models import (
+    CandidateImportJob,
+    EngagementOperation,
+    Interview,
+    InterviewFeedback,
+    InterviewerAvailability,
+    ResumeParseJob,
+)
+from externals.google.google_meet import (
+    create_meet_and_calendar_invite,
+    download_from_google_drive,
+    get_meeting_infos,
+    get_recording_attachments,
+)
 from datetime import datetime, timedelta
 from externals.feedback.interview_feedback import (
     analyze_transcription_and_generate_feedback,
 )
+from externals.parser.resumeparser2 import process_resumes
+from .snapshots import refresh_snapshots, rebuild_snapshots
+from .slots import get_horizon_end, materialize_recurrence
+
+logger = logging.getLogger(__name__)
 
 CONTACT_EMAIL = settings.EMAIL_HOST_USER if settings.DEBUG else settings.CONTACT_EMAIL
 INTERVIEW_EMAIL = (
     settings.EMAIL_HOST_USER if settings.DEBUG else settings.INTERVIEW_EMAIL
 )
+# recording queue: interviews claimed per run, how long a claim lasts and how
+# many claims an interview gets before it is marked as failed
+RECORDING_BATCH_SIZE = getattr(settings, "RECORDING_BATCH_SIZE", 50)
+RECORDING_LEASE_SECONDS = getattr(settings, "RECORDING_LEASE_SECONDS", 2 * 60 * 60)
+RECORDING_MAX_ATTEMPTS = getattr(settings, "RECORDING_MAX_ATTEMPTS", 4)
+# interviews handed out per run of the feedback dispatcher. The tasks run on
+# the "feedback" queue, the concurrency of its worker bounds the calls to the
+# model. An interview is marked as failed after FEEDBACK_MAX_ATTEMPTS claims.
+FEEDBACK_DISPATCH_LIMIT = getattr(settings, "FEEDBACK_DISPATCH_LIMIT", 50)
+FEEDBACK_CLAIM_TIMEOUT = getattr(settings, "FEEDBACK_CLAIM_TIMEOUT", 2 * 60 * 60)
+FEEDBACK_MAX_ATTEMPTS = getattr(settings, "FEEDBACK_MAX_ATTEMPTS", 3)
+# Meet creation is retried after MEETING_RETRY_DELAY seconds, doubled on every
+# retry, then the interview is marked with meeting_failed
+MEETING_RETRY_DELAY = getattr(settings, "MEETING_RETRY_DELAY", 10)
+MEETING_MAX_RETRIES = getattr(settings, "MEETING_MAX_RETRIES", 5)
+# resumes parsed between two progress updates of a ResumeParseJob
+RESUME_PARSE_CHUNK_SIZE = getattr(settings, "RESUME_PARSE_CHUNK_SIZE", 5)
 
 
 @shared_task(bind=True, max_retries=3, rate_limit="10/m")
@@ -160,77 +199,175 @@ def send_schedule_engagement_email(self, engagement_operation_id):
         raise self.retry(exec=e, countdown=60)
 
 
+def get_interview_event_id(interview):
+    # calendar event ids only take the characters a-v and 0-9
+    return f"hdip{interview.pk}t{int(interview.scheduled_time.timestamp())}"
+
+
+@shared_task(bind=True, max_retries=MEETING_MAX_RETRIES)
+def create_interview_meeting(self, interview_id, contexts):
+    """
+    Create the Meet and calendar invite of a booked interview, then send the
+    confirmation emails with the link. Safe to run more than once: the event
+    id is derived from the interview and the emails go out only from the run
+    which stored the link. When the last retry fails the interview is marked
+    with meeting_failed.
+    """
+    interview = (
+        Interview.objects.select_related(
+            "interviewer", "candidate", "candidate__designation"
+        )
+        .filter(pk=interview_id, status="CSCH")
+        .first()
+    )
+    if not interview:
+        raise Reject(f"Interview {interview_id} is not scheduled")
+    if interview.scheduled_service_account_event_id:
+        return interview_id
+
+    try:
+        meeting_link, event_id = create_meet_and_calendar_invite(
+            interview.interviewer.email,
+            interview.candidate.email,
+            interview.scheduled_time,
+            interview.scheduled_time + timedelta(hours=1),
+            candidate_name=interview.candidate.name,
+            designation_name=interview.candidate.designation.get_name_display(),
+            event_id=get_interview_event_id(interview),
+        )
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            logger.exception(
+                f"Meet creation failed for interview {interview_id}, giving up"
+            )
+            Interview.objects.filter(pk=interview_id).update(meeting_failed=True)
+            raise
+        logger.warning(
+            f"Meet creation failed for interview {interview_id}, retrying",
+            exc_info=True,
+        )
+        raise self.retry(exc=e, countdown=MEETING_RETRY_DELAY * 2**self.request.retries)
+
+    if Interview.objects.filter(
+        pk=interview_id, scheduled_service_account_event_id__isnull=True
+    ).update(
+        meeting_link=meeting_link,
+        scheduled_service_account_event_id=event_id,
+        meeting_failed=False,
+    ):
+        send_email_to_multiple_recipients.delay(
+            [{**context, "meeting_link": meeting_link} for context in contexts],
+            "",
+            "",
+        )
+    return interview_id
+
+
+def release_recording(interview_id, claim, stage):
+    """Give the claim back, the next run of the queue retries the interview"""
+    released = {"recording_lease_until": None, "recording_claim": None}
+    Interview.objects.filter(
+        pk=interview_id,
+        recording_claim=claim,
+        recording_attempts__gte=RECORDING_MAX_ATTEMPTS,
+    ).update(recording_stage="FLD", **released)
+    Interview.objects.filter(pk=interview_id, recording_claim=claim).update(
+        recording_stage=stage, **released
+    )
+
+
 @shared_task
 def fetch_interview_records():
+    """
+    Claim the interviews whose recording is due. The rows are read with SKIP
+    LOCKED so two dispatchers never claim the same interview. A claim is a
+    lease which expires when the worker holding it dies.
+    """
     current_time = timezone.now()
     before_one_and_half_an_hour = current_time - timedelta(hours=2, minutes=30)
+    claim = uuid.uuid4()
+    with transaction.atomic():
+        interview_ids = list(
+            Interview.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(recording_lease_until__isnull=True)
+                | Q(recording_lease_until__lt=current_time),
+                scheduled_time__lte=before_one_and_half_an_hour,
+                status="CSCH",
+                downloaded=False,
+                scheduled_service_account_event_id__isnull=False,
+                recording_stage__in=["EVT", "DWN", "STR"],
+                recording_attempts__lt=RECORDING_MAX_ATTEMPTS,
+            )
+            .order_by("scheduled_time")
+            .values_list("id", flat=True)[:RECORDING_BATCH_SIZE]
+        )
+        Interview.objects.filter(pk__in=interview_ids).update(
+            recording_claim=claim,
+            recording_lease_until=current_time
+            + timedelta(seconds=RECORDING_LEASE_SECONDS),
+            recording_attempts=F("recording_attempts") + 1,
+        )
     interview_qs = Interview.objects.filter(
-        scheduled_time__lte=before_one_and_half_an_hour,
-        status="CSCH",
-        downloaded=False,
-        scheduled_service_account_event_id__isnull=False,
-        no_of_time_processed__lte=3,
+        pk__in=interview_ids, recording_claim=claim
     ).values_list("id", "scheduled_service_account_event_id")
-    return list(interview_qs)
+    return [
+        [interview_id, event_id, str(claim)] for interview_id, event_id in interview_qs
+    ]
 
 
 @shared_task(bind=True, retry_backoff=10, max_retries=3)
-def download_recordings_from_google_drive(self, interview_info):
-    if not interview_info or len(interview_info) != 2:
+def download_recordings_from_google_drive(self, interview_info, attachments=None):
+    if not interview_info or len(interview_info) != 3:
         raise Reject("Missing or invalid interview info")
-    interview_id, event_id = interview_info
+    interview_id, event_id, claim = interview_info
+    if not Interview.objects.filter(pk=interview_id, recording_claim=claim).update(
+        recording_stage="DWN"
+    ):
+        raise Reject(f"Interview {interview_id} is no longer claimed by this task")
     try:
-        download_recording_info = download_from_google_drive(interview_id, event_id)
+        download_recording_info = download_from_google_drive(
+            interview_id, event_id, attachments
+        )
         if not download_recording_info:
-            Interview.objects.filter(pk=interview_id).update(
-                no_of_time_processed=F("no_of_time_processed") + 1
-            )
+            # the recording is not attached to the event yet
+            release_recording(interview_id, claim, "EVT")
             raise Reject(f"Failed to download recordings for Interview {interview_id}")
-        return download_recording_info
+        Interview.objects.filter(pk=interview_id, recording_claim=claim).update(
+            recording_stage="STR"
+        )
+        return {**download_recording_info, "claim": claim}
     except Reject:
         raise
     except Exception as e:
         print(
             f"Exception occured in download_recordings_from_google_drive:{interview_id} - {str(e)}"
         )
+        if self.request.retries >= self.max_retries:
+            release_recording(interview_id, claim, "DWN")
+            raise
         raise self.retry(exc=e)
 
 
 @shared_task
 def store_recordings(recording_info):
-    try:
-        interview = Interview.objects.get(pk=recording_info["interview_id"])
-    except Interview.DoesNotExist:
-        raise Reject(f"Interview {recording_info['interview_id']} not found")
-    files_to_delete = []
-    with transaction.atomic():
-        for file_type, file in recording_info["files"].items():
-            try:
-                with open(file["path"], "rb") as f:
-                    if file_type == "video":
-                        interview.recording.save(file["name"], f)
-                    elif file_type == "transcript":
-                        interview.transcription.save(file["name"], f)
-            except Exception as e:
-                raise Reject(f"Error processing file {file['path']}: {str(e)}")
-            files_to_delete.append(file["path"])
-
-        interview.downloaded = True
-        interview.no_of_time_processed += 1
-        interview.save(
-            update_fields=[
-                "recording",
-                "transcription",
-                "downloaded",
-                "no_of_time_processed",
-            ]
+    # the files are already in the storage, only their names are recorded here.
+    # update() writes one row, no transaction is held while files move
+    files = recording_info["files"]
+    if not Interview.objects.filter(
+        pk=recording_info["interview_id"], recording_claim=recording_info["claim"]
+    ).update(
+        recording=files["video"]["name"],
+        transcription=files["transcript"]["name"],
+        downloaded=True,
+        recording_stage="TRN",
+        recording_lease_until=None,
+        recording_claim=None,
+    ):
+        raise Reject(
+            f"Interview {recording_info['interview_id']} is no longer claimed by this task"
         )
-
-    for file_path in files_to_delete:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-
-    return interview.id
+    return recording_info["interview_id"]
 
 
 @shared_task(bind=True)
@@ -238,13 +375,30 @@ def process_interview_recordings(self, interview_record_ids):
     if not interview_record_ids:
         raise Reject("No interviews to process")
 
-    tasks = [
-        chain(
-            download_recordings_from_google_drive.s(interview_info),
-            store_recordings.s(),
+    # one batched Calendar call for all the events instead of one per download
+    events = get_meeting_infos([event_id for _, event_id, _ in interview_record_ids])
+    tasks = []
+    for interview_id, event_id, claim in interview_record_ids:
+        event_info = events.get(event_id)
+        if event_info is None or isinstance(event_info, Exception):
+            # the download task looks the event up again, with its own retries
+            attachments = None
+        else:
+            attachments = get_recording_attachments(event_info)
+            if not attachments:
+                # the recording is not attached to the event yet
+                release_recording(interview_id, claim, "EVT")
+                continue
+        tasks.append(
+            chain(
+                download_recordings_from_google_drive.s(
+                    [interview_id, event_id, claim], attachments
+                ),
+                store_recordings.s(),
+            )
         )
-        for interview_info in interview_record_ids
-    ]
+    if not tasks:
+        return
     group(*tasks).apply_async()
 
 
@@ -253,59 +407,119 @@ def trigger_interview_processing():
     chain(fetch_interview_records.s(), process_interview_recordings.s()).apply_async()
 
 
+def get_feedback_claim_filter():
+    # a claim older than the timeout belongs to a task which died, it is retried
+    return (
+        Q(feedback_claimed_at__isnull=True)
+        | Q(
+            feedback_claimed_at__lt=timezone.now()
+            - timedelta(seconds=FEEDBACK_CLAIM_TIMEOUT)
+        )
+    ) & Q(feedback_attempts__lt=FEEDBACK_MAX_ATTEMPTS)
+
+
+def get_feedback_notification_contexts(interview):
+    interviewer_name = interview.interviewer.name
+    candidate_name = interview.candidate.name
+    organization = interview.candidate.organization
+    return [
+        {
+            "interviewer_name": interviewer_name,
+            "candidate_name": candidate_name,
+            "dashboard_link": f"https://{settings.SITE_DOMAIN}/",
+            "type": "feedback_notification",
+            "email": interview.interviewer.email,
+            "from_email": INTERVIEW_EMAIL,
+            "subject": f"Ready to Review? Feedback for {candidate_name} is Live",
+            "template": "interview_feedback_notification_email.html",
+        },
+        {
+            "internal_user_name": organization.internal_client.assigned_to.name,
+            "organization_name": organization.name,
+            "position": interview.candidate.designation.get_name_display(),
+            "interviewer_name": interviewer_name,
+            "interview_date": interview.scheduled_time.strftime("%d/%m/%Y %H:%M"),
+            "candidate_name": candidate_name,
+            "email": organization.internal_client.assigned_to.user.email,
+            "from_email": INTERVIEW_EMAIL,
+            "subject": f"Feedback Report Generated: Insights from {interviewer_name}'s Interview with {candidate_name}",
+            "template": "internal_interview_feedback_report_generated_conformation.html",
+        },
+    ]
+
+
 @shared_task(bind=True, retry_backoff=5, max_retries=3)
 def process_interview_video_and_generate_and_store_feedback(self):
     interviews = (
         Interview.objects.filter(
-            transcription__isnull=False, interview_feedback__isnull=True
+            get_feedback_claim_filter(),
+            transcription__isnull=False,
+            interview_feedback__isnull=True,
         )
         .exclude(transcription="")
-        .only("id", "feedback")
+        .exclude(recording_stage="FLD")
+        .select_related(
+            "interviewer",
+            "candidate__designation",
+            "candidate__organization__internal_client__assigned_to__user",
+        )
+        .order_by("scheduled_time")[:FEEDBACK_DISPATCH_LIMIT]
     )
-    print(interviews)
-    processed_ids = []
+
+    tasks = []
     for interview in interviews:
         try:
-            with interview.transcription.open("r") as f:
-                file_content = f.read()
-            extracted_data = analyze_transcription_and_generate_feedback(file_content)
-
-            InterviewFeedback.objects.update_or_create(
-                interview_id=interview.id, defaults={**extracted_data}
+            contexts = get_feedback_notification_contexts(interview)
+        except Exception:
+            logger.exception(
+                f"Unable to build the feedback notifications for {interview.id}"
+            )
+            continue
+        tasks.append(
+            generate_interview_feedback.s(
+                interview.id, interview.transcription.name, contexts
             )
-            processed_ids.append(interview.id)
-            interviewer_name = interview.interviewer.name
-            candidate_name = interview.candidate.name
-            contexts = [
-                {
-                    "interviewer_name": interviewer_name,
-                    "candidate_name": candidate_name,
-                    "dashboard_link": f"https://{settings.SITE_DOMAIN}/",
-                    "type": "feedback_notification",
-                    "email": interview.interviewer.email,
-                    "from_email": INTERVIEW_EMAIL,
-                    "subject": f"Ready to Review? Feedback for {candidate_name} is Live",
-                    "template": "interview_feedback_notification_email.html",
-                },
-                {
-                    "internal_user_name": interview.candidate.organization.internal_client.assigned_to.name,
-                    "organization_name": interview.candidate.organization.name,
-                    "position": interview.candidate.designation.get_name_display(),
-                    "interviewer_name": interview.interviewer.name,
-                    "interview_date": interview.scheduled_time.strftime(
-                        "%d/%m/%Y %H:%M"
-                    ),
-                    "candidate_name": candidate_name,
-                    "email": interview.candidate.organization.internal_client.assigned_to.user.email,
-                    "from_email": INTERVIEW_EMAIL,
-                    "subject": f"Feedback Report Generated: Insights from {interviewer_name}'s Interview with {candidate_name}",
-                    "template": "internal_interview_feedback_report_generated_conformation.html",
-                },
-            ]
-            send_email_to_multiple_recipients.delay(contexts, "", "")
-        except Exception as e:
-            print(str(e))
-    return f"Interview feedback created successfully for {processed_ids}."
+        )
+    if tasks:
+        group(*tasks).apply_async()
+    return f"Interview feedback generation queued for {len(tasks)} interviews."
+
+
+@shared_task
+def generate_interview_feedback(interview_id, transcription_name, contexts):
+    # claim the interview, a task queued by an overlapping run stops here
+    if not Interview.objects.filter(
+        get_feedback_claim_filter(),
+        pk=interview_id,
+        interview_feedback__isnull=True,
+    ).update(
+        feedback_claimed_at=timezone.now(),
+        feedback_attempts=F("feedback_attempts") + 1,
+    ):
+        return f"Interview {interview_id} feedback already claimed."
+
+    try:
+        with default_storage.open(transcription_name, "r") as f:
+            file_content = f.read()
+        extracted_data = analyze_transcription_and_generate_feedback(file_content)
+        if not extracted_data:
+            raise ValueError("No feedback generated from the transcription")
+        InterviewFeedback.objects.update_or_create(
+            interview_id=interview_id, defaults={**extracted_data}
+        )
+        Interview.objects.filter(pk=interview_id).update(recording_stage="DONE")
+    except Exception:
+        # release the claim so the next run picks the interview up again,
+        # unless it used up its attempts
+        Interview.objects.filter(
+            pk=interview_id, feedback_attempts__gte=FEEDBACK_MAX_ATTEMPTS
+        ).update(recording_stage="FLD")
+        Interview.objects.filter(pk=interview_id).update(feedback_claimed_at=None)
+        logger.exception(f"Feedback generation failed for {interview_id}")
+        return f"Interview {interview_id} feedback failed."
+
+    send_email_to_multiple_recipients.delay(contexts, "", "")
+    return f"Interview feedback created successfully for {interview_id}."
 
 
 @shared_task(bind=True, retry_backoff=5, max_retries=3)
@@ -350,3 +564,88 @@ def download_feedback_pdf(self, interview_uid):
         error_message = response.content.decode("utf-8")
         print(f"Failed to generate PDF: {error_message}")
         self.retry(exc=Exception("Failed to generate PDF"))
+
+
+@shared_task
+def refresh_dashboard_snapshots(organization_ids=(), jobs=(), internal=False):
+    refresh_snapshots(organization_ids, jobs, internal)
+
+
+@shared_task
+def rebuild_dashboard_snapshots():
+    rebuild_snapshots()
+    return "Dashboard snapshots rebuilt successfully."
+
+
+@shared_task
+def import_candidates(import_job_id):
+    # imported here, the import module depends on the serializers importing this file
+    from .candidate_import import run_candidate_import
+
+    # claim the import so a redelivered task does not insert the rows twice
+    if not CandidateImportJob.objects.filter(pk=import_job_id, status="PED").update(
+        status="PRG"
+    ):
+        return "Candidate import already processed."
+    import_job = run_candidate_import(CandidateImportJob.objects.get(pk=import_job_id))
+    return f"Candidate import finished with status {import_job.status}."
+
+
+@shared_task()
+def parse_resumes(parse_job_id):
+    if not ResumeParseJob.objects.filter(pk=parse_job_id, status="PED").update(
+        status="PRG"
+    ):
+        return "Resume parse job already processed."
+    parse_job = ResumeParseJob.objects.get(pk=parse_job_id)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for start in range(0, len(parse_job.files), RESUME_PARSE_CHUNK_SIZE):
+            chunk = parse_job.files[start : start + RESUME_PARSE_CHUNK_SIZE]
+            paths = []
+            for index, file in enumerate(chunk, start=start):
+                # one directory per file, two uploads may share a name
+                path = os.path.join(temp_dir, str(index), file["name"])
+                os.makedirs(os.path.dirname(path))
+                with default_storage.open(file["path"], "rb") as source, open(
+                    path, "wb"
+                ) as target:
+                    shutil.copyfileobj(source, target)
+                paths.append(path)
+
+            parse_job.results.extend(process_resumes(paths))
+            parse_job.processed_files += len(chunk)
+            parse_job.save(update_fields=["results", "processed_files", "updated_at"])
+        parse_job.status = "CMP"
+    except Exception as e:
+        parse_job.status = "FLD"
+        parse_job.failure_reason = str(e)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        for file in parse_job.files:
+            default_storage.delete(file["path"])
+        parse_job.files = []
+
+    parse_job.save(update_fields=["status", "failure_reason", "files", "updated_at"])
+    return f"Resume parse job finished with status {parse_job.status}."
+
+
+@shared_task
+def extend_recurring_availability():
+    """
+    Move the horizon of every recurring availability forward. Each series
+    remembers how far it was materialized, so a nightly run only creates the
+    days which came into the horizon since the last one.
+    """
+    horizon_end = get_horizon_end()
+    series_qs = InterviewerAvailability.objects.filter(
+        recurrence_rule__isnull=False,
+        recurrence_parent__isnull=True,
+        materialized_until__lt=horizon_end,
+    )
+    created = 0
+    for series in series_qs.iterator():
+        with transaction.atomic():
+            created += len(materialize_recurrence(series, horizon_end))
+    return created
@@ -1,3 +1,619 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
+from celery.exceptions import Retry
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from organizations.models import Organization
+from rest_framework.test import APIClient
+from core.models import User, Role
+from externals.feedback import interview_feedback
+from externals.llm import LLMError
+from .models import (
+    Candidate,
+    CandidateStatusCounter,
+    ClientUser,
+    DesignationDomain,
+    HDIPUsers,
+    InternalClient,
+    InternalInterviewer,
+    Interview,
+    InterviewerAvailability,
+    InterviewScheduleAttempt,
+    Job,
+    SchedulingOffer,
+)
+from . import query_budget
+from .tasks import MEETING_MAX_RETRIES, MEETING_RETRY_DELAY, create_interview_meeting
+from .slots import (
+    INTERVIEW_DURATION_MINUTES,
+    INTERVIEW_GAP_MINUTES,
+    InterviewerDay,
+    materialize_recurrence,
+    to_minutes,
+    to_time,
+)
 
-# Create your tests here.
+
+class JobListQueryCountTest(TestCase):
+    """The job list counts active candidates in its own query, not per job"""
+
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name="Acme", slug="acme")
+        cls.user = User.objects.create_user(
+            "admin@acme.example.com",
+            "+919000000001",
+            "password",
+            role=Role.CLIENT_ADMIN,
+        )
+        admin = ClientUser.objects.create(
+            organization=organization, user=cls.user, name="Admin", status="ACT"
+        )
+        DesignationDomain.objects.get_or_create(name="SDE_II")
+        for i in range(12):
+            job = Job.objects.create(
+                name="SDE_II",
+                job_id=f"JOB-{i}",
+                hiring_manager=admin,
+                total_positions=2,
+                mandatory_skills=["python"],
+            )
+            job.clients.add(admin)
+            for j in range(i % 3 + 1):
+                Candidate.objects.create(
+                    organization=organization,
+                    designation=job,
+                    name=f"Candidate {i}-{j}",
+                    year=3,
+                    email=f"candidate{i}-{j}@example.com",
+                    phone=f"+9198000{i:02d}{j:03d}",
+                    specialization="backend",
+                    added_by=admin,
+                )
+
+    def get_jobs(self, limit):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        cache.clear()
+        return client.get("/api/client/jobs/", {"limit": limit})
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_jobs(2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        with self.assertNumQueries(len(queries)):
+            response = self.get_jobs(10)
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_active_candidate_count(self):
+        response = self.get_jobs(12)
+        counts = {
+            job["job_id"]: job["active_candidates"] for job in response.data["results"]
+        }
+        self.assertEqual(counts, {f"JOB-{i}": i % 3 + 1 for i in range(12)})
+
+
+class InterviewerDayTest(TestCase):
+    """Random book and release sequences on one day, checked against the rules"""
+
+    date = datetime.date(2030, 1, 7)
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(
+            "interviewer@example.com",
+            "+919000000002",
+            "password",
+            role=Role.INTERVIEWER,
+        )
+        cls.interviewer = InternalInterviewer.objects.create(
+            user=user,
+            name="Interviewer",
+            email=user.email,
+            phone_number=user.phone,
+            total_experience_years=5,
+            interview_experience_years=2,
+            strength="backend",
+            interviewer_level=1,
+            skills=["python"],
+        )
+        cls.booked_by = User.objects.create_user(
+            "recruiter@example.com",
+            "+919000000003",
+            "password",
+            role=Role.CLIENT_ADMIN,
+        )
+
+    def create_slots(self, windows):
+        return [
+            InterviewerAvailability.objects.create(
+                interviewer=self.interviewer,
+                date=self.date,
+                start_time=to_time(start),
+                end_time=to_time(end),
+            )
+            for start, end in windows
+        ]
+
+    def load(self):
+        return InterviewerDay.load(self.interviewer, self.date, with_interviews=False)
+
+    def get_state(self):
+        return sorted(
+            (to_minutes(slot.start_time), to_minutes(slot.end_time), slot.is_booked)
+            for slot in self.load().slots
+        )
+
+    def book_random(self, rng):
+        day = self.load()
+        options = [
+            (slot, start)
+            for slot in day.slots
+            if not slot.is_booked
+            for start in range(
+                to_minutes(slot.start_time),
+                to_minutes(slot.end_time) - INTERVIEW_DURATION_MINUTES + 1,
+                30,
+            )
+        ]
+        if not options:
+            return None
+        slot, start = rng.choice(options)
+        scheduled_time = datetime.datetime.combine(self.date, to_time(start))
+        day.book(slot, scheduled_time, self.booked_by.id)
+        return slot
+
+    def release(self, slot):
+        slot = InterviewerAvailability.objects.get(pk=slot.pk)
+        self.load().release(slot)
+
+    def check_day(self, roots):
+        day = self.load()
+        for previous, current in zip(day.slots, day.slots[1:]):
+            self.assertLessEqual(previous.end_time, current.start_time)
+        self.assertEqual(
+            [slot for slot in day.slots if slot.split_from_id is None], roots
+        )
+        families = {}
+        for slot in day.slots:
+            families.setdefault(slot.split_from_id or slot.pk, []).append(slot)
+        for root in roots:
+            family = families[root.pk]
+            start, end = map(to_minutes, root.get_offered_window())
+            slots = [
+                (to_minutes(slot.start_time), to_minutes(slot.end_time), slot.is_booked)
+                for slot in family
+            ]
+            self.assertTrue(all(start <= s and e <= end for s, e, _ in slots))
+            # free and booked time never add up to more than was offered
+            self.assertLessEqual(sum(e - s for s, e, _ in slots), end - start)
+            # free time keeps the gap to every interview still booked
+            for free_start, free_end, _ in (slot for slot in slots if not slot[2]):
+                for booked_start, booked_end, _ in (slot for slot in slots if slot[2]):
+                    self.assertTrue(
+                        free_end <= booked_start - INTERVIEW_GAP_MINUTES
+                        or free_start >= booked_end + INTERVIEW_GAP_MINUTES
+                    )
+        # reading the day again gives what the in memory day holds
+        self.assertEqual(day.starts, [to_minutes(s.start_time) for s in day.slots])
+        self.assertEqual(day.ends, [to_minutes(s.end_time) for s in day.slots])
+
+    def test_random_book_and_release(self):
+        for seed in range(25):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                InterviewerAvailability.objects.all().delete()
+                # windows of 1 to 8 hours on the half hour, some exactly adjacent
+                windows, start = [], 8 * 60
+                for _ in range(rng.randint(1, 3)):
+                    start += rng.choice([0, 0, 30, 90])
+                    end = min(start + rng.randint(2, 16) * 30, 24 * 60 - 30)
+                    if end - start < 60:
+                        break
+                    windows.append((start, end))
+                    start = end
+                roots = self.create_slots(windows)
+                booked = []
+
+                for _ in range(30):
+                    if booked and rng.random() < 0.4:
+                        self.release(booked.pop(rng.randrange(len(booked))))
+                    else:
+                        state = self.get_state()
+                        slot = self.book_random(rng)
+                        if slot is None:
+                            continue
+                        if rng.random() < 0.3:
+                            # a booking released right away leaves no trace
+                            self.release(slot)
+                            self.assertEqual(self.get_state(), state)
+                        else:
+                            booked.append(slot)
+
+                    self.check_day(roots)
+
+                for slot in booked:
+                    self.release(slot)
+                self.assertEqual(
+                    self.get_state(), [(start, end, False) for start, end in windows]
+                )
+                self.assertEqual(self.load().slots, roots)
+
+    def test_release_does_not_join_separate_slots(self):
+        _, slot = self.create_slots([(9 * 60, 10 * 60), (10 * 60 + 30, 13 * 60)])
+        self.load().book(
+            slot,
+            datetime.datetime.combine(self.date, datetime.time(12)),
+            self.booked_by.id,
+        )
+        self.assertEqual(self.get_state(), [(540, 600, False), (720, 780, True)])
+        self.release(slot)
+        self.assertEqual(self.get_state(), [(540, 600, False), (630, 780, False)])
+
+    def test_booked_series_keeps_its_hours_for_new_occurrences(self):
+        (series,) = self.create_slots([(9 * 60, 17 * 60)])
+        series.recurrence_rule = "FREQ=WEEKLY;INTERVAL=1"
+        series.materialized_until = self.date
+        series.save()
+        self.load().book(
+            series,
+            datetime.datetime.combine(self.date, datetime.time(11)),
+            self.booked_by.id,
+        )
+
+        occurrences = materialize_recurrence(
+            series, self.date + datetime.timedelta(weeks=3)
+        )
+        self.assertEqual(
+            [(o.start_time, o.end_time) for o in occurrences],
+            [(datetime.time(9), datetime.time(17))] * 3,
+        )
+
+
+class AcceptOfferMixin:
+    """Two candidates offered the same interviewer 60 minutes apart"""
+
+    date = timezone.localdate() + datetime.timedelta(days=2)
+
+    def create_offers(self):
+        organization = Organization.objects.create(name="Acme", slug="acme")
+        moderator = HDIPUsers.objects.create(
+            user=User.objects.create_user(
+                "moderator@example.com",
+                "+919000000011",
+                "password",
+                role=Role.MODERATOR,
+            ),
+            name="Moderator",
+        )
+        InternalClient.objects.create(
+            organization=organization,
+            name="Acme",
+            client_level=1,
+            assigned_to=moderator,
+        )
+        admin = ClientUser.objects.create(
+            organization=organization,
+            user=User.objects.create_user(
+                "admin@example.com", "+919000000012", "password", role=Role.CLIENT_ADMIN
+            ),
+            name="Admin",
+            status="ACT",
+        )
+        DesignationDomain.objects.get_or_create(name="SDE_II")
+        job = Job.objects.create(
+            name="SDE_II",
+            hiring_manager=admin,
+            mandatory_skills=["python"],
+            total_positions=2,
+        )
+        user = User.objects.create_user(
+            "interviewer@example.com",
+            "+919000000013",
+            "password",
+            role=Role.INTERVIEWER,
+        )
+        interviewer = InternalInterviewer.objects.create(
+            user=user,
+            name="Interviewer",
+            email=user.email,
+            phone_number=user.phone,
+            total_experience_years=5,
+            interview_experience_years=2,
+            strength="backend",
+            interviewer_level=1,
+            skills=["python"],
+        )
+
+        offers = []
+        for i, (start, end, scheduled) in enumerate(
+            [
+                (9 * 60 + 30, 10 * 60 + 30, 9 * 60 + 30),
+                (10 * 60 + 30, 12 * 60, 10 * 60 + 30),
+            ]
+        ):
+            candidate = Candidate.objects.create(
+                organization=organization,
+                designation=job,
+                name=f"Candidate {i}",
+                year=3,
+                email=f"candidate{i}@example.com",
+                phone=f"+91980000000{i}",
+                specialization="backend",
+                status="NSCH" if i == 0 else "SCH",
+                added_by=admin,
+            )
+            slot = InterviewerAvailability.objects.create(
+                interviewer=interviewer,
+                date=self.date,
+                start_time=to_time(start),
+                end_time=to_time(end),
+            )
+            offers.append(
+                SchedulingOffer.objects.create(
+                    scheduling_attempt=InterviewScheduleAttempt.objects.create(
+                        candidate=candidate
+                    ),
+                    availability=slot,
+                    scheduled_time=timezone.make_aware(
+                        datetime.datetime.combine(self.date, to_time(scheduled))
+                    ),
+                    booked_by=admin.user,
+                    expires_at=timezone.now() + datetime.timedelta(hours=1),
+                )
+            )
+        return offers
+
+    def accept(self, offer):
+        url = reverse(
+            "interviewer-request-confirmation", args=[f"{offer.token}.accept"]
+        )
+        return APIClient().post(url).json()["message"]
+
+
+@mock.patch("dashboard.Views.InterviewerViews.create_interview_meeting")
+class AcceptOfferTest(AcceptOfferMixin, TestCase):
+    def test_second_accept_within_the_gap_is_refused(self, _):
+        first, second = self.create_offers()
+        self.assertEqual(self.accept(first), "Interview Confirmed")
+        self.assertEqual(
+            self.accept(second),
+            "There must be a 1-hour gap between two consecutive scheduled interviews.",
+        )
+
+        self.assertEqual(Interview.objects.count(), 1)
+        second.refresh_from_db()
+        self.assertEqual(second.status, "PED")
+        self.assertIsNone(second.availability.booked_by_id)
+        self.assertEqual(second.scheduling_attempt.candidate.status, "SCH")
+
+        # the accepted candidate moved from in process to scheduled
+        candidate = first.scheduling_attempt.candidate
+        candidate.refresh_from_db()
+        self.assertEqual(candidate.status, "CSCH")
+        counter = CandidateStatusCounter.objects.get(
+            organization_id=candidate.organization_id
+        )
+        self.assertEqual(
+            {field: getattr(counter, field) for field in ("scheduled", "inprocess")},
+            {"scheduled": 2, "inprocess": 0},
+        )
+
+    def test_meeting_failure_marks_the_interview(self, _):
+        first, _second = self.create_offers()
+        self.accept(first)
+        interview = Interview.objects.get()
+
+        def run(retries):
+            create_interview_meeting.push_request(retries=retries)
+            try:
+                create_interview_meeting.run(interview.id, [])
+            finally:
+                create_interview_meeting.pop_request()
+
+        create_meet = mock.patch(
+            "dashboard.tasks.create_meet_and_calendar_invite",
+            side_effect=OSError("Calendar API unavailable"),
+        )
+        retry = mock.patch.object(create_interview_meeting, "retry", side_effect=Retry)
+        with create_meet, retry as retry, self.assertLogs("dashboard.tasks") as logs:
+            # every retry waits twice as long as the one before
+            for retries in range(MEETING_MAX_RETRIES):
+                with self.assertRaises(Retry):
+                    run(retries)
+                self.assertEqual(
+                    retry.call_args.kwargs["countdown"],
+                    MEETING_RETRY_DELAY * 2**retries,
+                )
+            self.assertFalse(Interview.objects.get().meeting_failed)
+
+            with self.assertRaises(OSError):
+                run(MEETING_MAX_RETRIES)
+
+        self.assertEqual(
+            [record.levelname for record in logs.records],
+            ["WARNING"] * MEETING_MAX_RETRIES + ["ERROR"],
+        )
+        interview.refresh_from_db()
+        self.assertTrue(interview.meeting_failed)
+        self.assertIsNone(interview.meeting_link)
+
+
+@mock.patch("dashboard.Views.InterviewerViews.create_interview_meeting")
+class ConcurrentAcceptOfferTest(AcceptOfferMixin, TransactionTestCase):
+    def test_concurrent_accepts_within_the_gap(self, _):
+        offers = self.create_offers()
+        barrier = threading.Barrier(len(offers))
+        messages = []
+
+        def accept(offer):
+            try:
+                barrier.wait()
+                messages.append(self.accept(offer))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=accept, args=(o,)) for o in offers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # the second accept waits for the first and is refused by the gap
+        # rule, not by a locking error
+        self.assertCountEqual(
+            messages,
+            [
+                "Interview Confirmed",
+                "There must be a 1-hour gap between two consecutive scheduled interviews.",
+            ],
+        )
+        self.assertEqual(Interview.objects.count(), 1)
+
+
+class GenerateSyntheticDataTest(TestCase):
+    def test_organizations_share_the_interviewers(self):
+        # one interviewer for two organizations makes their interview times
+        # meet, each must still be taken once
+        call_command(
+            "generate_synthetic_data",
+            organizations=2,
+            recruiters=1,
+            jobs=2,
+            candidates=60,
+            interviewers=1,
+            slots=2,
+            interview_ratio=1.0,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(Organization.objects.count(), 2)
+        interviews = Interview.objects.values_list("interviewer_id", "scheduled_time")
+        self.assertGreater(len(interviews), 60)
+        self.assertEqual(len(set(interviews)), len(interviews))
+
+
+@mock.patch.object(interview_feedback, "SINGLE_PASS_CHARS", 100)
+@mock.patch.object(interview_feedback, "WINDOW_CONCURRENCY", 1)
+class InterviewFeedbackTest(SimpleTestCase):
+    @mock.patch.object(interview_feedback, "merge_feedback")
+    @mock.patch.object(interview_feedback, "analyze_transcription")
+    def test_window_without_feedback_fails_the_transcription(self, analyze, merge):
+        # an hour in 15 minute windows, the second and the last one get nothing
+        transcription = "\n".join(
+            f"{minute:02d}:00\nInterviewer: question {minute}?" for minute in range(60)
+        )
+        analyze.side_effect = [{"strength": "ok"}, None, {"strength": "ok"}, {}]
+
+        with self.assertRaisesMessage(LLMError, "No feedback for 2 of 4 windows"):
+            interview_feedback.analyze_transcription_and_generate_feedback(
+                transcription
+            )
+        merge.assert_not_called()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+@mock.patch("celery.app.task.Task.apply_async")
+class QueryBudgetTest(TestCase):
+    """
+    Every GET route and the write routes of dashboard.query_budget issue the
+    number of queries in query_budget.json and stay within its SQL time.
+    Celery tasks are only queued, their queries are not the request's.
+
+    After an intended change run the test with QUERY_BUDGET_UPDATE=1 to
+    rewrite the file from the measured values.
+    """
+
+    update = bool(os.environ.get("QUERY_BUDGET_UPDATE"))
+    # SQL time written on update, headroom over the measured time and a floor
+    time_headroom = 3.0
+    min_time = 25.0
+    measured = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = query_budget.seed()
+        cls.budget = json.loads(query_budget.BUDGET_FILE.read_text())
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        if cls.update and cls.measured:
+            budget = json.loads(query_budget.BUDGET_FILE.read_text())
+            budget = {
+                key: cls.measured.get(key) or budget[key]
+                for key in sorted(key for key, *_ in query_budget.get_cases())
+                if key in cls.measured or key in budget
+            }
+            query_budget.BUDGET_FILE.write_text(json.dumps(budget, indent=2) + "\n")
+        super().tearDownClass()
+
+    def request(self, method, route, case):
+        user, path, data = query_budget.get_request(route, case, self.fixtures)
+        client = APIClient()
+        client.force_authenticate(user)
+        cache.clear()
+        durations = []
+        with connection.execute_wrapper(query_budget.timed(durations)):
+            if method == "get":
+                response = client.get(path, data)
+            else:
+                response = getattr(client, method)(
+                    path, data, format=case.get("format")
+                )
+        return response, sum(durations) * 1000
+
+    def measure(self, key, method, route, case):
+        with CaptureQueriesContext(connection) as queries:
+            response, sql_ms = self.request(method, route, case)
+        self.assertLess(response.status_code, 500)
+        self.measured[key] = {
+            "status": response.status_code,
+            "queries": len(queries),
+            "sql_ms": round(max(sql_ms * self.time_headroom, self.min_time), 1),
+        }
+
+    def check(self, key, method, route, case):
+        expected = self.budget.get(key)
+        self.assertIsNotNone(expected, "no budget, run with QUERY_BUDGET_UPDATE=1")
+        with self.assertNumQueries(expected["queries"]):
+            response, sql_ms = self.request(method, route, case)
+        self.assertEqual(response.status_code, expected["status"])
+        self.assertLessEqual(sql_ms, expected["sql_ms"])
+
+    def test_routes(self, _):
+        for key, method, route, case in query_budget.get_cases():
+            with self.subTest(key), transaction.atomic():
+                # every request sees the seeded data, not what the last one wrote
+                if self.update:
+                    self.measure(key, method, route, case)
+                else:
+                    self.check(key, method, route, case)
+                transaction.set_rollback(True)
+
+    def test_every_budget_entry_is_measured(self, _):
+        self.assertLessEqual(
+            set(self.budget),
+            {key for key, *_ in query_budget.get_cases()},
+            "unused budget entry",
+        )
@@ -9,6 +9,7 @@ from dashboard.Views import (
     OrganizationAgreementDetailView,
     ClientInvitationActivateView,
     CandidateView,
+    CandidateImportView,
     EngagementTemplateView,
     EngagementView,
     EngagementOperationView,
@@ -1,40 +1,28 @@
 from math import gcd
 from django.db.models import Count, Q
+from django.utils import timezone
 from collections import defaultdict
 from dashboard.models import Candidate
 
+ANALYTICS_COUNTERS = (
+    "total_candidates",
+    "total_interviews",
+    "top_performers",
+    "good_candidates",
+    "rejected",
+    "declined_by_candidate",
+    "male_count",
+    "female_count",
+)
 
-def get_candidate_analytics(queryset):
+
+def build_candidate_analytics(analytics, candidate_by_companies):
     def simplify_ratio(selected_candidates, total_candidates):
         factor = gcd(selected_candidates, total_candidates)
         if not factor:
             return 0, 0
         return selected_candidates // factor, total_candidates // factor
 
-    analytics = queryset.aggregate(
-        total_candidates=Count("id"),
-        total_interviews=Count(
-            "id", filter=Q(status__in=["NJ", "HREC", "REC", "NREC", "SNREC"])
-        ),
-        top_performers=Count("id", filter=Q(score__gte=80)),
-        good_candidates=Count("id", filter=Q(score__gte=70, score__lt=80)),
-        rejected=Count("id", filter=Q(status__in=["NREC", "SNREC"])),
-        declined_by_candidate=Count("id", filter=Q(status="NJ")),
-        male_count=Count("id", filter=Q(gender="M")),
-        female_count=Count("id", filter=Q(gender="F")),
-    )
-
-    # Group selected and rejected by current company
-    candidate_by_companies = (
-        queryset.filter(status__in=["HREC", "REC", "NREC", "SNREC"])
-        .values("company")
-        .annotate(total_count=Count("id"))
-        .annotate(
-            selected_count=Count("id", filter=Q(status__in=["HREC", "REC"])),
-            rejected_count=Count("id", filter=Q(status__in=["NREC", "SNREC"])),
-        )
-    )
-
     selected_dict = {
         entry["company"]: int((entry["selected_count"] / entry["total_count"]) * 100)
         for entry in candidate_by_companies
@@ -64,3 +52,89 @@ def get_candidate_analytics(queryset):
             "total_male_vs_female": f"{analytics['male_count']}:{analytics['female_count']}",
         },
     }
+
+
+def get_candidate_analytics(queryset):
+    analytics = queryset.aggregate(
+        total_candidates=Count("id"),
+        total_interviews=Count(
+            "id", filter=Q(status__in=["NJ", "HREC", "REC", "NREC", "SNREC"])
+        ),
+        top_performers=Count("id", filter=Q(score__gte=80)),
+        good_candidates=Count("id", filter=Q(score__gte=70, score__lt=80)),
+        rejected=Count("id", filter=Q(status__in=["NREC", "SNREC"])),
+        declined_by_candidate=Count("id", filter=Q(status="NJ")),
+        male_count=Count("id", filter=Q(gender="M")),
+        female_count=Count("id", filter=Q(gender="F")),
+    )
+
+    # Group selected and rejected by current company
+    candidate_by_companies = (
+        queryset.filter(status__in=["HREC", "REC", "NREC", "SNREC"])
+        .values("company")
+        .annotate(total_count=Count("id"))
+        .annotate(
+            selected_count=Count("id", filter=Q(status__in=["HREC", "REC"])),
+            rejected_count=Count("id", filter=Q(status__in=["NREC", "SNREC"])),
+        )
+    )
+
+    return build_candidate_analytics(analytics, candidate_by_companies)
+
+
+def get_daily_candidate_analytics(queryset):
+    """
+    Same counters as get_candidate_analytics bucketed by the local creation
+    date, so that any date range can be answered by summing the buckets.
+    """
+    days = defaultdict(lambda: dict.fromkeys(ANALYTICS_COUNTERS, 0))
+    companies = defaultdict(lambda: defaultdict(lambda: [0, 0, 0]))
+
+    for created_at, status, score, gender, company in queryset.values_list(
+        "created_at", "status", "score", "gender", "company"
+    ).iterator():
+        day = timezone.localtime(created_at).date().isoformat()
+        counters = days[day]
+        counters["total_candidates"] += 1
+        counters["total_interviews"] += status in ["NJ", "HREC", "REC", "NREC", "SNREC"]
+        counters["top_performers"] += score >= 80
+        counters["good_candidates"] += 70 <= score < 80
+        counters["rejected"] += status in ["NREC", "SNREC"]
+        counters["declined_by_candidate"] += status == "NJ"
+        counters["male_count"] += gender == "M"
+        counters["female_count"] += gender == "F"
+        if status in ["HREC", "REC", "NREC", "SNREC"]:
+            total, selected, rejected = companies[day][company]
+            companies[day][company] = [
+                total + 1,
+                selected + (status in ["HREC", "REC"]),
+                rejected + (status in ["NREC", "SNREC"]),
+            ]
+
+    return {"days": days, "companies": companies}
+
+
+def get_candidate_analytics_for_range(daily_analytics, from_date, to_date):
+    analytics = dict.fromkeys(ANALYTICS_COUNTERS, 0)
+    companies = defaultdict(lambda: [0, 0, 0])
+    from_day, to_day = from_date.isoformat(), to_date.isoformat()
+
+    for day, counters in daily_analytics["days"].items():
+        if from_day <= day <= to_day:
+            for key in ANALYTICS_COUNTERS:
+                analytics[key] += counters.get(key, 0)
+    for day, company_counts in daily_analytics["companies"].items():
+        if from_day <= day <= to_day:
+            for company, counts in company_counts.items():
+                companies[company] = [a + b for a, b in zip(companies[company], counts)]
+
+    candidate_by_companies = [
+        {
+            "company": company,
+            "total_count": total,
+            "selected_count": selected,
+            "rejected_count": rejected,
+        }
+        for company, (total, selected, rejected) in companies.items()
+    ]
+    return build_candidate_analytics(analytics, candidate_by_companies)
@@ -1,12 +1,27 @@
-from django.conf import settings
-import google.generativeai as genai
+import re
 import json
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from externals.llm import LLMError, generate_json, register_stub
 
 # import assemblyai as aai
 
 # Configure APIs
 # aai.settings.api_key = os.getenv("ASSEMBLYAI_API_KEY")
-genai.configure(api_key=settings.GOOGLE_API_KEY)
+
+# longer transcripts are analyzed in overlapping windows (map) which are then
+# merged into one feedback (reduce)
+SINGLE_PASS_CHARS = getattr(settings, "FEEDBACK_SINGLE_PASS_CHARS", 60000)
+WINDOW_SECONDS = getattr(settings, "FEEDBACK_WINDOW_SECONDS", 15 * 60)
+WINDOW_OVERLAP_SECONDS = getattr(settings, "FEEDBACK_WINDOW_OVERLAP_SECONDS", 60)
+WINDOW_CONCURRENCY = getattr(settings, "FEEDBACK_WINDOW_CONCURRENCY", 4)
+# speaking rate used to place lines in time when the transcript has no timestamps
+CHARS_PER_SECOND = 15
+TIMESTAMP_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})(?::(\d{2}))?\s*$")
+
+logger = logging.getLogger(__name__)
 
 
 # def transcribe_video(video_path):
@@ -24,9 +39,45 @@ genai.configure(api_key=settings.GOOGLE_API_KEY)
 
 def analyze_transcription_and_generate_feedback(transcription):
     """
-    Analyze the transcription and generate feedback for all questions in a single API request.
-    Group questions by skills.
+    Analyze the transcription and generate feedback for all questions, grouped
+    by skills. Long transcriptions are analyzed window by window in parallel and
+    the results merged, the output has the same shape either way. Raises
+    LLMError when a window gets no feedback instead of merging the others.
     """
+    if len(transcription) <= SINGLE_PASS_CHARS:
+        return analyze_transcription(transcription)
+
+    windows = split_transcription(transcription)
+    with ThreadPoolExecutor(max_workers=min(WINDOW_CONCURRENCY, len(windows))) as pool:
+        results = list(
+            pool.map(
+                lambda window: analyze_transcription(
+                    window["text"],
+                    excerpt=(
+                        "This is an excerpt of a longer interview, from second "
+                        f"{window['start']} to second {window['end']}. Timestamps "
+                        "must still be relative to the start of the whole interview."
+                    ),
+                ),
+                windows,
+            )
+        )
+    # a missing window would leave a part of the interview out of the feedback,
+    # fail as a whole so the interview is picked up again
+    missing = [
+        f"{window['start']}s-{window['end']}s"
+        for window, result in zip(windows, results)
+        if not result
+    ]
+    if missing:
+        raise LLMError(
+            f"No feedback for {len(missing)} of {len(windows)} windows: "
+            + ", ".join(missing)
+        )
+    return merge_feedback(results)
+
+
+def analyze_transcription(transcription, excerpt=""):
     prompt = f"""
         Below is a transcription of an interview. Perform the following tasks:
 
@@ -88,28 +139,236 @@ def analyze_transcription_and_generate_feedback(transcription):
         - All timestamps must be relative to the start of the interview.
         - Ensure that nothing outside keys present in the JSON aprart from the mentioned keys.
 
+        {excerpt}
         Transcription:
         {transcription}
     """
 
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash-thinking-exp-01-21")
-        response = model.generate_content(prompt)
-
-        # Clean the response text
-        response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3].strip()
-
-        # Parse the JSON response
-        data = json.loads(response_text)
-        return data
-    except json.JSONDecodeError:
-        print(
-            "The API response is not valid JSON. Please check the prompt or API output."
-        )
-        print("Raw API Response:", response_text)
+        return generate_json(prompt, task="interview_feedback")
+    except LLMError:
+        logger.exception("Analyzing the transcription failed")
         return None
-    except Exception as e:
-        print(f"An error occurred while analyzing the transcription: {e}")
+
+
+def split_transcription(transcription):
+    """
+    Split the transcription into windows of WINDOW_SECONDS, each one starting
+    with about the last WINDOW_OVERLAP_SECONDS of the previous window so a
+    question cut at the boundary is complete in one of them.
+    """
+    has_timestamps = any(
+        TIMESTAMP_RE.match(line) for line in transcription.splitlines()
+    )
+    lines, seconds, offset = [], 0, 0
+    for line in transcription.splitlines():
+        match = TIMESTAMP_RE.match(line)
+        if match:
+            hours, minutes, secs = match.groups()
+            # "mm:ss" or "hh:mm:ss"
+            seconds = (
+                int(hours) * 3600 + int(minutes) * 60 + int(secs)
+                if secs
+                else int(hours) * 60 + int(minutes)
+            )
+        elif not has_timestamps:
+            seconds = offset // CHARS_PER_SECOND
+        offset += len(line) + 1
+        lines.append((seconds, line))
+
+    # the overlap is carried over as lines, the timestamps of a transcript are
+    # usually minutes apart
+    overlap_chars = WINDOW_OVERLAP_SECONDS * CHARS_PER_SECOND
+    windows, window, window_end = [], [], WINDOW_SECONDS
+    for seconds, line in lines:
+        if seconds >= window_end and window:
+            windows.append(window)
+            overlap, size = [], 0
+            for previous in reversed(window):
+                size += len(previous[1]) + 1
+                if size > overlap_chars:
+                    break
+                overlap.insert(0, previous)
+            window = overlap
+            while seconds >= window_end:
+                window_end += WINDOW_SECONDS
+        window.append((seconds, line))
+    if window:
+        windows.append(window)
+
+    return [
+        {
+            "start": window[0][0],
+            "end": window[-1][0],
+            "text": "\n".join(line for _, line in window),
+        }
+        for window in windows
+    ]
+
+
+def get_seconds(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
         return None
+
+
+def is_duplicate_question(question, questions):
+    key = re.sub(r"[^a-z0-9]+", " ", str(question.get("que", "")).lower()).strip()
+    start = get_seconds(question.get("start_time"))
+    for other in questions:
+        other_key = re.sub(
+            r"[^a-z0-9]+", " ", str(other.get("que", "")).lower()
+        ).strip()
+        other_start = get_seconds(other.get("start_time"))
+        # the overlap of two windows gives the same question twice
+        if key == other_key or (
+            start is not None
+            and other_start is not None
+            and abs(start - other_start) <= 5
+        ):
+            return True
+    return False
+
+
+def merge_feedback(results):
+    skills = {}
+    for result in results:
+        for skill, performance in (result.get("skill_based_performance") or {}).items():
+            # the same skill may be named with a different case per window
+            merged = skills.setdefault(
+                skill.strip().lower(),
+                {"name": skill.strip(), "summaries": [], "questions": []},
+            )
+            if performance.get("summary"):
+                merged["summaries"].append(performance["summary"])
+            for question in performance.get("questions") or []:
+                if not is_duplicate_question(question, merged["questions"]):
+                    merged["questions"].append(question)
+
+    for merged in skills.values():
+        merged["questions"].sort(
+            key=lambda question: get_seconds(question.get("start_time")) or 0
+        )
+
+    summary = summarize_feedback(results, skills)
+    skill_summaries = summary.get("skill_summaries") or {}
+    return {
+        "skill_based_performance": {
+            merged["name"]: {
+                "summary": skill_summaries.get(merged["name"])
+                or " ".join(merged["summaries"])[:900],
+                "questions": merged["questions"],
+            }
+            for merged in skills.values()
+        },
+        "skill_evaluation": summary.get("skill_evaluation")
+        or get_most_common_ratings(results),
+        "strength": (
+            summary.get("strength")
+            or " ".join(result.get("strength") or "" for result in results)
+        )[:400],
+        "improvement_points": (
+            summary.get("improvement_points")
+            or " ".join(result.get("improvement_points") or "" for result in results)
+        )[:400],
+    }
+
+
+def get_most_common_ratings(results):
+    ratings = {}
+    for result in results:
+        for key, value in (result.get("skill_evaluation") or {}).items():
+            ratings.setdefault(key, Counter())[value] += 1
+    return {key: counter.most_common(1)[0][0] for key, counter in ratings.items()}
+
+
+def summarize_feedback(results, skills):
+    """
+    Rewrite the per window summaries, strengths and ratings into the final ones.
+    Returns {} when the model fails, the caller then joins the window ones.
+    """
+    windows = {
+        "skills": {merged["name"]: merged["summaries"] for merged in skills.values()},
+        "strengths": [result.get("strength") for result in results],
+        "improvement_points": [result.get("improvement_points") for result in results],
+        "skill_evaluations": [result.get("skill_evaluation") for result in results],
+    }
+    prompt = f"""
+        Below is the feedback generated for consecutive parts of one interview.
+        Combine it into the feedback for the whole interview:
+
+        1. For each skill, write one summary of the candidate's performance from its part summaries (up to 900 characters).
+        2. Write the overall strengths (up to 400 characters) and points of improvement (up to 400 characters).
+        3. Rate Communication and Attitude for the whole interview: poor, average, good or excellent.
+
+        Output STRICTLY in the following JSON structure:
+        {{
+            "skill_summaries": {{"skill_name": "summary"}},
+            "skill_evaluation": {{
+                "Communication": "poor/average/good/excellent",
+                "Attitude": "poor/average/good/excellent"
+            }},
+            "strength": "Overall strengths.",
+            "improvement_points": "Improvement areas."
+        }}
+
+        Use the skill names exactly as given. Return ONLY valid JSON.
+
+        Feedback of the parts:
+        {json.dumps(windows)}
+    """
+    try:
+        summary = generate_json(prompt, task="interview_feedback_summary")
+    except LLMError:
+        logger.exception("Merging the interview feedback failed")
+        return {}
+    return summary if isinstance(summary, dict) else {}
+
+
+def stub_interview_feedback(prompt, rng):
+    """Offline answer for analyze_transcription_and_generate_feedback"""
+    ratings = ["poor", "average", "good", "excellent"]
+    skills = rng.sample(["Python", "Django", "SQL", "System Design", "JavaScript"], 2)
+    return {
+        "skill_based_performance": {
+            skill: {
+                "summary": f"The candidate answered the {skill} questions well.",
+                "questions": [
+                    {
+                        "que": f"Explain a {skill} concept you used recently.",
+                        "ans": f"An answer about {skill}.",
+                        "start_time": str(60 * index),
+                        "end_time": str(60 * index + 45),
+                    }
+                ],
+            }
+            for index, skill in enumerate(skills)
+        },
+        "skill_evaluation": {
+            "Communication": rng.choice(ratings),
+            "Attitude": rng.choice(ratings),
+        },
+        "strength": "Clear explanations.",
+        "improvement_points": "Could go deeper on trade-offs.",
+    }
+
+
+register_stub("interview_feedback", stub_interview_feedback)
+
+
+def stub_interview_feedback_summary(prompt, rng):
+    """Offline answer for summarize_feedback"""
+    parts = json.loads(prompt.rsplit("Feedback of the parts:", 1)[1])
+    return {
+        "skill_summaries": {
+            skill: " ".join(summaries)[:900]
+            for skill, summaries in parts["skills"].items()
+        },
+        "skill_evaluation": {"Communication": "good", "Attitude": "good"},
+        "strength": "Clear explanations.",
+        "improvement_points": "Could go deeper on trade-offs.",
+    }
+
+
+register_stub("interview_feedback_summary", stub_interview_feedback_summary)
@@ -1,8 +1,14 @@
 import time
+import random
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.errors import HttpError
 from django.conf import settings
+from django.core.files.storage import default_storage
+from hiringdogbackend.streaming_storage import get_storage_writer
 
 SCOPES = [
     "https://www.googleapis.com/auth/calendar",
@@ -17,12 +23,35 @@ credentials = credentials.with_subject(IMPERSONATE_USER)
 calendar_service = build("calendar", "v3", credentials=credentials)
 drive_service = build("drive", "v3", credentials=credentials)
 
+# Calendar accepts at most 50 calls in one batch request
+CALENDAR_BATCH_SIZE = 50
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files"
+# chunk size grows while chunks come in fast and shrinks after slow or failed ones
+MIN_CHUNK_SIZE = 4 * 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+FAST_CHUNK_SECONDS = 5
+SLOW_CHUNK_SECONDS = 30
+DOWNLOAD_MAX_RETRIES = getattr(settings, "DRIVE_DOWNLOAD_MAX_RETRIES", 5)
+DOWNLOAD_TIMEOUT = (10, 120)
+
+logger = logging.getLogger(__name__)
+
+
+class DriveDownloadError(Exception):
+    pass
+
 
 def create_meet_and_calendar_invite(
     interviewer_email, candidate_email, start_time, end_time, **kwargs
 ):
+    """
+    Create the calendar event with a Meet link, returns (meeting link, event id).
+    With `event_id` the call is idempotent: the event gets that id and a second
+    call returns the event created by the first one.
+    """
     candidate_name = kwargs.get("candidate_name")
     designation_name = kwargs.get("designation_name")
+    event_id = kwargs.get("event_id")
     event = {
         "summary": f"{candidate_name}_{designation_name}_Technical_Round",
         "description": """ 
@@ -48,7 +77,7 @@ def create_meet_and_calendar_invite(
         ],
         "conferenceData": {
             "createRequest": {
-                "requestId": f"meet-{start_time.timestamp()}",
+                "requestId": event_id or f"meet-{start_time.timestamp()}",
                 "conferenceSolutionKey": {"type": "hangoutsMeet"},
             }
         },
@@ -62,15 +91,24 @@ def create_meet_and_calendar_invite(
         "transparency": "transparent",
     }
 
-    event = (
-        calendar_service.events()
-        .insert(
-            calendarId="primary",
-            body=event,
-            conferenceDataVersion=1,  # to generate meet link
+    if event_id:
+        event["id"] = event_id
+
+    try:
+        event = (
+            calendar_service.events()
+            .insert(
+                calendarId="primary",
+                body=event,
+                conferenceDataVersion=1,  # to generate meet link
+            )
+            .execute()
         )
-        .execute()
-    )
+    except HttpError as e:
+        # 409: an earlier attempt already created the event
+        if not event_id or e.resp.status != 409:
+            raise
+        event = get_meeting_info(event_id)
 
     return event.get("hangoutLink"), event.get("id")
 
@@ -82,43 +120,42 @@ def get_meeting_info(event_id):
     return event
 
 
-def download_file(file_id, mime_type=None, save_path=None):
-    if mime_type:
-        request = drive_service.files().export_media(fileId=file_id, mimeType=mime_type)
-    else:
-        request = drive_service.files().get_media(fileId=file_id)
-
-    # instead of lading the cotent directly to ram we save it in temp file by reading chunk of data size 1MB using resumable download which help to resume if download fails in the middle
-    with open(save_path, "ab") as file:
-        downloader = MediaIoBaseDownload(
-            fd=file, request=request, chunksize=4 * 1024 * 1024
-        )
-        done = False
-        while not done:
-            try:
-                status, done = downloader.next_chunk()  # Resume if interrupted
-                print(f"Download {int(status.progress() * 100)}% complete.")
-            except Exception as e:
-                print(f"Chunk download failed: {e}")
-                time.sleep(5)
-                continue
-
-    return save_path
+def get_meeting_infos(event_ids):
+    """
+    Fetch the events with batch requests, CALENDAR_BATCH_SIZE of them per HTTP
+    call. Returns {event_id: event}, an event which could not be fetched maps
+    to the exception instead.
+    """
+    events = {}
 
+    def store_event(request_id, response, exception):
+        events[request_id] = response if exception is None else exception
 
-def download_from_google_drive(interview_id, event_id):
-    event_info = get_meeting_info(event_id)
-    attachments = event_info.get("attachments", [])
+    event_ids = list(dict.fromkeys(event_ids))
+    for start in range(0, len(event_ids), CALENDAR_BATCH_SIZE):
+        event_id_batch = event_ids[start : start + CALENDAR_BATCH_SIZE]
+        batch = calendar_service.new_batch_http_request(callback=store_event)
+        for event_id in event_id_batch:
+            batch.add(
+                calendar_service.events().get(calendarId="primary", eventId=event_id),
+                request_id=event_id,
+            )
+        try:
+            batch.execute()
+        except Exception as e:
+            for event_id in event_id_batch:
+                events.setdefault(event_id, e)
+    return events
 
-    if not attachments:
-        return {}
 
+def get_recording_attachments(event_info):
+    """Drive file ids of the recording and its transcript, {} until both are attached"""
     required_files = {
         "video": None,
         "transcript": None,
     }
 
-    for attachment in attachments:
+    for attachment in event_info.get("attachments", []):
         file_id, mime_type, file_name = (
             attachment["fileId"],
             attachment["mimeType"],
@@ -131,22 +168,168 @@ def download_from_google_drive(interview_id, event_id):
 
     if None in required_files.values():
         return {}
+    return required_files
+
+
+def get_drive_session():
+    # one session per download, the shared discovery client is not thread safe
+    return AuthorizedSession(credentials)
+
+
+def with_retries(func, description):
+    for attempt in range(DOWNLOAD_MAX_RETRIES + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == DOWNLOAD_MAX_RETRIES:
+                raise DriveDownloadError(
+                    f"{description} failed after {attempt + 1} attempts: {e}"
+                ) from e
+            delay = random.uniform(0, min(60, 2 ** (attempt + 1)))
+            logger.warning(f"{description} failed ({e}), retry in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def download_media(session, file_id, name, storage=default_storage):
+    """
+    Stream a binary file from Drive into the storage with range requests, each
+    chunk goes straight to the storage writer. A local storage keeps the
+    completed chunks in a part file which a retried task resumes from. The
+    result is checked against the size and md5 Drive reports before the upload
+    is completed.
+    """
+    metadata = with_retries(
+        lambda: session.get(
+            f"{DRIVE_FILES_URL}/{file_id}",
+            params={"fields": "size,md5Checksum"},
+            timeout=DOWNLOAD_TIMEOUT,
+        ).json(),
+        f"Metadata of {file_id}",
+    )
+    if "size" not in metadata:
+        raise DriveDownloadError(f"No size for {file_id}: {metadata}")
+    size = int(metadata["size"])
+
+    # stored by an earlier attempt which failed afterwards
+    if storage.exists(name) and storage.size(name) == size:
+        return name
+
+    writer = get_storage_writer(name, storage)
+    if writer.offset > size:
+        writer.abort(discard=True)
+        writer = get_storage_writer(name, storage)
+    chunk_size = MIN_CHUNK_SIZE
+    try:
+        while writer.offset < size:
+            offset = writer.offset
+            end = min(offset + chunk_size, size) - 1
+
+            def fetch_chunk():
+                response = session.get(
+                    f"{DRIVE_FILES_URL}/{file_id}",
+                    params={"alt": "media"},
+                    headers={"Range": f"bytes={offset}-{end}"},
+                    timeout=DOWNLOAD_TIMEOUT,
+                )
+                response.raise_for_status()
+                if response.status_code != 206 and offset:
+                    raise DriveDownloadError("Range request was not honoured")
+                return response.content[: end - offset + 1]
+
+            started = time.monotonic()
+            writer.write(
+                with_retries(fetch_chunk, f"Chunk {offset}-{end} of {file_id}")
+            )
+
+            elapsed = time.monotonic() - started
+            if elapsed < FAST_CHUNK_SECONDS:
+                chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+            elif elapsed > SLOW_CHUNK_SECONDS:
+                chunk_size = max(chunk_size // 2, MIN_CHUNK_SIZE)
+            logger.debug(
+                f"Download of {file_id} {int(writer.offset * 100 / size)}% complete."
+            )
+    except Exception:
+        writer.abort()
+        raise
+
+    if writer.offset != size or (
+        metadata.get("md5Checksum")
+        and writer.md5.hexdigest() != metadata["md5Checksum"]
+    ):
+        # a corrupt part file would be resumed forever, start over next time
+        writer.abort(discard=True)
+        raise DriveDownloadError(f"Download of {file_id} is corrupt")
+    return writer.complete()
+
+
+def export_document(session, file_id, mime_type, name, storage=default_storage):
+    # exports of google docs (the transcript) are small and can not be ranged
+    def fetch():
+        response = session.get(
+            f"{DRIVE_FILES_URL}/{file_id}/export",
+            params={"mimeType": mime_type},
+            timeout=DOWNLOAD_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.content
+
+    content = with_retries(fetch, f"Export of {file_id}")
+    writer = get_storage_writer(name, storage)
+    # an export is never resumed, drop whatever an earlier attempt left
+    writer.abort(discard=True)
+    writer = get_storage_writer(name, storage)
+    writer.write(content)
+    return writer.complete()
+
+
+def download_file(file_id, name, mime_type=None, storage=default_storage):
+    """Download a Drive file into the storage under `name`, returns the stored name"""
+    session = get_drive_session()
+    try:
+        if mime_type:
+            return export_document(session, file_id, mime_type, name, storage)
+        return download_media(session, file_id, name, storage)
+    finally:
+        session.close()
+
+
+def download_from_google_drive(interview_id, event_id, required_files=None):
+    """
+    Download the recording and transcript of the event. `required_files` is
+    what get_recording_attachments returned for it, the event is looked up
+    when it is not given.
+    """
+    if required_files is None:
+        required_files = get_recording_attachments(get_meeting_info(event_id))
+
+    if not required_files:
+        return {}
 
     downloaded_files = {}
+    # the names follow the upload_to of Interview.recording and transcription,
+    # they are fixed so a retried task finds what an earlier attempt stored
     file_configs = {
-        "video": {"ext": "mp4", "mime_type": None},
-        "transcript": {"ext": "txt", "mime_type": "text/plain"},
+        "video": {"name": f"interview_recordings/{event_id}.mp4", "mime_type": None},
+        "transcript": {
+            "name": f"interview_recordings_transcription/{event_id}.txt",
+            "mime_type": "text/plain",
+        },
     }
 
-    for file_type, file_id in required_files.items():
-        save_path = f"/tmp/{event_id}.{file_configs[file_type]['ext']}"
-        download_file(
-            file_id, mime_type=file_configs[file_type]["mime_type"], save_path=save_path
-        )
-        downloaded_files[file_type] = {
-            "path": save_path,
-            "name": f"{event_id}.{file_configs[file_type]['ext']}",
+    # the video and the transcript are downloaded at the same time
+    with ThreadPoolExecutor(max_workers=len(required_files)) as pool:
+        downloads = {
+            file_type: pool.submit(
+                download_file,
+                file_id,
+                file_configs[file_type]["name"],
+                mime_type=file_configs[file_type]["mime_type"],
+            )
+            for file_type, file_id in required_files.items()
         }
+        for file_type, download in downloads.items():
+            downloaded_files[file_type] = {"name": download.result()}
 
     return {"interview_id": interview_id, "files": downloaded_files}
 
@@ -0,0 +1,212 @@
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = getattr(settings, "LLM_MODEL", "gemini-2.0-flash-thinking-exp-01-21")
+# "gemini" or "stub", the stub answers offline with deterministic responses
+BACKEND = getattr(settings, "LLM_BACKEND", "gemini")
+TIMEOUT = getattr(settings, "LLM_TIMEOUT", 120)
+MAX_RETRIES = getattr(settings, "LLM_MAX_RETRIES", 3)
+BACKOFF_BASE = getattr(settings, "LLM_BACKOFF_BASE", 1.0)
+BACKOFF_MAX = getattr(settings, "LLM_BACKOFF_MAX", 20.0)
+# seconds the stub waits before answering, to mimic the model in benchmarks
+STUB_LATENCY = getattr(settings, "LLM_STUB_LATENCY", 0)
+
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+class LLMError(Exception):
+    pass
+
+
+class GeminiBackend:
+    """
+    Keeps one GenerativeModel per model name. The models share the client
+    created by genai.configure, so the gRPC channel stays open between calls.
+    """
+
+    def __init__(self):
+        self.models = {}
+        self.lock = threading.Lock()
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+
+    def get_model(self, model_name):
+        with self.lock:
+            if model_name not in self.models:
+                self.models[model_name] = genai.GenerativeModel(model_name)
+            return self.models[model_name]
+
+    def generate(self, prompt, model_name, task):
+        response = self.get_model(model_name).generate_content(
+            prompt, request_options={"timeout": TIMEOUT}
+        )
+        usage = response.usage_metadata
+        return response.text, {
+            "prompt_tokens": usage.prompt_token_count if usage else 0,
+            "output_tokens": usage.candidates_token_count if usage else 0,
+        }
+
+
+class StubBackend:
+    """
+    Answers with the handler registered for the task (see register_stub). A
+    handler gets the prompt and a random.Random seeded from it, so the same
+    prompt always gets the same answer.
+    """
+
+    handlers = {}
+
+    def generate(self, prompt, model_name, task):
+        if task not in self.handlers:
+            raise LLMError(f"No stub registered for the task {task}")
+        if STUB_LATENCY:
+            time.sleep(STUB_LATENCY)
+        seed = int(hashlib.sha256(prompt.encode()).hexdigest()[:16], 16)
+        response = self.handlers[task](prompt, random.Random(seed))
+        text = response if isinstance(response, str) else json.dumps(response)
+        return text, {
+            "prompt_tokens": len(prompt) // 4 + 1,
+            "output_tokens": len(text) // 4 + 1,
+        }
+
+
+def register_stub(task, handler):
+    StubBackend.handlers[task] = handler
+
+
+backend_lock = threading.Lock()
+backend = None
+
+
+def get_backend():
+    global backend
+    with backend_lock:
+        if backend is None:
+            backend = StubBackend() if BACKEND == "stub" else GeminiBackend()
+        return backend
+
+
+metrics_lock = threading.Lock()
+metrics = defaultdict(
+    lambda: {
+        "calls": 0,
+        "failures": 0,
+        "retries": 0,
+        "latency_ms": 0.0,
+        "prompt_tokens": 0,
+        "output_tokens": 0,
+    }
+)
+
+
+def record_call(task, latency_ms, attempts, usage=None):
+    with metrics_lock:
+        entry = metrics[task]
+        entry["calls"] += 1
+        entry["retries"] += attempts - 1
+        entry["latency_ms"] += latency_ms
+        if usage is None:
+            entry["failures"] += 1
+        else:
+            entry["prompt_tokens"] += usage["prompt_tokens"]
+            entry["output_tokens"] += usage["output_tokens"]
+
+
+def get_metrics():
+    """Totals per task since the process started (or the last reset)"""
+    with metrics_lock:
+        return {task: dict(entry) for task, entry in metrics.items()}
+
+
+def reset_metrics():
+    with metrics_lock:
+        metrics.clear()
+
+
+def backoff_delay(attempt):
+    # full jitter, spreads the retries of concurrent callers
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))
+
+
+def generate(prompt, task, model_name=DEFAULT_MODEL):
+    """
+    Send the prompt and return the response text. Rate limits, timeouts and
+    server errors are retried up to MAX_RETRIES times, LLMError is raised once
+    they are exhausted or on any other error.
+    """
+    llm = get_backend()
+    started = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            text, usage = llm.generate(prompt, model_name, task)
+        except RETRYABLE_ERRORS as e:
+            if attempt > MAX_RETRIES:
+                record_call(task, (time.perf_counter() - started) * 1000, attempt)
+                raise LLMError(f"{task} failed after {attempt} attempts: {e}") from e
+            delay = backoff_delay(attempt - 1)
+            logger.warning(
+                f"{task} attempt {attempt} failed ({e}), retry in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            continue
+        except LLMError:
+            record_call(task, (time.perf_counter() - started) * 1000, attempt)
+            raise
+        except Exception as e:
+            record_call(task, (time.perf_counter() - started) * 1000, attempt)
+            raise LLMError(f"{task} failed: {e}") from e
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        record_call(task, latency_ms, attempt, usage)
+        logger.info(
+            f"{task} took {latency_ms:.0f}ms in {attempt} attempt(s), "
+            f"{usage['prompt_tokens']} prompt / {usage['output_tokens']} output tokens"
+        )
+        return text
+
+
+def parse_json(text):
+    """
+    Parse the JSON in a model response, with or without ```json fences or
+    text around it.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if starts:
+        start = min(starts)
+        end = text.rfind("}" if text[start] == "{" else "]")
+        try:
+            return json.loads(text[start : end + 1])
+        except json.JSONDecodeError:
+            pass
+    raise LLMError(f"Response is not valid JSON: {text[:200]}")
+
+
+def generate_json(prompt, task, model_name=DEFAULT_MODEL):
+    return parse_json(generate(prompt, task, model_name))
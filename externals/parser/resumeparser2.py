@@ -1,19 +1,54 @@
 import os
 import re
-import json
+import hashlib
 import logging
+import multiprocessing
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from multiprocessing.pool import ThreadPool
+from cachetools import TTLCache
 from dateutil import parser
 from pdfminer.high_level import extract_text
 from docx import Document
-import google.generativeai as genai
 from django.conf import settings
+from django.core.cache import cache
+from externals.llm import LLMError, generate_json, register_stub
 
 logger = logging.getLogger(__name__)
-genai.configure(api_key=settings.GOOGLE_API_KEY)
 
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".doc"}
+# text extraction is CPU bound (pdfminer), it runs in a pool of processes
+EXTRACTION_WORKERS = getattr(
+    settings, "RESUME_EXTRACTION_WORKERS", min(os.cpu_count() or 1, 8)
+)
+EXTRACTION_TIMEOUT = getattr(settings, "RESUME_EXTRACTION_TIMEOUT", 30)
+
+# parse results are cached under the sha256 of the file bytes. The shared
+# Django cache only holds the normalized result, a few hundred bytes. Each
+# process keeps its most recently used entries in front of it, bounded by
+# PARSE_CACHE_MAX_CHARS of resume text: {"text": ..., "parsed": ...}, the text
+# is kept until the model returned a result for it and dropped afterwards
+PARSE_CACHE_PREFIX = "resume-parsed"
+PARSE_CACHE_TTL = getattr(settings, "RESUME_PARSE_CACHE_TTL", 24 * 60 * 60)
+PARSE_CACHE_MAX_CHARS = getattr(settings, "RESUME_PARSE_CACHE_MAX_CHARS", 4_000_000)
+# what a parsed entry without text is counted as
+PARSED_ENTRY_CHARS = 500
+
+local_parse_cache = TTLCache(
+    maxsize=PARSE_CACHE_MAX_CHARS,
+    ttl=PARSE_CACHE_TTL,
+    getsizeof=lambda entry: len(entry["text"] or "") + PARSED_ENTRY_CHARS,
+)
+local_parse_cache_lock = threading.Lock()
+
+# resumes are packed into model requests of at most this many (estimated)
+# tokens, the requests run PARSE_CONCURRENCY at a time
+PARSE_TOKEN_BUDGET = getattr(settings, "RESUME_PARSE_TOKEN_BUDGET", 24000)
+PARSE_CONCURRENCY = getattr(settings, "RESUME_PARSE_CONCURRENCY", 4)
+# instructions and example sent along with every request
+PROMPT_TOKENS = 600
 
 
 def is_allowed_file(filename):
@@ -31,7 +66,9 @@ def extract_resume_text(file_path):
         elif ext.endswith(".doc"):
             temp_docx_path = file_path.replace(".doc", ".docx")
             subprocess.run(
-                ["unoconv", "-f", "docx", "-o", temp_docx_path, file_path], check=True
+                ["unoconv", "-f", "docx", "-o", temp_docx_path, file_path],
+                check=True,
+                timeout=EXTRACTION_TIMEOUT,
             )
             doc = Document(temp_docx_path)
             return "\n".join(para.text for para in doc.paragraphs)
@@ -40,9 +77,100 @@ def extract_resume_text(file_path):
     return ""
 
 
-def parse_resume_with_gemini(resume_texts):
+def get_extraction_pool(size):
+    # daemonic processes (celery prefork workers) can not start children
+    if multiprocessing.current_process().daemon:
+        return ThreadPool(size)
+    return multiprocessing.Pool(size)
+
+
+def extract_resume_texts(file_paths):
+    """
+    Extract the text of every file in parallel, the result keeps the order of
+    `file_paths`. A file which fails or takes longer than EXTRACTION_TIMEOUT
+    seconds gives an empty string.
+    """
+    texts = [""] * len(file_paths)
+    pending = list(range(len(file_paths)))
+    while pending:
+        pool = get_extraction_pool(min(EXTRACTION_WORKERS, len(pending)))
+        try:
+            results = {
+                index: pool.apply_async(extract_resume_text, (file_paths[index],))
+                for index in pending
+            }
+            for position, index in enumerate(pending):
+                try:
+                    texts[index] = results[index].get(timeout=EXTRACTION_TIMEOUT)
+                except multiprocessing.TimeoutError:
+                    logger.error(
+                        f"Text extraction timed out after {EXTRACTION_TIMEOUT}s "
+                        f"for {file_paths[index]}"
+                    )
+                    # the stuck worker holds up the files queued behind it, keep
+                    # what is already done and restart the pool for the rest
+                    for other in pending[position + 1 :]:
+                        if results[other].ready():
+                            texts[other] = results[other].get()
+                    pending = [
+                        other
+                        for other in pending[position + 1 :]
+                        if not results[other].ready()
+                    ]
+                    break
+            else:
+                pending = []
+        finally:
+            pool.terminate()
+    return texts
+
+
+def estimate_tokens(text):
+    # roughly four characters per token for english text
+    return len(text) // 4 + 1
+
+
+def pack_resume_batches(resumes):
+    """
+    Pack {id: text} into as few batches as possible, each one fitting in
+    PARSE_TOKEN_BUDGET. Largest first, every resume goes to the first batch it
+    fits in. A resume larger than the budget is truncated and sent alone.
+    """
+    budget = PARSE_TOKEN_BUDGET - PROMPT_TOKENS
+    batches = []
+    for resume_id, text in sorted(
+        resumes.items(), key=lambda item: len(item[1]), reverse=True
+    ):
+        tokens = estimate_tokens(text)
+        if tokens > budget:
+            text, tokens = text[: budget * 4], budget
+        for batch in batches:
+            if batch["tokens"] + tokens <= budget:
+                batch["resumes"][resume_id] = text
+                batch["tokens"] += tokens
+                break
+        else:
+            batches.append({"resumes": {resume_id: text}, "tokens": tokens})
+    return [batch["resumes"] for batch in batches]
+
+
+def parse_resumes_in_batches(resumes):
+    """Parse {id: text} with the model, returns {id: data} for the parsed ones"""
+    batches = pack_resume_batches(resumes)
+    if not batches:
+        return {}
+    parsed = {}
+    with ThreadPoolExecutor(max_workers=min(PARSE_CONCURRENCY, len(batches))) as pool:
+        # a failed batch only loses its own resumes
+        for result in pool.map(parse_resume_with_gemini, batches):
+            parsed.update(result)
+    return parsed
+
+
+def parse_resume_with_gemini(resumes):
     prompt = (
         "You are an expert resume parser. Extract the following details for EACH resume:\n"
+        "0. Id (the number after RESUME)\n"
         "1. Name (full name exactly as shown)\n"
         "2. Email (complete address without spaces)\n"
         "3. Phone Number (with country code if available)\n"
@@ -52,6 +180,7 @@ def parse_resume_with_gemini(resume_texts):
         "Return STRICT JSON array. Each object MUST follow this example:\n"
         "[\n"
         "  {\n"
+        '    "id": 1,\n'
         '    "name": "John Doe",\n'
         '    "email": "john@email.com",\n'
         '    "phoneNumber": "+11234567890",\n'
@@ -82,26 +211,55 @@ def parse_resume_with_gemini(resume_texts):
         "- Return object should be proper JSON array of objects\n\n"
         "Resumes:\n"
         + "\n---\n".join(
-            f"RESUME {i+1}:\n{text}" for i, text in enumerate(resume_texts)
+            f"RESUME {resume_id}:\n{text}" for resume_id, text in resumes.items()
         )
     )
 
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash-thinking-exp-01-21")
-        response = model.generate_content(prompt)
-        raw_response = response.text.strip()
+        data = generate_json(prompt, task="resume_parse")
+    except LLMError as e:
+        logger.error(f"Gemini parsing failed: {str(e)}")
+        return {}
 
-        json_start = raw_response.find("[")
-        json_end = raw_response.rfind("]") + 1
-        json_str = raw_response[json_start:json_end] if json_start != -1 else "{}"
-        if json_str.startswith("```json"):
-            json_str = json_str.strip("```")[4:].strip()
+    parsed = {}
+    for item in data if isinstance(data, list) else []:
+        if isinstance(item, dict) and str(item.get("id")) in resumes:
+            parsed[str(item["id"])] = item
+    return parsed
+
+
+def stub_parse_resumes(prompt, rng):
+    """Offline answer for parse_resume_with_gemini, built from the resume texts"""
+    results = []
+    for resume in prompt.split("Resumes:\n", 1)[-1].split("\n---\n"):
+        header, _, text = resume.partition("\n")
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        email = re.search(r"[\w.+-]+@[\w-]+\.[\w.]+", text)
+        phone = re.search(r"\+?\d[\d -]{8,}\d", text)
+        start_year = 2010 + rng.randint(0, 12)
+        company = f"Company {rng.randint(1, 500)}"
+        results.append(
+            {
+                "id": header.removeprefix("RESUME ").rstrip(":"),
+                "name": lines[0] if lines else "",
+                "email": email.group() if email else "",
+                "phoneNumber": phone.group() if phone else "",
+                "experiences": [
+                    {
+                        "job_title": "Software Engineer",
+                        "company": company,
+                        "start_date": f"January {start_year}",
+                        "end_date": "Present",
+                    }
+                ],
+                "currentCompanyName": company,
+                "currentDesignation": "Software Engineer",
+            }
+        )
+    return results
 
-        return json.loads(json_str)
-    except Exception as e:
-        logger.error(f"Gemini parsing failed: {str(e)}")
-        logger.debug(f"Raw response: {raw_response}")
-        return []
+
+register_stub("resume_parse", stub_parse_resumes)
 
 
 def calculate_experience(experiences):
@@ -133,31 +291,112 @@ def normalize_phone(number):
     return number if number.startswith("+") else f"+{number}"
 
 
+def get_file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_parse_cache_key(digest):
+    return f"{PARSE_CACHE_PREFIX}:{digest}"
+
+
+def normalize_parsed_resume(data):
+    exp = calculate_experience(data.get("experiences", []))
+    return {
+        "name": data.get("name", "").strip(),
+        "email": data.get("email", "").replace(" ", ""),
+        "phone_number": normalize_phone(data.get("phoneNumber", "")),
+        "years_of_experience": exp,
+        "current_company": data.get("currentCompanyName", ""),
+        "current_designation": data.get("currentDesignation", ""),
+    }
+
+
+def remember_entries(entries):
+    with local_parse_cache_lock:
+        for digest, entry in entries.items():
+            # TTLCache refuses an entry larger than the whole cache
+            if local_parse_cache.getsizeof(entry) <= local_parse_cache.maxsize:
+                local_parse_cache[digest] = entry
+
+
+def get_cached_entries(digests):
+    """Cache entries of the digests, from this process first"""
+    entries = {}
+    with local_parse_cache_lock:
+        for digest in digests:
+            if digest in local_parse_cache:
+                entries[digest] = local_parse_cache[digest]
+
+    missing = [digest for digest in digests if digest not in entries]
+    cached = cache.get_many([get_parse_cache_key(digest) for digest in missing])
+    shared = {
+        digest: {"text": None, "parsed": cached[get_parse_cache_key(digest)]}
+        for digest in missing
+        if get_parse_cache_key(digest) in cached
+    }
+    remember_entries(shared)
+    return {**entries, **shared}
+
+
 def process_resumes(file_paths):
-    resume_texts, file_names = [], []
-    for path in file_paths:
-        if not is_allowed_file(path):
-            continue
-        text = extract_resume_text(path)
-        if text:
-            resume_texts.append(text)
-            file_names.append(os.path.basename(path))
-        else:
-            logger.warning(f"No text extracted from {path}")
+    file_paths = [path for path in file_paths if is_allowed_file(path)]
+    digests = [get_file_digest(path) for path in file_paths]
 
-    parsed = parse_resume_with_gemini(resume_texts)
-    results = []
-    for i, data in enumerate(parsed):
-        exp = calculate_experience(data.get("experiences", []))
-        results.append(
-            {
-                "file_name": file_names[i],
-                "name": data.get("name", "").strip(),
-                "email": data.get("email", "").replace(" ", ""),
-                "phone_number": normalize_phone(data.get("phoneNumber", "")),
-                "years_of_experience": exp,
-                "current_company": data.get("currentCompanyName", ""),
-                "current_designation": data.get("currentDesignation", ""),
+    # a file uploaded twice in the same batch is only extracted and parsed once
+    entries = get_cached_entries(set(digests))
+
+    to_extract = {
+        digest: path
+        for digest, path in zip(digests, file_paths)
+        if digest not in entries
+    }
+    texts = extract_resume_texts(list(to_extract.values()))
+    for digest, text in zip(to_extract, texts):
+        entries[digest] = {"text": text, "parsed": None}
+        if not text:
+            logger.warning(f"No text extracted from {to_extract[digest]}")
+
+    to_parse = [
+        digest
+        for digest, entry in entries.items()
+        if entry["text"] and entry["parsed"] is None
+    ]
+    # the model echoes the ids back, results are matched to files by id
+    parsed = parse_resumes_in_batches(
+        {str(i): entries[digest]["text"] for i, digest in enumerate(to_parse, 1)}
+    )
+    for i, digest in enumerate(to_parse, 1):
+        if str(i) in parsed:
+            entries[digest] = {
+                "text": None,
+                "parsed": normalize_parsed_resume(parsed[str(i)]),
             }
-        )
-    return results
+        else:
+            logger.warning(f"No parse result for resume {digest}")
+
+    # a text the model failed on stays in this process for the next attempt
+    remember_entries(
+        {
+            digest: entries[digest]
+            for digest in to_extract.keys() | set(to_parse)
+            if entries[digest]["text"] or entries[digest]["parsed"]
+        }
+    )
+    cache.set_many(
+        {
+            get_parse_cache_key(digest): entries[digest]["parsed"]
+            for digest in to_parse
+            if entries[digest]["parsed"]
+        },
+        PARSE_CACHE_TTL,
+    )
+
+    return [
+        {"file_name": os.path.basename(path), **entries[digest]["parsed"]}
+        for digest, path in zip(digests, file_paths)
+        if entries[digest]["parsed"]
+    ]
@@ -19,4 +19,12 @@ app.conf.beat_schedule = {
         "task": "dashboard.tasks.process_interview_video_and_generate_and_store_feedback",
         "schedule": crontab(minute="*/30"),
     },
+    "rebuild_dashboard_snapshots_every_hour": {
+        "task": "dashboard.tasks.rebuild_dashboard_snapshots",
+        "schedule": crontab(minute=0),
+    },
+    "extend_recurring_availability_every_night": {
+        "task": "dashboard.tasks.extend_recurring_availability",
+        "schedule": crontab(hour=1, minute=0),
+    },
 }
@@ -0,0 +1,83 @@
+import hashlib
+from django.core.cache import cache
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from .utils import get_boolean
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on the primary key. Deep pages cost the same as the
+    first one because the cursor turns into a `WHERE id < x` clause instead
+    of an OFFSET. The total count is only computed on `?with_count=true` and
+    is cached for a short while.
+
+    Views whose primary key does not follow insertion order, like UUIDs, set
+    `keyset_ordering` to a creation timestamp with the key as tie breaker.
+    """
+
+    ordering = "-id"
+    page_size_query_param = "limit"
+    max_page_size = 100
+    count_query_param = "with_count"
+    count_cache_timeout = 60
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "keyset_ordering", self.ordering)
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if get_boolean(request.query_params, self.count_query_param):
+            self.count = self.get_cached_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_cached_count(self, queryset):
+        queryset = queryset.order_by()
+        sql, params = queryset.query.sql_with_params()
+        cache_key = "pagination-count:{}".format(
+            hashlib.sha256(f"{sql}:{params}".encode()).hexdigest()
+        )
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.count()
+            cache.set(cache_key, count, self.count_cache_timeout)
+        return count
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+
+class OptionalKeysetPagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination which switches to KeysetPagination when the client
+    asks for it with `?pagination=cursor` or sends a `cursor` it got back from
+    a previous page. The response envelope stays the same in both modes.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_paginator = None
+        if (
+            request.query_params.get("pagination") == "cursor"
+            or self.keyset_pagination_class.cursor_query_param in request.query_params
+        ):
+            self.keyset_paginator = self.keyset_pagination_class()
+            # the views mix the paginator in, so without a view it is self
+            return self.keyset_paginator.paginate_queryset(
+                queryset, request, view or self
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
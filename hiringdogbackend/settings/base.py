@@ -132,6 +132,15 @@ DJANGO_REST_PASSWORDRESET_NO_INFORMATION_LEAKAGE = True
 DJANGO_REST_MULTITOKENAUTH_RESET_TOKEN_EXPIRY_TIME = 1
 
 
+# shared by the web and celery processes: resume parse results, pagination
+# counts and the dashboard refresh debounce
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/1"),
+    }
+}
+
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_TIMEZONE = "Asia/Kolkata"
 CELERY_RESULT_BACKEND = "redis://localhost:6379/0"
@@ -140,6 +149,11 @@ CELERY_WORKER_SEND_TASK_EVENTS = True
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers.DatabaseScheduler"
 CELERY_TASK_ACKS_LATE = True
 CELERY_BROKER_HEARTBEAT = 10
+# AI feedback runs on its own queue, the concurrency of the worker consuming it
+# is the number of transcripts analyzed at once
+CELERY_TASK_ROUTES = {
+    "dashboard.tasks.generate_interview_feedback": {"queue": "feedback"},
+}
 # CELERY_BROKER_CONNECTION_TIMEOUT = 600
 # CELERY_TASK_TRACK_STARTED = True
 # CELERYD_PREFETCH_MULTIPLIER = 2
@@ -160,12 +174,12 @@ GOOGLE_SERVICE_ACCOUNT_CRED = os.path.join(
     BASE_DIR, "resources/hiringdog-interview-platform-aaed9eab6a69.json"
 )
 GOOGLE_REDIRECT_URI = "http://localhost:5173/interviewer/calendar"
-GOOGLE_CLIENT_ID = os.getenvconfig("GOOGLE_CLIENT_ID") # (
+GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID") # (
     #"187041398834-vukvfh0chir8ovqcvu1rh16qe6mrvlp9.apps.googleusercontent.com"
 #)
-GOOGLE_CLIENT_SECRET =  os.getenvconfig("GOOGLE_CLIENT_SECRET")  #"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"
+GOOGLE_CLIENT_SECRET =  os.environ.get("GOOGLE_CLIENT_SECRET")  #"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"
 
-APILAYER_RESUME_PARSER_API_KEY = os.getenvconfig("APILAYER_RESUME_PARSER_API_KEY")   #"KcP5hRnkLKxsuh3xSlAkG71xABdqBilD"
+APILAYER_RESUME_PARSER_API_KEY = os.environ.get("APILAYER_RESUME_PARSER_API_KEY")   #"KcP5hRnkLKxsuh3xSlAkG71xABdqBilD"
 APILAYER_RESUME_PARSER_URL = "https://api.apilayer.com/resume_parser/upload"
 
 
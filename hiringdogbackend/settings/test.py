@@ -0,0 +1,55 @@
+from .base import *
+
+# Local settings for the tests and other offline runs. Everything
+# runs in process: SQLite database, in-memory email and eager celery tasks.
+
+DEBUG = False
+
+SECRET_KEY = "django-insecure-test-only-key"
+
+ALLOWED_HOSTS = ["localhost", "127.0.0.1", "testserver"]
+
+# The test database is a file so each thread of the concurrency tests gets its
+# own connection. Transactions take the write lock when they begin and wait up
+# to `timeout` seconds for it, like MySQL row locks. The in-memory database
+# fails a second writer at once with "database table is locked".
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+    }
+}
+
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+CELERY_BROKER_URL = "memory://"
+CELERY_RESULT_BACKEND = "cache+memory://"
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+EMAIL_HOST_USER = "noreply@example.com"
+CONTACT_EMAIL = "contact@example.com"
+INTERVIEW_EMAIL = "interview@example.com"
+
+GOOGLE_API_KEY = ""
+# resume parsing and interview feedback get deterministic offline answers
+LLM_BACKEND = "stub"
+# the google clients load the service account at import time, point this at any
+# service account json when the real one is not available
+GOOGLE_SERVICE_ACCOUNT_CRED = os.environ.get(
+    "GOOGLE_SERVICE_ACCOUNT_CRED", GOOGLE_SERVICE_ACCOUNT_CRED
+)
+
+LOGIN_URL = "http://localhost:5173/auth/signin/loginmail"
+BASE_URL = "http://localhost:8000/api"
+SITE_DOMAIN = "localhost:5173"
+CF_CLIENTID = None
+CF_CLIENTSECRET = None
+CF_RETURNURL = None
+
+TAWKTO_API = None
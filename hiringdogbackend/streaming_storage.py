@@ -0,0 +1,125 @@
+import os
+import hashlib
+import tempfile
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from storages.backends.s3 import S3Storage
+
+# S3 refuses multipart parts under 5 MB (except the last one)
+S3_MIN_PART_SIZE = 8 * 1024 * 1024
+# the generic writer keeps this much in memory before spilling to disk
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+
+class LocalFileWriter:
+    """
+    Writes into `<name>.part` next to the final file and renames it on
+    completion. The part file survives a failure, `offset` is where a retry
+    resumes from.
+    """
+
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+        self.path = storage.path(name)
+        self.part_path = f"{self.path}.part"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.md5 = hashlib.md5()
+        self.offset = 0
+        if os.path.exists(self.part_path):
+            with open(self.part_path, "rb") as file:
+                for block in iter(lambda: file.read(8 * 1024 * 1024), b""):
+                    self.md5.update(block)
+                    self.offset += len(block)
+        self.file = open(self.part_path, "ab")
+
+    def write(self, data):
+        self.file.write(data)
+        self.file.flush()
+        self.md5.update(data)
+        self.offset += len(data)
+
+    def complete(self):
+        self.file.close()
+        os.replace(self.part_path, self.path)
+        return self.name
+
+    def abort(self, discard=False):
+        self.file.close()
+        if discard and os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+
+class S3MultipartWriter:
+    """Uploads the data as an S3 multipart upload, one part per ~8 MB buffered"""
+
+    def __init__(self, storage, name):
+        self.name = name
+        self.upload = storage.bucket.Object(
+            storage._normalize_name(name)
+        ).initiate_multipart_upload()
+        self.parts = []
+        self.buffer = bytearray()
+        self.md5 = hashlib.md5()
+        self.offset = 0
+
+    def write(self, data):
+        self.buffer += data
+        self.md5.update(data)
+        self.offset += len(data)
+        if len(self.buffer) >= S3_MIN_PART_SIZE:
+            self.flush()
+
+    def flush(self):
+        part_number = len(self.parts) + 1
+        response = self.upload.Part(part_number).upload(Body=bytes(self.buffer))
+        self.parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+        self.buffer = bytearray()
+
+    def complete(self):
+        if self.buffer or not self.parts:
+            self.flush()
+        self.upload.complete(MultipartUpload={"Parts": self.parts})
+        return self.name
+
+    def abort(self, discard=False):
+        self.upload.abort()
+
+
+class SpooledWriter:
+    """Any other storage: spool to a bounded temporary file, then storage.save"""
+
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        self.md5 = hashlib.md5()
+        self.offset = 0
+
+    def write(self, data):
+        self.file.write(data)
+        self.md5.update(data)
+        self.offset += len(data)
+
+    def complete(self):
+        self.file.seek(0)
+        if self.storage.exists(self.name):
+            self.storage.delete(self.name)
+        name = self.storage.save(self.name, File(self.file))
+        self.file.close()
+        return name
+
+    def abort(self, discard=False):
+        self.file.close()
+
+
+def get_storage_writer(name, storage=default_storage):
+    """
+    Writer streaming bytes to `name` in the storage. write() the data in order,
+    then complete() (returns the stored name) or abort().
+    """
+    if isinstance(storage, S3Storage):
+        return S3MultipartWriter(storage, name)
+    if isinstance(storage, FileSystemStorage):
+        return LocalFileWriter(storage, name)
+    return SpooledWriter(storage, name)